@@ -1,16 +1,19 @@
 import os
-from typing import Literal
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Literal, Optional
 from app.ai.config import get_openai_client
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from app.config.logging_config import setup_logging
 import logging
-from app.ai.config import get_openai_client, parse_openai_response
+from app.ai.config import get_openai_client, parse_openai_response, record_llm_usage
+from app.ai import prompts
+from app.ai.pitch_store import pitch_store
+from app.ai.resilience import call_llm, stream_llm, LLMUnavailableError
+from app.ai.routing import classify_user_query
+from app.config.metrics import metrics
 from dotenv import load_dotenv
-from app.schemas.pitch_schema import FeedbackModel, ScoreModel, WorkflowClassifier, State, PitchAction
-from langchain_core.messages import AIMessage
+from app.schemas.pitch_schema import FeedbackModel, ScoreModel, FusedEvaluationModel, WorkflowClassifier, State, PitchAction, RevisionContext, EvaluationKind, PitchData, QuestionItem, GeneratedQuestion, SlideBatchEditsModel
 from langgraph.types import Command
-from langgraph.graph import MessagesState
 from langgraph.graph import END
 
 # Load environment variables
@@ -20,6 +23,42 @@ load_dotenv()
 setup_logging()
 logger = logging.getLogger(__name__)
 
+
+def format_slide_changes(revision: RevisionContext) -> str:
+    """
+    Render the slide-level changes of a revision for an incremental prompt.
+    
+    Args:
+        revision (RevisionContext): Revision context of the new deck version
+        
+    Returns:
+        str: Changed slides followed by the removed slide numbers
+    """
+    sections = [f"--- Slide {slide.number} ---\n{slide.text}" for slide in revision.diff.changed_slides]
+    if revision.diff.removed_slide_numbers:
+        removed = ", ".join(str(number) for number in revision.diff.removed_slide_numbers)
+        sections.append(f"Removed slides from the previous version: {removed}")
+    return "\n\n".join(sections)
+
+def fallback_route(has_feedback: bool, has_score: bool, user_query: str) -> str:
+    """
+    Deterministic routing used when the supervisor LLM cannot be reached in time.
+    
+    Args:
+        has_feedback (bool): Whether the feedback is already available
+        has_score (bool): Whether the scores are already available
+        user_query (str): The user's query, classified without the LLM
+        
+    Returns:
+        str: Next node, or END
+    """
+    kind = classify_user_query(user_query)
+    if not has_feedback and kind != EvaluationKind.SCORING_ONLY:
+        return "pitch_analysis_agent"
+    if not has_score and kind != EvaluationKind.ANALYSIS_ONLY:
+        return "score_pitch_agent"
+    return END
+
 # OpenAI Supervisor - Uses OpenAI to determine which agent to call next
 async def supervisor(state: State) -> Command[Literal["pitch_analysis_agent", "score_pitch_agent", "__end__"]]:
     """
@@ -34,70 +73,26 @@ async def supervisor(state: State) -> Command[Literal["pitch_analysis_agent", "s
     logger.info("=== SUPERVISOR STARTED ===")
     logger.info("OpenAI supervisor determining next agent")
     
+    # Check what's already been completed
+    has_feedback = state.get("feedback") is not None
+    has_score = state.get("score") is not None
+    user_query = state.get("user_query", "")
+    
+    logger.info(f"State analysis - Has feedback: {has_feedback}, Has score: {has_score}")
+    logger.info(f"User query: {user_query}")
+    
     try:
         # Get OpenAI client
         client = await get_openai_client()
         
-        # Check what's already been completed
-        has_feedback = state.get("feedback") is not None
-        has_score = state.get("score") is not None
-        user_query = state.get("user_query", "")
-
-        
-        logger.info(f"State analysis - Has feedback: {has_feedback}, Has score: {has_score}")
-        logger.info(f"User query: {user_query}")
-        
-        # Create prompt for OpenAI to determine next agent
-        system_prompt = """
-        [IDENTITY]
-        You are a workflow supervisor for a pitch analysis system.
-        You are an expert in routing workflows with deep knowledge of evaluation criteria and scoring rubrics used by top venture capital firms.
-
-        [TASK]
-        Based on the founder's pitch and the user's query, determine which agent to call next.
-
-        [CONTEXT]
-        - Current state: has_feedback={has_feedback}, has_score={has_score}
-        - User query: {user_query}
-        - Available agents: "pitch_analysis_agent" (provides detailed feedback), "score_pitch_agent" (provides numerical scores)
-
-        [ROUTING RULES]
-        [CASE 1]
-        1. If the user explicitly requests ONLY scoring (e.g., "provide just the score", "score only", "what's the score") AND no score exists, route to "score_pitch_agent"
-        2. If the user requests ONLY scoring, and score ALREADY EXISTS, return "complete".
-        
-        [CASE 2]
-        1. If the user explicitly requests ONLY analysis/feedback AND no feedback exists, route to "pitch_analysis_agent" 
-        2. If the user requests ONLY analysis/feedback, and feedback ALREADY EXISTS, return "complete".
-        
-        [CASE 3]
-        1. If the user query requests both analysis and scoring or is general/ambiguous:
-            - If no feedback exists, route to "pitch_analysis_agent"
-            - If feedback exists but no score exists, route to "score_pitch_agent"
-        2. If both feedback and score exist (or the requested tasks are complete), return "__end__"
-        
-        
-        [CASE 4]
-        1. Default: if nothing exists, start with "pitch_analysis_agent"
-        
-        [OUTPUT FORMAT]
-        Return exactly one of: "analysis", "scoring", or "complete"
-        """
-        
         # Call OpenAI to determine next agent
-        response = await client.chat.completions.create(
+        response, completion = await call_llm("supervisor", lambda: client.chat.completions.create_with_completion(
             model=os.getenv("OPENAI_MODEL_SUPERVISOR"),
-            messages=[
-                {"role": "system", "content": system_prompt.format(
-                    has_feedback=has_feedback, 
-                    has_score=has_score,
-                    user_query=user_query
-                )},
-                {"role": "user", "content": f"Route this request: {user_query}"}
-            ],
+            messages=prompts.supervisor_messages(has_feedback, has_score, user_query),
             response_model=WorkflowClassifier,
             temperature=0.1
-        )
+        ))
+        record_llm_usage("supervisor", completion)
         
         next_agent = response.workflow_stage
         if next_agent == PitchAction.ANALYSIS:
@@ -113,15 +108,12 @@ async def supervisor(state: State) -> Command[Literal["pitch_analysis_agent", "s
         return Command(goto=next_agent)
         
     except Exception as e:
-        logger.error(f"Error in supervisor: {str(e)}")
-        # Fallback logic if OpenAI fails
-        if not has_feedback:
-            next_agent = "pitch_analysis_agent"
-        elif not has_score:
-            next_agent = "score_pitch_agent"
+        if isinstance(e, LLMUnavailableError):
+            logger.warning(f"Supervisor LLM unavailable, using fallback routing: {str(e)}")
         else:
-            next_agent = END
-        
+            logger.error(f"Error in supervisor: {str(e)}")
+        metrics.increment("llm.supervisor.fallbacks")
+        next_agent = fallback_route(has_feedback, has_score, user_query)
         logger.info(f"Fallback supervisor routing to: {next_agent}")
         return Command(goto=next_agent)
 
@@ -141,59 +133,46 @@ async def pitch_analysis_agent(state: State) -> Command[Literal["supervisor"]]:
     logger.info("Starting pitch analysis agent")
     
     try:
-        pitch_data = state.get("pitch_data")
+        pitch_data = pitch_store.get(state.get("pitch_ref"))
         if not pitch_data:
-            logger.error("No pitch data found in state")
+            logger.error("No pitch data found for the state's pitch_ref")
             raise ValueError("No pitch data found in state")
         
-        logger.info(f"Pitch data received - text length: {len(pitch_data.pitch_text)} characters")
-        logger.info("Creating analysis prompt template")
+        logger.info(f"Pitch data received - text length: {len(pitch_data.content)} characters")
+        revision = pitch_data.revision
+        if revision and revision.previous_feedback and revision.diff.is_unchanged:
+            logger.info(f"Deck unchanged since pitch {revision.previous_pitch_id} - reusing previous feedback")
+            result = revision.previous_feedback
+        else:
+            logger.info("Getting OpenAI client")
+            client = await get_openai_client()
             
-        prompt = ChatPromptTemplate.from_template(
-            """
-            [IDENTITY]
-            You are a world‑class pitch analyst, steeped in the frameworks and best practices of leading venture capital firms—Y Combinator, Sequoia Capital, Andreessen Horowitz (a16z), Benchmark, Accel, and Greylock Ventures.
-
-            [TASK]
-            Assess the following pitch content with the rigor of a YC partner and an a16z investor. Apply the evaluation standards, scoring rubrics, and qualitative insights these firms use when vetting founders.
-
-            [EVALUATION CRITERIA]
-            1. Clarity: How clearly does the pitch articulate the problem, solution, and unique value proposition? 
-            2. Differentiation: How distinct and defensible is the offering compared to direct and indirect competitors? 
-            3. Traction: How convincingly does the pitch demonstrate early user/customer validation, revenue, or growth metrics? 
-            4. Scalability: How well does the pitch show the potential to expand market reach, grow margins, and leverage network effects? 
-            5. Market Potential: How well-defined and sizable is the Total Addressable Market (TAM)? 
-            6. Team Strength: How effectively does the pitch convey the founding team's domain expertise and execution capability? 
+            if revision and revision.previous_feedback:
+                logger.info(f"Incremental analysis of {len(revision.diff.changed_slides)} changed slides")
+                messages = prompts.evaluation_messages(
+                    prompts.ANALYSIS_REVISION_PROMPT,
+                    prompts.revision_content_message(
+                        "PREVIOUS ANALYSIS",
+                        revision.previous_feedback.model_dump_json(),
+                        format_slide_changes(revision)
+                    )
+                )
+            else:
+                messages = prompts.evaluation_messages(
+                    prompts.ANALYSIS_PROMPT,
+                    prompts.pitch_content_message(pitch_data.content, pitch_data.features)
+                )
             
-            [INPUT]
-            - ELEVATOR PITCH CONTENT: {pitch_text}
-
-            [OUTPUT FORMAT]
-            Provide a structured output with these sections:
-
-            1. **Overall Feedback:** A concise summary and rationale of the pitch.
-            2. **Strengths:** Highlight the pitch's strongest elements, citing examples.
-            3. **Weaknesses:** Pinpoint key gaps or shortcomings, with context.
-            4. **Opportunities:** Identify untapped angles or areas ripe for expansion.
-            5. **Threats:** Surface potential risks or competitive headwinds not adequately addressed.
-            6. **Suggestions for improvement:** Specific, prioritized steps to elevate the pitch, referencing YC/a16z playbooks where relevant.
-            """
-        )
-        
-        logger.info("Getting OpenAI client")
-        client = await get_openai_client()
-        
-        logger.info("Sending request to OpenAI for pitch analysis")
-        logger.info(f"Using model: {os.getenv('OPENAI_MODEL')}")
-        
-        result = await client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL"),
-            response_model=FeedbackModel,
-            temperature=0.2,
-            messages=[
-                {"role": "developer", "content": prompt.format(pitch_text=pitch_data.pitch_text)}
-            ]
-        )
+            logger.info("Sending request to OpenAI for pitch analysis")
+            logger.info(f"Using model: {os.getenv('OPENAI_MODEL')}")
+            
+            result, completion = await call_llm("pitch_analysis_agent", lambda: client.chat.completions.create_with_completion(
+                model=os.getenv("OPENAI_MODEL"),
+                response_model=FeedbackModel,
+                temperature=0.2,
+                messages=messages
+            ))
+            record_llm_usage("pitch_analysis_agent", completion)
         
         logger.info("Successfully received feedback from OpenAI")
         logger.info(f"Feedback generated - Overall feedback length: {len(result.overall_feedback)} characters")
@@ -203,7 +182,7 @@ async def pitch_analysis_agent(state: State) -> Command[Literal["supervisor"]]:
             goto="supervisor",
             update={
                 "feedback": result,
-                "messages": state.get("messages", []) + [AIMessage(content=str(result))]
+                "completed": ["pitch_analysis_agent"]
             }
         )
         
@@ -213,6 +192,76 @@ async def pitch_analysis_agent(state: State) -> Command[Literal["supervisor"]]:
         raise ValueError(f"Error in pitch analysis agent: {str(e)}")
     
     
+async def cascade_score(client, messages: list) -> ScoreModel:
+    """
+    Score with a cheap model first and escalate to OPENAI_MODEL only when its samples disagree.
+    
+    SCORING_CASCADE_SAMPLES samples of OPENAI_MODEL_SCORING_CHEAP are drawn
+    concurrently. When every dimension stays within SCORING_CASCADE_TOLERANCE
+    points across the samples, their mean is returned. Otherwise, or when a
+    sample fails, the pitch is scored again with the larger model.
+    
+    Args:
+        client: Instructor OpenAI client
+        messages (list): Scoring prompt messages
+        
+    Returns:
+        ScoreModel: Pitch scores
+    """
+    cheap_model = os.getenv("OPENAI_MODEL_SCORING_CHEAP", "gpt-4.1-nano")
+    num_samples = max(1, int(os.getenv("SCORING_CASCADE_SAMPLES", "2")))
+    tolerance = float(os.getenv("SCORING_CASCADE_TOLERANCE", "1.0"))
+    temperature = float(os.getenv("SCORING_CASCADE_TEMPERATURE", "0.7"))
+    
+    metrics.increment("scoring.cascade.runs")
+    with metrics.timer("scoring.tier.cheap"):
+        responses = await asyncio.gather(*(
+            call_llm("score_pitch_cheap", lambda: client.chat.completions.create_with_completion(
+                model=cheap_model,
+                response_model=ScoreModel,
+                temperature=temperature,
+                messages=messages
+            ))
+            for _ in range(num_samples)
+        ), return_exceptions=True)
+    
+    samples = []
+    for response in responses:
+        if isinstance(response, Exception):
+            logger.warning(f"Cheap scoring sample failed: {str(response)}")
+            continue
+        sample, completion = response
+        record_llm_usage("score_pitch_cheap", completion)
+        samples.append(sample)
+    
+    if len(samples) == num_samples:
+        spread = max(
+            max(getattr(sample, dimension) for sample in samples) - min(getattr(sample, dimension) for sample in samples)
+            for dimension in ScoreModel.model_fields
+        )
+        if spread <= tolerance:
+            metrics.increment("scoring.cascade.accepted")
+            logger.info(f"Cheap scoring samples agree (spread {spread:.1f}), skipping escalation")
+            return ScoreModel(**{
+                dimension: round(sum(getattr(sample, dimension) for sample in samples) / len(samples), 1)
+                for dimension in ScoreModel.model_fields
+            })
+        logger.info(f"Cheap scoring samples disagree (spread {spread:.1f} > {tolerance}), escalating to {os.getenv('OPENAI_MODEL')}")
+    else:
+        logger.info(f"Only {len(samples)} of {num_samples} cheap scoring samples succeeded, escalating")
+    
+    metrics.increment("scoring.cascade.escalations")
+    with metrics.timer("scoring.tier.escalated"):
+        result, completion = await call_llm("score_pitch_agent", lambda: client.chat.completions.create_with_completion(
+            model=os.getenv("OPENAI_MODEL"),
+            response_model=ScoreModel,
+            temperature=0.2,
+            messages=messages
+        ))
+    record_llm_usage("score_pitch_agent", completion)
+    return result
+
+
 # Score Pitch Agent - Generates structured scoring
 async def score_pitch_agent(state: State) -> Command[Literal["supervisor"]]:
     """
@@ -228,59 +277,49 @@ async def score_pitch_agent(state: State) -> Command[Literal["supervisor"]]:
     logger.info("Starting score pitch agent")
     
     try:
-        pitch_data = state.get("pitch_data")
+        pitch_data = pitch_store.get(state.get("pitch_ref"))
         if not pitch_data:
-            logger.error("No pitch data found in state")
+            logger.error("No pitch data found for the state's pitch_ref")
             raise ValueError("No pitch data found in state")
         
-        logger.info(f"Pitch data received - text length: {len(pitch_data.pitch_text)} characters")
-        logger.info("Creating scoring prompt template")
+        logger.info(f"Pitch data received - text length: {len(pitch_data.content)} characters")
+        revision = pitch_data.revision
+        if revision and revision.previous_score and revision.diff.is_unchanged:
+            logger.info(f"Deck unchanged since pitch {revision.previous_pitch_id} - reusing previous scores")
+            result = revision.previous_score
+        else:
+            logger.info("Getting OpenAI client")
+            client = await get_openai_client()
             
-        prompt = ChatPromptTemplate.from_template(
-            """
-            [IDENTITY]
-            You are a world-class pitch analyst, leveraging the rigorous vetting frameworks of top venture firms—including Y Combinator, Sequoia Capital, Andreessen Horowitz (a16z), Benchmark, Accel, and Greylock Ventures.
-            You are an expert in the art of scoring pitches and have a deep understanding of the evaluation criteria and scoring rubrics of leading venture capital firms.
-
-            [TASK]
-            Given the founder's pitch, produce a structured scoring rubric that quantifies and justifies the pitch's strengths across key dimensions.
-
-            [EVALUATION CRITERIA]
-            1. Clarity: How clearly the pitch conveys the problem, solution, and unique value proposition.
-            2. Differentiation: How defensibly the offering stands out against competitors.
-            3. Traction: The strength of demonstrated user/customer validation, revenue, or engagement metrics.
-            4. Scalability: Evidence of potential to expand market reach, improve margins, and leverage network effects.
-            5. Market Potential: The size and potential of the Total Addressable Market.
-            6. Team Strength: The quality and experience of the founding team.
-
-            [INPUT]
-            - PITCH_TEXT: {pitch_text}
-
-            [OUTPUT FORMAT]
-            Provide a structured scoring analysis with these sections:
-
-            1. Clarity: Score from 0 to 10 
-            2. Differentiation: Score from 0 to 10 
-            3. Traction: Score from 0 to 10 
-            4. Scalability: Score from 0 to 10 
-            5. Overall: Score from 0 to 10 
-            """
-        )
-        
-        logger.info("Getting OpenAI client")
-        client = await get_openai_client()
-        
-        logger.info("Sending request to OpenAI for pitch scoring")
-        logger.info(f"Using model: {os.getenv('OPENAI_MODEL')}")
-        
-        result = await client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL"),
-            response_model=ScoreModel,
-            temperature=0.2,
-            messages=[
-                {"role": "developer", "content": prompt.format(pitch_text=pitch_data.pitch_text)}
-            ]
-        )
+            if revision and revision.previous_score:
+                logger.info(f"Incremental scoring of {len(revision.diff.changed_slides)} changed slides")
+                messages = prompts.evaluation_messages(
+                    prompts.SCORING_REVISION_PROMPT,
+                    prompts.revision_content_message(
+                        "PREVIOUS SCORES",
+                        revision.previous_score.model_dump_json(),
+                        format_slide_changes(revision)
+                    )
+                )
+            else:
+                messages = prompts.evaluation_messages(
+                    prompts.SCORING_PROMPT,
+                    prompts.pitch_content_message(pitch_data.content, pitch_data.features)
+                )
+            
+            logger.info("Sending request to OpenAI for pitch scoring")
+            logger.info(f"Using model: {os.getenv('OPENAI_MODEL')}")
+            
+            if os.getenv("SCORING_MODE", "single").lower() == "cascade":
+                result = await cascade_score(client, messages)
+            else:
+                result, completion = await call_llm("score_pitch_agent", lambda: client.chat.completions.create_with_completion(
+                    model=os.getenv("OPENAI_MODEL"),
+                    response_model=ScoreModel,
+                    temperature=0.2,
+                    messages=messages
+                ))
+                record_llm_usage("score_pitch_agent", completion)
         
         logger.info("Successfully received scores from OpenAI")
         logger.info(f"Scores generated - Overall: {result.overall}, Clarity: {result.clarity}, Differentiation: {result.differentiation}, Traction: {result.traction}, Scalability: {result.scalability}")
@@ -290,11 +329,141 @@ async def score_pitch_agent(state: State) -> Command[Literal["supervisor"]]:
             goto="supervisor",
             update={
                 "score": result,
-                "messages": state.get("messages", []) + [AIMessage(content=str(result))]
+                "completed": ["score_pitch_agent"]
             }
         )
         
     except Exception as e:
         logger.error(f"Error in score pitch agent: {str(e)}")
         logger.error("=== SCORE PITCH AGENT FAILED ===")
-        raise ValueError(f"Error in score pitch agent: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Error in score pitch agent: {str(e)}")
+
+
+# Fused Evaluation Agent - Generates feedback and scores in a single call
+async def fused_evaluation_agent(state: State) -> Command[Literal["__end__"]]:
+    """
+    Analyze and score pitch content in one structured-output call.
+    
+    Used by the fused workflow for full evaluations of a new deck, replacing the
+    supervisor/analysis/scoring round trips that each re-send the pitch text.
+    
+    Args:
+        state (State): Current application state with pitch_data field populated
+        
+    Returns:
+        Command: Updated state with feedback and scores and route to end
+    """
+    logger.info("=== FUSED EVALUATION AGENT STARTED ===")
+    
+    try:
+        pitch_data = pitch_store.get(state.get("pitch_ref"))
+        if not pitch_data:
+            logger.error("No pitch data found for the state's pitch_ref")
+            raise ValueError("No pitch data found in state")
+        
+        logger.info(f"Pitch data received - text length: {len(pitch_data.content)} characters")
+            
+        client = await get_openai_client()
+        logger.info(f"Sending fused evaluation request to OpenAI using model: {os.getenv('OPENAI_MODEL')}")
+        
+        messages = prompts.evaluation_messages(
+            prompts.FUSED_PROMPT,
+            prompts.pitch_content_message(pitch_data.content, pitch_data.features)
+        )
+        result, completion = await call_llm("fused_evaluation_agent", lambda: client.chat.completions.create_with_completion(
+            model=os.getenv("OPENAI_MODEL"),
+            response_model=FusedEvaluationModel,
+            temperature=0.2,
+            messages=messages
+        ))
+        record_llm_usage("fused_evaluation_agent", completion)
+        
+        logger.info(f"Fused evaluation received - Overall score: {result.score.overall}")
+        logger.info("=== FUSED EVALUATION AGENT COMPLETED SUCCESSFULLY ===")
+        
+        return Command(
+            goto=END,
+            update={
+                "feedback": result.feedback,
+                "score": result.score,
+                "completed": ["fused_evaluation_agent"]
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in fused evaluation agent: {str(e)}")
+        logger.error("=== FUSED EVALUATION AGENT FAILED ===")
+        raise ValueError(f"Error in fused evaluation agent: {str(e)}")
+
+
+# Investor Q&A Agent - Runs next to the graph, not as a graph node
+async def investor_qna_agent(pitch_data: PitchData, on_question: Optional[Callable[[QuestionItem], Awaitable[None]]] = None) -> List[QuestionItem]:
+    """
+    Generate the questions investors would ask about a pitch.
+    
+    Every topic of prompts.QNA_CATEGORIES is asked in a single streamed call,
+    so the deck is sent once. Each question is passed to `on_question` as
+    soon as it is parsed from the stream, to forward it to the client.
+    
+    Args:
+        pitch_data (PitchData): Pitch to question
+        on_question (Optional[Callable[[QuestionItem], Awaitable[None]]]): Called with every question as it arrives
+        
+    Returns:
+        List[QuestionItem]: Questions grouped by topic, at most QNA_QUESTIONS_PER_CATEGORY per topic
+        
+    Raises:
+        LLMUnavailableError: If the stream does not end in time
+    """
+    logger.info("=== INVESTOR QNA AGENT STARTED ===")
+    client = await get_openai_client()
+    num_questions = int(os.getenv("QNA_QUESTIONS_PER_CATEGORY", "3"))
+    
+    messages = prompts.evaluation_messages(
+        prompts.QNA_PROMPT,
+        prompts.qna_content_message(pitch_data.content, num_questions)
+    )
+    # Streamed responses carry no usage, so the Q&A has no llm.investor_qna_agent token counters
+    stream = stream_llm("investor_qna_agent", lambda: client.chat.completions.create_iterable(
+        model=os.getenv("OPENAI_MODEL_QNA") or os.getenv("OPENAI_MODEL"),
+        response_model=GeneratedQuestion,
+        temperature=0.4,
+        messages=messages
+    ))
+    
+    questions: List[QuestionItem] = []
+    per_category: Dict[str, int] = {}
+    async for question in stream:
+        per_category[question.category] = per_category.get(question.category, 0) + 1
+        if per_category[question.category] > num_questions:
+            continue
+        item = QuestionItem(**question.model_dump())
+        questions.append(item)
+        if on_question is not None:
+            await on_question(item)
+    
+    metrics.increment("qna.questions", len(questions))
+    logger.info(f"=== INVESTOR QNA AGENT COMPLETED with {len(questions)} questions ===")
+    return questions
+
+
+# Slide Suggestion Agent - Edit suggestions for a few slides, fanned out by SlideSuggestionService
+async def slide_suggestion_agent(slides_text: str) -> SlideBatchEditsModel:
+    """
+    Suggest edits to one slide or a small batch of slides.
+    
+    Args:
+        slides_text (str): Slides under their --- Slide N --- headers
+        
+    Returns:
+        SlideBatchEditsModel: Suggestions per slide number
+    """
+    client = await get_openai_client()
+    result, completion = await call_llm("slide_suggestion_agent", lambda: client.chat.completions.create_with_completion(
+        model=os.getenv("OPENAI_MODEL_SLIDES") or os.getenv("OPENAI_MODEL"),
+        response_model=SlideBatchEditsModel,
+        temperature=0.2,
+        messages=prompts.slide_suggestion_messages(slides_text)
+    ))
+    record_llm_usage("slide_suggestion_agent", completion)
+    return result
@@ -9,6 +9,8 @@ from app.schemas.pitch_schema import FeedbackModel, ScoreModel, PitchData
 from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletion
 import instructor
+from app.ai.llm_replay import wrap_for_replay
+from app.config.metrics import metrics
 from langgraph.graph import MessagesState
 
 
@@ -35,6 +37,33 @@ async def parse_openai_response(response: ChatCompletion) -> str:
     return response.choices[0].message.content
 
 
+def record_llm_usage(agent: str, completion: Optional[ChatCompletion]) -> None:
+    """
+    Record the token usage of one LLM call, including provider-side cached prompt tokens.
+    
+    Counters are kept per agent under `llm.<agent>.*` and exposed on /metrics.
+    
+    Args:
+        agent (str): Name of the calling agent
+        completion (Optional[ChatCompletion]): Raw completion returned with the structured response
+    """
+    usage = completion.usage if completion is not None else None
+    if usage is None:
+        return
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+
+    metrics.increment(f"llm.{agent}.calls")
+    metrics.increment(f"llm.{agent}.prompt_tokens", usage.prompt_tokens)
+    metrics.increment(f"llm.{agent}.cached_tokens", cached_tokens)
+    metrics.increment(f"llm.{agent}.completion_tokens", usage.completion_tokens)
+    logger.info(
+        f"LLM usage ({agent}): prompt {usage.prompt_tokens} tokens, cached {cached_tokens} "
+        f"({cached_tokens / max(usage.prompt_tokens, 1):.0%}), completion {usage.completion_tokens}"
+    )
+
+
 async def get_api_key() -> str:
     """
     Retrieve OpenAI API key from environment variables.
@@ -57,22 +86,37 @@ async def get_api_key() -> str:
         raise ConfigError(f"Failed to retrieve OpenAI API key: {str(e)}")
 
 
+# Shared client, so every agent call reuses the same HTTP connection pool
+_openai_client = None
+
+
 async def get_openai_client() -> AsyncOpenAI:
     """
-    Create and configure a LangChain OpenAI chat model.
+    Create and configure the instructor-patched OpenAI client, once per process.
+
+    The client is wrapped for record/replay when LLM_REPLAY_MODE is set.
 
     Returns:
-        ChatOpenAI: Configured LLM instance
+        AsyncOpenAI: Configured instructor client
 
     Raises:
         ConfigError: If API key cannot be loaded
     """
+    global _openai_client
+    if _openai_client is not None:
+        return _openai_client
+
     try:
-        api_key = await get_api_key()
+        if os.getenv("LLM_REPLAY_MODE", "off").lower() == "replay":
+            # Replayed calls never reach OpenAI
+            api_key = os.getenv("OPENAI_API_KEY") or "replay"
+        else:
+            api_key = await get_api_key()
         os.environ["OPENAI_API_KEY"] = api_key
         logger.info(f"OpenAI API key loaded successfully")
         client = instructor.from_openai(AsyncOpenAI(api_key=api_key))
-        return client
+        _openai_client = wrap_for_replay(client)
+        return _openai_client
     except Exception as e:
         logger.error(f"Failed to create LLM: {str(e)}")
         raise ConfigError(f"Failed to initialize language model: {str(e)}")
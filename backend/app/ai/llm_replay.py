@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Type
+from pydantic import BaseModel
+from openai.types.chat import ChatCompletion
+from app.config.logging_config import setup_logging
+
+# Set up logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class ReplayMissError(KeyError):
+    """Raised in replay mode when no fixture was recorded for a call"""
+    pass
+
+
+class FixtureStore:
+    """One JSON file per recorded LLM call, keyed by a hash of the request."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, kwargs: Dict[str, Any], response_model: Optional[Type[BaseModel]]) -> str:
+        """
+        Hash everything that influences the response of a call.
+
+        Args:
+            kwargs (Dict[str, Any]): Keyword arguments of the create call
+            response_model (Optional[Type[BaseModel]]): Structured output model
+
+        Returns:
+            str: Fixture key
+        """
+        request = {name: value for name, value in kwargs.items() if name not in ("response_model", "max_retries")}
+        if response_model is not None:
+            request["response_model"] = {
+                "name": response_model.__name__,
+                "schema": response_model.model_json_schema()
+            }
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path(key)):
+            return None
+        with open(self.path(key), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, key: str, fixture: Dict[str, Any]) -> None:
+        temp_path = f"{self.path(key)}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, indent=2)
+        os.replace(temp_path, self.path(key))
+
+
+class ReplayCompletions:
+    """
+    Record/replay wrapper around `client.chat.completions` of an instructor client.
+
+    In record mode every call goes to the live client and its structured
+    response, raw completion and latency are written to the fixture store.
+    In replay mode calls are answered from the store, either at the recorded
+    latency or immediately.
+    """
+
+    def __init__(self, completions, store: FixtureStore, mode: str, latency: str):
+        self._completions = completions
+        self.store = store
+        self.mode = mode
+        self.latency = latency
+
+    async def create(self, **kwargs) -> Any:
+        result, _ = await self._call(with_completion=False, **kwargs)
+        return result
+
+    async def create_with_completion(self, **kwargs) -> Tuple[Any, ChatCompletion]:
+        return await self._call(with_completion=True, **kwargs)
+
+    async def _call(self, with_completion: bool, **kwargs) -> Tuple[Any, Optional[ChatCompletion]]:
+        response_model = kwargs.get("response_model")
+        key = self.store.key(kwargs, response_model)
+
+        if self.mode == "replay":
+            fixture = self.store.load(key)
+            if fixture is None:
+                raise ReplayMissError(f"No recorded LLM response for key {key} (model {kwargs.get('model')})")
+            if self.latency == "recorded":
+                await asyncio.sleep(fixture["latency_ms"] / 1000)
+            result = response_model.model_validate(fixture["response"]) if response_model else fixture["response"]
+            completion = ChatCompletion.model_validate(fixture["completion"]) if fixture.get("completion") else None
+            logger.debug(f"Replayed LLM response {key[:12]}")
+            return result, completion
+
+        start = time.perf_counter()
+        completion = None
+        if with_completion or self.mode == "record":
+            result, completion = await self._completions.create_with_completion(**kwargs)
+        else:
+            result = await self._completions.create(**kwargs)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        if self.mode == "record":
+            self.store.save(key, {
+                "model": kwargs.get("model"),
+                "response_model": response_model.__name__ if response_model else None,
+                "response": result.model_dump(mode="json") if isinstance(result, BaseModel) else result,
+                "completion": completion.model_dump(mode="json") if completion is not None else None,
+                "latency_ms": round(latency_ms, 2),
+                "recorded_at": datetime.now(timezone.utc).isoformat()
+            })
+            logger.debug(f"Recorded LLM response {key[:12]} in {latency_ms:.0f} ms")
+        return result, completion
+
+    async def create_iterable(self, **kwargs) -> AsyncIterator[Any]:
+        """Streamed call yielding one `response_model` item at a time, replayed at the recorded arrival times."""
+        response_model = kwargs["response_model"]
+        key = self.store.key({**kwargs, "stream": True}, response_model)
+
+        if self.mode == "replay":
+            fixture = self.store.load(key)
+            if fixture is None:
+                raise ReplayMissError(f"No recorded LLM stream for key {key} (model {kwargs.get('model')})")
+            elapsed_ms = 0.0
+            for item, arrived_ms in zip(fixture["items"], fixture["arrivals_ms"]):
+                if self.latency == "recorded":
+                    await asyncio.sleep(max(0.0, arrived_ms - elapsed_ms) / 1000)
+                    elapsed_ms = arrived_ms
+                yield response_model.model_validate(item)
+            logger.debug(f"Replayed LLM stream {key[:12]}")
+            return
+
+        start = time.perf_counter()
+        items = []
+        arrivals_ms = []
+        async for item in self._completions.create_iterable(**kwargs):
+            items.append(item.model_dump(mode="json"))
+            arrivals_ms.append(round((time.perf_counter() - start) * 1000, 2))
+            yield item
+
+        if self.mode == "record":
+            self.store.save(key, {
+                "model": kwargs.get("model"),
+                "response_model": response_model.__name__,
+                "items": items,
+                "arrivals_ms": arrivals_ms,
+                "recorded_at": datetime.now(timezone.utc).isoformat()
+            })
+            logger.debug(f"Recorded LLM stream {key[:12]} of {len(items)} items")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._completions, name)
+
+
+class ReplayChat:
+    def __init__(self, completions: ReplayCompletions):
+        self.completions = completions
+
+
+class ReplayClient:
+    """Instructor client whose chat completions go through the fixture store."""
+
+    def __init__(self, client, mode: str, fixture_dir: str, latency: str = "recorded"):
+        self._client = client
+        self.chat = ReplayChat(ReplayCompletions(client.chat.completions, FixtureStore(fixture_dir), mode, latency))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def wrap_for_replay(client):
+    """
+    Wrap an instructor client according to LLM_REPLAY_MODE.
+
+    LLM_REPLAY_MODE: off (default), record or replay
+    LLM_REPLAY_DIR: fixture folder
+    LLM_REPLAY_LATENCY: recorded (default) or zero
+
+    Args:
+        client: Instructor client
+
+    Returns:
+        The client itself when replay is off, otherwise a ReplayClient
+    """
+    mode = os.getenv("LLM_REPLAY_MODE", "off").lower()
+    if mode == "off":
+        return client
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Invalid LLM_REPLAY_MODE: {mode}")
+
+    fixture_dir = os.getenv("LLM_REPLAY_DIR", "llm_fixtures")
+    latency = os.getenv("LLM_REPLAY_LATENCY", "recorded").lower()
+    logger.info(f"LLM calls in {mode} mode using fixtures in {fixture_dir} (latency: {latency})")
+    return ReplayClient(client, mode, fixture_dir, latency)
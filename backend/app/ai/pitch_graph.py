@@ -1,10 +1,15 @@
+import os
 import logging
+import functools
 from app.ai.config import setup_logging
-from app.ai.agents import supervisor, pitch_analysis_agent, score_pitch_agent
+from app.config.metrics import metrics
+from app.ai.agents import supervisor, pitch_analysis_agent, score_pitch_agent, fused_evaluation_agent
+from app.ai.routing import classify_user_query
+from app.ai.resilience import deadline_scope
+from app.ai.pitch_store import pitch_store
 from langgraph.graph import StateGraph, START
-from app.schemas.pitch_schema import PitchData, EvaluationResponse, State
+from app.schemas.pitch_schema import PitchData, EvaluationResponse, State, EvaluationKind
 from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import MessagesState
 
 
 
@@ -15,11 +20,22 @@ logger = logging.getLogger(__name__)
 # Initialize the memory saver
 memory = MemorySaver()
 
+
+def timed_node(name: str, node):
+    """Wrap a graph node so that every run is recorded under `node.<name>`."""
+    @functools.wraps(node)
+    async def wrapper(state):
+        with metrics.timer(f"node.{name}"):
+            return await node(state)
+    return wrapper
+
 class PitchGraph:
     def __init__(self):
         """Initialize the pitch workflow."""
         self.workflow = None
         self.compiled_app = None
+        self.fused_workflow = None
+        self.compiled_fused_app = None
         
         
     async def create_workflow(self) -> StateGraph:
@@ -27,9 +43,9 @@ class PitchGraph:
         workflow = StateGraph(State)
 
         # Add nodes - supervisor and agents
-        workflow.add_node("supervisor", supervisor)
-        workflow.add_node("pitch_analysis_agent", pitch_analysis_agent)
-        workflow.add_node("score_pitch_agent", score_pitch_agent)
+        workflow.add_node("supervisor", timed_node("supervisor", supervisor))
+        workflow.add_node("pitch_analysis_agent", timed_node("pitch_analysis_agent", pitch_analysis_agent))
+        workflow.add_node("score_pitch_agent", timed_node("score_pitch_agent", score_pitch_agent))
 
         # Start with supervisor
         workflow.add_edge(START, "supervisor")
@@ -37,6 +53,15 @@ class PitchGraph:
         self.workflow = workflow
         return workflow
     
+    async def create_fused_workflow(self) -> StateGraph:
+        """Create the single-call workflow that produces feedback and scores together."""
+        workflow = StateGraph(State)
+        workflow.add_node("fused_evaluation_agent", timed_node("fused_evaluation_agent", fused_evaluation_agent))
+        workflow.add_edge(START, "fused_evaluation_agent")
+
+        self.fused_workflow = workflow
+        return workflow
+    
     async def compile_workflow(self) -> None:
         """Compile the workflow for execution."""
         if not self.workflow:
@@ -46,56 +71,84 @@ class PitchGraph:
         # Use memory saver to prevent memory leaks in long-running workflows
         self.compiled_app = self.workflow.compile(checkpointer=memory)
         
+    def use_fused_workflow(self, pitch_data: PitchData) -> bool:
+        """
+        Decide whether a pitch can be evaluated with the fused workflow.
 
-    async def analyze_pitch(self, pitch_data: PitchData) -> EvaluationResponse: 
-        """Analyze a pitch and return the analysis results."""
-        if not self.workflow:
-            await self.create_workflow()
+        The fused workflow is enabled with EVALUATION_MODE=fused and only used
+        for full evaluations of a deck without a previous version, since
+        partial requests and incremental revisions need the per-agent prompts.
 
-        if not self.compiled_app:
-            await self.compile_workflow()
-        
-        logger.info("Analyzing pitch")
-        initial_state = {
-            "pitch_data": pitch_data,
+        Args:
+            pitch_data (PitchData): Pitch to evaluate
+
+        Returns:
+            bool: True when the fused workflow should be used
+        """
+        if os.getenv("EVALUATION_MODE", "multi_agent").lower() != "fused":
+            return False
+        if pitch_data.revision and (pitch_data.revision.previous_feedback or pitch_data.revision.previous_score):
+            return False
+        return classify_user_query(pitch_data.user_query) == EvaluationKind.FULL
+
+
+    def build_initial_state(self, pitch_data: PitchData) -> dict:
+        """
+        Build the initial graph state for a pitch.
+
+        The pitch is registered in the pitch store and only its handle goes into
+        the state; release it with `pitch_store.release(state["pitch_ref"])`
+        once the run is over.
+        """
+        return {
+            "pitch_ref": pitch_store.put(pitch_data),
             "user_query": pitch_data.user_query,
-            "messages": [],
-            "workflow_stage": None,
-            "next_step": None,
             "feedback": None,
-            "score": None
+            "score": None,
+            "completed": []
         }
+
+    async def analyze_pitch(self, pitch_data: PitchData) -> EvaluationResponse: 
+        """Analyze a pitch and return the analysis results."""
+        if self.use_fused_workflow(pitch_data):
+            if not self.fused_workflow:
+                await self.create_fused_workflow()
+            if not self.compiled_fused_app:
+                self.compiled_fused_app = self.fused_workflow.compile(checkpointer=memory)
+            app = self.compiled_fused_app
+            logger.info("Analyzing pitch with the fused workflow")
+        else:
+            if not self.workflow:
+                await self.create_workflow()
+            if not self.compiled_app:
+                await self.compile_workflow()
+            app = self.compiled_app
+            logger.info("Analyzing pitch")
+        initial_state = self.build_initial_state(pitch_data)
+        pitch_ref = initial_state["pitch_ref"]
         
+        # Run the workflow with a unique thread ID, deleted once the run is over
+        import uuid
+        thread_id = str(uuid.uuid4())
+        config = {"configurable": {"thread_id": thread_id}}
         try:
-            # Run the workflow with a unique thread ID to prevent memory leaks
-            # Each invocation gets its own thread to avoid state accumulation
-            import uuid
-            thread_id = str(uuid.uuid4())
-            config = {"configurable": {"thread_id": thread_id}}
-            
-            result = await self.compiled_app.ainvoke(initial_state, config=config)
+            # LLM calls of every node share the request deadline
+            with deadline_scope():
+                result = await app.ainvoke(initial_state, config=config)
             
-            # Create evaluation response from the result
-            evaluation_response = EvaluationResponse(
-                pitch=result.get("pitch_data"),
+            # Create evaluation response from the result; the pitch itself is
+            # not copied into it, the caller already holds it
+            return EvaluationResponse(
                 feedback=result.get("feedback"),
                 score=result.get("score")
             )
-            
-            # Clear references to prevent memory retention
-            initial_state.clear()
-            result = None
-            
-            return evaluation_response
         except Exception as e:
             logger.error(f"Error processing pitch: {str(e)}")
-            # Clean up state on error to prevent memory leaks
-            initial_state.clear()
             raise ValueError(f"Failed to process pitch: {str(e)}")
         finally:
-            # Ensure cleanup happens even if an exception occurs
-            if 'initial_state' in locals():
-                initial_state.clear()
+            # Checkpoints of finished runs are never resumed, drop them with the pitch handle
+            pitch_store.release(pitch_ref)
+            await memory.adelete_thread(thread_id)
 
 if __name__ == "__main__":
     import asyncio
@@ -0,0 +1,54 @@
+import uuid
+import threading
+from typing import Dict, Optional
+from app.schemas.pitch_schema import PitchData
+
+
+class PitchDataStore:
+    """
+    In-process registry of the pitches being evaluated, referenced from the graph state by handle.
+
+    The graph state only carries the handle, so the deck text, the structured
+    document and the revision context are neither copied into nor serialized
+    with every checkpoint. Handles are only valid in the process that created
+    them, for the duration of the graph run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pitches: Dict[str, PitchData] = {}
+
+    def put(self, pitch_data: PitchData) -> str:
+        """
+        Register a pitch for a graph run.
+
+        Args:
+            pitch_data (PitchData): Pitch to evaluate
+
+        Returns:
+            str: Handle to store in the graph state
+        """
+        handle = str(uuid.uuid4())
+        with self._lock:
+            self._pitches[handle] = pitch_data
+        return handle
+
+    def get(self, handle: Optional[str]) -> Optional[PitchData]:
+        """Pitch registered under a handle, None if unknown or released."""
+        if handle is None:
+            return None
+        with self._lock:
+            return self._pitches.get(handle)
+
+    def release(self, handle: str) -> None:
+        """Forget a pitch once its graph run is over."""
+        with self._lock:
+            self._pitches.pop(handle, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pitches)
+
+
+# Process-wide registry shared by all graph runs
+pitch_store = PitchDataStore()
@@ -0,0 +1,425 @@
+import os
+import time
+import asyncio
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+
+# Set up logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Share of the request SLA a single call of each agent may use. The supervisor
+# runs up to three times per evaluation, so its share is kept small.
+NODE_BUDGET_SHARES = {
+    "supervisor": 0.1,
+    "pitch_analysis_agent": 0.45,
+    "score_pitch_agent": 0.3,
+    "score_pitch_cheap": 0.15,
+    "fused_evaluation_agent": 0.8,
+    "investor_qna_agent": 0.45,
+    "slide_suggestion_agent": 0.3,
+}
+DEFAULT_BUDGET_SHARE = 0.3
+# Seconds a hedge delay is reused before the latency percentile is computed again
+HEDGE_DELAY_REFRESH_SECONDS = 5.0
+
+
+class LLMUnavailableError(Exception):
+    """Raised when an LLM call is not attempted or not answered in time"""
+    pass
+
+
+class DeadlineExceededError(LLMUnavailableError):
+    """Raised when the request deadline runs out, cutting a call's budget short"""
+    pass
+
+
+class UpstreamTimeoutError(LLMUnavailableError):
+    """Raised when the LLM does not answer within the agent's full budget"""
+    pass
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised when the circuit breaker of an agent rejects a call"""
+    pass
+
+
+class Deadline:
+    """Time budget of one evaluation request, split into per-node budgets."""
+
+    def __init__(self, seconds: float):
+        self.total = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_env(cls) -> "Deadline":
+        """Deadline of EVALUATION_SLA_SECONDS from now."""
+        return cls(float(os.getenv("EVALUATION_SLA_SECONDS", "90")))
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, 0 once it has passed."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def share(self, agent: str) -> float:
+        """The agent's share of the SLA, in seconds."""
+        return NODE_BUDGET_SHARES.get(agent, DEFAULT_BUDGET_SHARE) * self.total
+
+    def budget(self, agent: str) -> float:
+        """
+        Time a single call of an agent may take.
+
+        Args:
+            agent (str): Name of the calling agent
+
+        Returns:
+            float: The agent's share of the SLA, capped by the time remaining
+        """
+        return min(self.remaining(), self.share(agent))
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("evaluation_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the evaluation running in the current context, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float] = None):
+    """
+    Run the wrapped block under a request deadline.
+
+    An enclosing deadline is reused, so that the graph run of an evaluation
+    shares the budget already consumed by extraction and storage.
+
+    Args:
+        seconds (Optional[float]): SLA of the request, EVALUATION_SLA_SECONDS by default
+
+    Yields:
+        Deadline: The deadline in effect
+    """
+    deadline = current_deadline()
+    if deadline is not None:
+        yield deadline
+        return
+    deadline = Deadline(seconds) if seconds is not None else Deadline.from_env()
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failures in a row the circuit opens and calls are
+    rejected for `reset_seconds`. Then a single trial call is let through: its
+    success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now."""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            logger.info(f"Circuit breaker {self.name} half-open, letting a trial call through")
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info(f"Circuit breaker {self.name} closed")
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"Circuit breaker {self.name} opened after {self.failures} consecutive failures")
+                metrics.increment(f"llm.{self.name}.circuit_opened")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Let the next call through when a trial call ended without an outcome (cancelled, out of budget)."""
+        if self.state == "half_open":
+            self.state = "open"
+            self.opened_at = time.monotonic() - self.reset_seconds
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(agent: str) -> CircuitBreaker:
+    """Process-wide circuit breaker of an agent."""
+    breaker = _circuit_breakers.get(agent)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            agent,
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+        )
+        _circuit_breakers[agent] = breaker
+    return breaker
+
+
+def reset_circuit_breakers() -> None:
+    """Forget the state of every circuit breaker."""
+    _circuit_breakers.clear()
+
+
+_hedge_delays: Dict[str, Tuple[float, float]] = {}
+
+
+def reset_hedge_delays() -> None:
+    """Forget the hedge delays computed so far."""
+    _hedge_delays.clear()
+
+
+def hedge_delay(agent: str) -> Optional[float]:
+    """
+    Seconds to wait before sending a duplicate of a call still running.
+
+    The delay is the LLM_HEDGE_PERCENTILE latency of the agent's recent calls,
+    or LLM_HEDGE_DELAY_MS until LLM_HEDGE_MIN_SAMPLES calls have been measured.
+    It is recomputed at most every HEDGE_DELAY_REFRESH_SECONDS, since the
+    percentile sorts the whole latency series.
+
+    Args:
+        agent (str): Name of the calling agent
+
+    Returns:
+        Optional[float]: Delay in seconds, None when hedging is disabled
+    """
+    if os.getenv("LLM_HEDGE_ENABLED", "true").lower() != "true":
+        return None
+    now = time.monotonic()
+    cached = _hedge_delays.get(agent)
+    if cached is not None and now - cached[0] < HEDGE_DELAY_REFRESH_SECONDS:
+        return cached[1]
+    observed_ms = metrics.percentile(
+        f"llm.{agent}.latency",
+        float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+        min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+    )
+    delay_ms = observed_ms if observed_ms is not None else float(os.getenv("LLM_HEDGE_DELAY_MS", "8000"))
+    _hedge_delays[agent] = (now, delay_ms / 1000)
+    return delay_ms / 1000
+
+
+async def _timed_attempt(agent: str, call: Callable[[], Awaitable[T]]) -> T:
+    """Run one attempt and record its latency when it succeeds."""
+    start = time.perf_counter()
+    result = await call()
+    metrics.observe(f"llm.{agent}.latency", (time.perf_counter() - start) * 1000)
+    return result
+
+
+def _budget_timeout(agent: str, timeout: float, clipped: bool) -> LLMUnavailableError:
+    """
+    Error of a call that used up its budget without an answer.
+
+    Only a budget cut short by the request deadline is the request's own
+    doing; an upstream that does not answer within the agent's full share of
+    the SLA is failing, and is counted against the circuit breaker.
+    """
+    if clipped:
+        return DeadlineExceededError(f"{agent} did not answer within the {timeout:.1f}s left in the request deadline")
+    return UpstreamTimeoutError(f"{agent} did not answer within its {timeout:.1f}s budget")
+
+
+async def _hedged(agent: str, call: Callable[[], Awaitable[T]], timeout: float, clipped: bool = False) -> T:
+    """
+    Run a call with at most LLM_HEDGE_MAX duplicates, returning the first valid result.
+
+    A duplicate is sent when the running attempts are slower than the hedge
+    delay, or right away when they all failed. Attempts still running once a
+    result is in are cancelled. When the budget runs out after an attempt
+    failed, that upstream error is raised rather than a timeout.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    end = start + timeout
+    delay = hedge_delay(agent)
+    max_hedges = int(os.getenv("LLM_HEDGE_MAX", "1")) if delay is not None else 0
+
+    attempts = {asyncio.create_task(_timed_attempt(agent, call)): 0}
+    pending = set(attempts)
+    hedges = 0
+    last_error: Optional[BaseException] = None
+    try:
+        while True:
+            can_hedge = hedges < max_hedges
+            wake_at = min(end, start + delay * (hedges + 1)) if can_hedge else end
+            if pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, wake_at - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if attempts[task] > 0:
+                            metrics.increment(f"llm.{agent}.hedge_wins")
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"LLM call of {agent} failed: {str(last_error)}")
+
+            if loop.time() >= end:
+                if last_error is not None:
+                    raise last_error
+                raise _budget_timeout(agent, timeout, clipped)
+            if not pending and not can_hedge:
+                raise last_error
+            if can_hedge and (not pending or loop.time() >= wake_at):
+                hedges += 1
+                metrics.increment(f"llm.{agent}.hedges")
+                logger.info(f"Hedging LLM call of {agent} after {loop.time() - start:.2f}s")
+                task = asyncio.create_task(_timed_attempt(agent, call))
+                attempts[task] = hedges
+                pending.add(task)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call_llm(agent: str, call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Make an LLM call within the agent's deadline budget, hedged and behind its circuit breaker.
+
+    Args:
+        agent (str): Name of the calling agent, used for budgets, metrics and the breaker
+        call (Callable[[], Awaitable[T]]): Starts one attempt of the call; invoked again for hedges
+
+    Returns:
+        T: Result of the first attempt to succeed
+
+    Raises:
+        CircuitOpenError: If the agent's circuit breaker is open
+        DeadlineExceededError: If the request deadline leaves no time, or cuts the call short
+        UpstreamTimeoutError: If no attempt answers within the agent's full budget
+        Exception: The error of the last attempt when every attempt failed
+    """
+    breaker = get_circuit_breaker(agent)
+    if not breaker.allow():
+        metrics.increment(f"llm.{agent}.rejected")
+        raise CircuitOpenError(f"Circuit breaker of {agent} is open")
+
+    deadline = current_deadline() or Deadline.from_env()
+    timeout = deadline.budget(agent)
+    if timeout <= 0:
+        metrics.increment(f"llm.{agent}.timeouts")
+        breaker.release_trial()
+        raise DeadlineExceededError(f"No time left in the request deadline for {agent}")
+
+    try:
+        result = await _hedged(agent, call, timeout, clipped=timeout < deadline.share(agent))
+    except DeadlineExceededError:
+        # The request ran out of its own budget: not evidence that the upstream is failing
+        metrics.increment(f"llm.{agent}.timeouts")
+        breaker.release_trial()
+        raise
+    except UpstreamTimeoutError:
+        metrics.increment(f"llm.{agent}.timeouts")
+        breaker.record_failure()
+        raise
+    except asyncio.CancelledError:
+        metrics.increment(f"llm.{agent}.cancelled")
+        breaker.release_trial()
+        raise
+    except Exception:
+        metrics.increment(f"llm.{agent}.errors")
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+async def stream_llm(agent: str, start: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+    """
+    Iterate over a streamed LLM call within the agent's deadline budget, behind its circuit breaker.
+
+    Streams are not hedged: a duplicate would repeat the items already handed
+    to the caller.
+
+    Args:
+        agent (str): Name of the calling agent, used for budgets, metrics and the breaker
+        start (Callable[[], AsyncIterator[T]]): Starts the streamed call
+
+    Yields:
+        T: Items of the stream as soon as they are parsed
+
+    Raises:
+        CircuitOpenError: If the agent's circuit breaker is open
+        DeadlineExceededError: If the request deadline leaves no time, or cuts the stream short
+        UpstreamTimeoutError: If the stream does not end within the agent's full budget
+        Exception: The error of the call
+    """
+    breaker = get_circuit_breaker(agent)
+    if not breaker.allow():
+        metrics.increment(f"llm.{agent}.rejected")
+        raise CircuitOpenError(f"Circuit breaker of {agent} is open")
+
+    deadline = current_deadline() or Deadline.from_env()
+    timeout = deadline.budget(agent)
+    if timeout <= 0:
+        metrics.increment(f"llm.{agent}.timeouts")
+        breaker.release_trial()
+        raise DeadlineExceededError(f"No time left in the request deadline for {agent}")
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    end = started + timeout
+    iterator = start().__aiter__()
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(iterator.__anext__(), max(0.0, end - loop.time()))
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                raise _budget_timeout(agent, timeout, timeout < deadline.share(agent))
+            yield item
+    except DeadlineExceededError:
+        metrics.increment(f"llm.{agent}.timeouts")
+        breaker.release_trial()
+        raise
+    except UpstreamTimeoutError:
+        metrics.increment(f"llm.{agent}.timeouts")
+        breaker.record_failure()
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        # Also raised when the caller stops iterating early
+        metrics.increment(f"llm.{agent}.cancelled")
+        breaker.release_trial()
+        raise
+    except Exception:
+        metrics.increment(f"llm.{agent}.errors")
+        breaker.record_failure()
+        raise
+    finally:
+        close = getattr(iterator, "aclose", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception:
+                pass
+    metrics.observe(f"llm.{agent}.latency", (loop.time() - started) * 1000)
+    breaker.record_success()
@@ -0,0 +1,41 @@
+import re
+from typing import Optional
+from app.schemas.pitch_schema import EvaluationKind
+
+# Phrases asking for scores only, e.g. "provide just the score", "score only", "what's the score"
+SCORING_ONLY_PATTERN = re.compile(
+    r"\b(just|only)\b.*\b(score|scores|scoring|rating)\b|\b(score|scores|scoring|rating)\b\s+only\b|\bwhat'?s the score\b",
+    re.IGNORECASE
+)
+
+# Phrases asking for feedback only, e.g. "just the feedback", "analysis only"
+ANALYSIS_ONLY_PATTERN = re.compile(
+    r"\b(just|only)\b.*\b(feedback|analysis|analyze|critique|suggestions)\b|\b(feedback|analysis)\b\s+only\b",
+    re.IGNORECASE
+)
+
+
+def classify_user_query(user_query: Optional[str]) -> EvaluationKind:
+    """
+    Classify what a user query asks for without calling the LLM.
+
+    Mirrors the routing cases of the supervisor prompt: explicit "only"
+    requests for scoring or analysis, otherwise (including ambiguous or empty
+    queries) a full evaluation.
+
+    Args:
+        user_query (Optional[str]): The user's query
+
+    Returns:
+        EvaluationKind: Requested evaluation kind
+    """
+    if not user_query:
+        return EvaluationKind.FULL
+
+    wants_scores_only = SCORING_ONLY_PATTERN.search(user_query) is not None
+    wants_analysis_only = ANALYSIS_ONLY_PATTERN.search(user_query) is not None
+    if wants_scores_only and not wants_analysis_only:
+        return EvaluationKind.SCORING_ONLY
+    if wants_analysis_only and not wants_scores_only:
+        return EvaluationKind.ANALYSIS_ONLY
+    return EvaluationKind.FULL
@@ -0,0 +1,232 @@
+import os
+import math
+import time
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from app.ai.routing import classify_user_query, EvaluationKind
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Priority classes of evaluation requests, served in this order
+PRIORITY_CLASSES = ["interactive_scoring", "interactive", "batch_scoring", "batch"]
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an evaluation request is turned away by admission control"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """A request waiting for an evaluation slot."""
+
+    def __init__(self, priority: str, sequence: int, future: asyncio.Future):
+        self.priority = priority
+        self.rank = PRIORITY_CLASSES.index(priority)
+        self.sequence = sequence
+        self.future = future
+
+    def sort_key(self):
+        return (self.rank, self.sequence)
+
+
+class AdmissionController:
+    """
+    Cap on concurrent evaluations with a bounded, priority-ordered wait queue.
+
+    Up to `max_concurrent` evaluations run at once. Further requests wait in a
+    queue of at most `max_queue` entries, served by priority class then arrival.
+    When the queue is full, a request of a higher class takes the place of the
+    lowest queued one, which is shed; otherwise it is rejected right away. A
+    request waiting longer than `max_wait_seconds` gives up. Rejections carry a
+    Retry-After estimated from the recent evaluation times.
+
+    Only the evaluations go through the controller: health checks and reads
+    never wait behind them.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, max_wait_seconds: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.active = 0
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "8")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+            max_wait_seconds=float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "30"))
+        )
+
+    def retry_after(self) -> int:
+        """
+        Seconds after which a rejected request is likely to be admitted.
+
+        The queue ahead drains max_concurrent evaluations per typical
+        evaluation time (p50 of the recent slot hold times, or
+        ADMISSION_RETRY_AFTER_SECONDS before any was measured).
+
+        Returns:
+            int: Whole seconds, at least 1
+        """
+        typical_ms = metrics.percentile("admission.held", 50)
+        typical = typical_ms / 1000 if typical_ms is not None else float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "10"))
+        rounds = (len(self._waiters) + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(typical * rounds))
+
+    def _reject(self, status_code: int, reason: str, detail: str, priority: str) -> AdmissionRejectedError:
+        metrics.increment(f"admission.rejected.{reason}")
+        metrics.increment(f"admission.rejected.{reason}.{priority}")
+        return AdmissionRejectedError(status_code, detail, self.retry_after())
+
+    async def acquire(self, priority: str) -> None:
+        """
+        Wait for an evaluation slot.
+
+        Args:
+            priority (str): Priority class of the request, one of PRIORITY_CLASSES
+
+        Raises:
+            AdmissionRejectedError: 429 when the queue is full, 503 when the
+                request was shed for a higher class or waited too long
+        """
+        start = time.perf_counter()
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            metrics.increment("admission.admitted")
+            metrics.observe(f"admission.wait.{priority}", 0.0)
+            return
+
+        waiter = _Waiter(priority, next(self._sequence), asyncio.get_running_loop().create_future())
+        if len(self._waiters) >= self.max_queue:
+            lowest = max(self._waiters, key=_Waiter.sort_key, default=None)
+            if lowest is None or lowest.sort_key() < waiter.sort_key():
+                raise self._reject(429, "queue_full", "Too many evaluations in progress, please retry later", priority)
+            # Shed the lowest queued request in favour of this one
+            self._waiters.remove(lowest)
+            lowest.future.set_exception(
+                self._reject(503, "shed", "Evaluation request shed for higher priority work, please retry later", lowest.priority)
+            )
+            logger.info(f"Shed a queued {lowest.priority} evaluation for a {priority} one")
+
+        self._waiters.append(waiter)
+        metrics.increment("admission.queued")
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.exception():
+                # Granted at the last moment: keep the slot
+                pass
+            else:
+                self._discard(waiter)
+                raise self._reject(503, "timeout", "Timed out waiting for an evaluation slot, please retry later", priority)
+        except asyncio.CancelledError:
+            # Client gone while queued: hand over a slot granted in the meantime
+            if waiter.future.done() and not waiter.future.cancelled() and not waiter.future.exception():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        finally:
+            metrics.observe(f"admission.wait.{priority}", (time.perf_counter() - start) * 1000)
+        metrics.increment("admission.admitted")
+
+    def _discard(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+    def release(self) -> None:
+        """Free an evaluation slot, handing it to the first queued request if any."""
+        while self._waiters:
+            waiter = min(self._waiters, key=_Waiter.sort_key)
+            self._waiters.remove(waiter)
+            if not waiter.future.done():
+                # The slot passes to the waiter, `active` stays the same
+                waiter.future.set_result(True)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current occupancy of the controller, exposed on /metrics."""
+        queued = {priority: 0 for priority in PRIORITY_CLASSES}
+        for waiter in self._waiters:
+            queued[waiter.priority] += 1
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "queued": queued,
+            "max_queue": self.max_queue,
+        }
+
+
+def priority_class(user_query: Optional[str], priority: Optional[str]) -> str:
+    """
+    Priority class of an evaluation request.
+
+    Args:
+        user_query (Optional[str]): The user's query; scoring-only requests are cheaper and served first
+        priority (Optional[str]): X-Priority header, "interactive" (default) or "batch"
+
+    Returns:
+        str: One of PRIORITY_CLASSES
+    """
+    base = "batch" if (priority or "").strip().lower() == "batch" else "interactive"
+    if classify_user_query(user_query) == EvaluationKind.SCORING_ONLY:
+        return f"{base}_scoring"
+    return base
+
+
+# Process-wide controller of the evaluation endpoint
+evaluation_admission = AdmissionController.from_env()
+
+
+@asynccontextmanager
+async def evaluation_slot(user_query: Optional[str], priority: Optional[str]):
+    """
+    Hold an evaluation slot while the block runs.
+
+    Only the request that leads a new evaluation enters this: retries
+    answered from the idempotency store and duplicates joining an evaluation
+    in flight do not need a slot of their own.
+
+    Args:
+        user_query (Optional[str]): The user's query, used to classify the request
+        priority (Optional[str]): X-Priority header, "interactive" or "batch"
+
+    Raises:
+        HTTPException: 429 or 503 with a Retry-After header when the request is not admitted
+    """
+    request_class = priority_class(user_query, priority)
+    try:
+        await evaluation_admission.acquire(request_class)
+    except AdmissionRejectedError as rejected:
+        logger.warning(f"Rejected {request_class} evaluation with {rejected.status_code}: {rejected.detail}")
+        raise HTTPException(
+            status_code=rejected.status_code,
+            detail=rejected.detail,
+            headers={"Retry-After": str(rejected.retry_after)}
+        )
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe("admission.held", (time.perf_counter() - start) * 1000)
+        evaluation_admission.release()
@@ -2,7 +2,9 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routers import pitch_api
+from app.api.admission import evaluation_admission
 from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
 
 # Setup logging
 setup_logging()
@@ -38,6 +40,11 @@ async def health():
     logger.debug("Health check endpoint called")
     return {"status": "healthy and running"}
 
+@app.get("/metrics")
+async def get_metrics():
+    logger.debug("Metrics endpoint called")
+    return {**metrics.snapshot(), "admission": evaluation_admission.stats()}
+
 @app.get("/")
 async def root():
     logger.debug("Root endpoint called")
@@ -46,6 +53,18 @@ async def root():
         "version": "0.1.0",
         "endpoints": [
             {"path": "/evaluate-pitch", "method": "POST", "description": "Upload and analyze a pitch deck"},
-            {"path": "/health", "method": "GET", "description": "Check the health of the API"}
+            {"path": "/prescore", "method": "POST", "description": "Instant provisional scores of a pitch deck, without LLM calls"},
+            {"path": "/pitches", "method": "GET", "description": "Paginated list of pitches with filters and optional fields"},
+            {"path": "/pitches/{pitch_id}", "method": "GET", "description": "Status and results of a pitch evaluation"},
+            {"path": "/pitches/{pitch_id}/similar", "method": "GET", "description": "Most similar evaluated pitches and their scores"},
+            {"path": "/pitches/{pitch_id}/content", "method": "GET", "description": "Extracted text of a pitch deck"},
+            {"path": "/pitches/{pitch_id}/questions", "method": "GET", "description": "Investor questions generated for a pitch"},
+            {"path": "/pitches/{pitch_id}/simulate-qna", "method": "POST", "description": "Stream mock investor questions for a pitch"},
+            {"path": "/pitches/{pitch_id}/slide-suggestions", "method": "POST", "description": "Stream edit suggestions for every slide of a deck"},
+            {"path": "/pitches/{pitch_id}/percentiles", "method": "GET", "description": "Percentile rank of every score of a pitch"},
+            {"path": "/scores/percentile", "method": "GET", "description": "Percentile rank of any score"},
+            {"path": "/leaderboard", "method": "GET", "description": "Best scored pitches"},
+            {"path": "/health", "method": "GET", "description": "Check the health of the API"},
+            {"path": "/metrics", "method": "GET", "description": "Counters and per-stage latency percentiles"}
         ]
     }
@@ -0,0 +1,53 @@
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable
+from fastapi import Request
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client of a request went away before its response was ready"""
+    pass
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[Any]) -> Any:
+    """
+    Await a long-running request handler step, cancelling it if the client disconnects.
+
+    The connection is polled every DISCONNECT_POLL_SECONDS while the step runs.
+
+    Args:
+        request (Request): Incoming request, its body already read
+        awaitable (Awaitable[Any]): Step to run
+
+    Returns:
+        Any: Result of the step
+
+    Raises:
+        ClientDisconnectedError: If the client went away first
+    """
+    poll_seconds = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info(f"Client disconnected from {request.url.path}, cancelling the request")
+                metrics.increment("requests.disconnected")
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise ClientDisconnectedError(f"Client disconnected from {request.url.path}")
+    finally:
+        if not task.done():
+            task.cancel()
@@ -1,13 +1,27 @@
 import os
+import json
+import asyncio
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends, Header, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional, Union
+from datetime import datetime
 from app.services.file_service import FileService
-from app.schemas.pitch_schema import PitchResponse, PitchStatus, PitchCreate, EvaluationResponse, FeedbackResponse, PitchAction, PitchData
+from app.schemas.pitch_schema import PitchResponse, PitchStatus, PitchCreate, EvaluationResponse, FeedbackResponse, PitchAction, PitchData, EvaluationRequest, SimilarPitch, SimilarPitchesResponse, EvaluationQueuedResponse, PitchStatusResponse, PitchSummary, PitchListResponse, PitchContentResponse, ScorePercentile, PitchPercentilesResponse, LeaderboardEntry, LeaderboardResponse, QuestionsResponse, PreScoreResponse
 from app.config.logging_config import setup_logging
-from app.services.db_actions import DatabaseActions
-from app.ai.pitch_graph import PitchGraph
+from app.config.metrics import metrics
+from app.services.evaluation_service import EvaluationService
+from app.services.db_actions import DatabaseActions, LIST_OPTIONAL_COLUMNS, encode_cursor, decode_cursor
+from app.services.content_store import EXCERPT_CHARS
+from app.services.score_stats import ScoreStatsService, SCORE_DIMENSIONS
+from app.services.request_coalescer import evaluation_coalescer, idempotency_store, evaluation_key, IdempotencyConflictError
+from app.api.disconnect import cancel_on_disconnect, ClientDisconnectedError
+from app.api.admission import evaluation_slot
+from app.ai.agents import investor_qna_agent
+from app.ai.resilience import deadline_scope
+from app.services.slide_suggestions import SlideSuggestionService
+from app.services.text_normalizer import TextNormalizer
+from app.services.prescorer import PitchPreScorer
 
 # Set up logging
 setup_logging()
@@ -15,114 +29,639 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/evaluate-pitch", response_model=EvaluationResponse)
+@router.post("/evaluate-pitch", response_model=Union[EvaluationResponse, EvaluationQueuedResponse])
 async def evaluate_pitch(
+    http_request: Request,
+    response: Response,
     file: UploadFile = File(...),
     title: str = Form(...),
     description: Optional[str] = Form(None),
     user_query: Optional[str] = Form(None),
+    parent_pitch_id: Optional[str] = Form(None),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    priority: Optional[str] = Header(None, alias="X-Priority"),
 ):
     """
     Endpoint to upload and evaluate a pitch document.
     
+    Identical submissions in flight at the same time (same file, title, query
+    and model configuration) share a single evaluation. Retries sending the
+    same Idempotency-Key get the stored result without a new evaluation.
+    When the client disconnects, the evaluation is cancelled unless another
+    identical submission still waits for it.
+    
+    Uploads start a new deck unless parent_pitch_id names the pitch they
+    revise: the upload then becomes the next version of that deck and only
+    the slides changed since the parent are re-evaluated.
+    
+    New evaluations go through admission control: when all evaluation slots
+    are busy the request waits in a bounded queue, ordered by priority class
+    (X-Priority header "interactive" or "batch", scoring-only queries first),
+    and gets a 429 or 503 with Retry-After when it cannot be admitted.
+    Stored results and joins of an evaluation in flight skip admission.
+    
+    With EVALUATION_EXECUTION=queue the pitch is only stored and queued: the
+    response is 202 with the pitch ID, and a worker (backend/worker.py) runs
+    the evaluation. Poll GET /pitches/{pitch_id} for the results.
+    
     Args:
         file: The pitch document file (PDF, PPTX, DOCX, TXT)
         title: Title of the pitch
         description: Optional description of the pitch
         user_query: Optional user query to evaluate / score the pitch
+        parent_pitch_id: Optional ID of the pitch this upload is a new version of
+        idempotency_key: Optional Idempotency-Key header for safe retries
+        priority: Optional X-Priority header, "interactive" or "batch"
     
     Returns:
-        PitchResponse with the created pitch details
+        EvaluationResponse with the feedback and scores of the pitch, or
+        EvaluationQueuedResponse when evaluations run on queue workers
     """
     try:
-        # Use FileService to handle file upload
-        file_service = FileService()
-        file_content, _ = await file_service.extract_text_from_upload(file)
-        logger.info(f"File content: {file_content}")
-        file_path, file_type = await file_service.save_upload_file(file)
-        logger.info(f"File uploaded successfully to {file_path}")
-        
-        # Create pitch data object
-        new_pitch_data = PitchCreate(
+        request = EvaluationRequest(
+            file_content=await file.read(),
+            filename=file.filename,
+            content_type=file.content_type,
             title=title,
             description=description,
-            file_type=file_type,
-            file_content=file_content
+            user_query=user_query,
+            parent_pitch_id=parent_pitch_id
+        )
+        request_key = evaluation_key(request)
+        
+        if idempotency_key:
+            try:
+                stored_response = idempotency_store.get(idempotency_key, request_key)
+            except IdempotencyConflictError as conflict:
+                raise HTTPException(status_code=422, detail=str(conflict))
+            if stored_response is not None:
+                logger.info(f"Returning stored result for Idempotency-Key {idempotency_key}")
+                response.headers["Idempotent-Replayed"] = "true"
+                return stored_response
+        
+        if os.getenv("EVALUATION_EXECUTION", "inline").lower() == "queue":
+            pitch = await EvaluationService().submit(request)
+            queued_response = EvaluationQueuedResponse(
+                pitch_id=pitch.id,
+                status=pitch.status,
+                status_url=f"/pitches/{pitch.id}"
+            )
+            if idempotency_key:
+                idempotency_store.put(idempotency_key, request_key, queued_response)
+            response.status_code = 202
+            return queued_response
+        
+        async def admitted_evaluation():
+            # Only the request leading a new evaluation takes a slot
+            async with evaluation_slot(user_query, priority):
+                return await EvaluationService().evaluate(request)
+        
+        evaluation_response, coalesced = await cancel_on_disconnect(
+            http_request,
+            evaluation_coalescer.run(request_key, admitted_evaluation)
+        )
+        if coalesced:
+            response.headers["X-Coalesced"] = "true"
+        
+        if idempotency_key:
+            idempotency_store.put(idempotency_key, request_key, evaluation_response)
+        return evaluation_response
+    except ClientDisconnectedError:
+        # Nobody is left to read the response
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error processing pitch upload: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while processing your pitch. Please try again later."
+        )
+
+@router.post("/prescore", response_model=PreScoreResponse)
+async def prescore_pitch(file: UploadFile = File(...)):
+    """
+    Endpoint to get provisional scores of a pitch document without any LLM call.
+    
+    The deck is extracted and scored locally from the figures and sections
+    found in its text (revenue, growth, users, market size, competition,
+    team, slide coverage, readability). Nothing is stored; use
+    /evaluate-pitch for the agents' evaluation.
+    
+    Args:
+        file: The pitch document file (PDF, PPTX, DOCX, TXT)
+    
+    Returns:
+        PreScoreResponse with the provisional scores and the deck features
+    """
+    try:
+        file_service = FileService()
+        file_type = file_service.get_file_type(file.filename)
+        with metrics.timer("stage.extract"):
+            document = await file_service.extract_document_from_content(await file.read(), file_type)
+        document, _ = await asyncio.to_thread(TextNormalizer().normalize, document)
+        with metrics.timer("stage.prescore"):
+            score, features, elapsed_ms = PitchPreScorer().prescore(document)
+        return PreScoreResponse(score=score, features=features, elapsed_ms=round(elapsed_ms, 2))
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error pre-scoring pitch upload: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while pre-scoring your pitch."
         )
+
+@router.get("/pitches", response_model=PitchListResponse, response_model_exclude_unset=True)
+async def list_pitches(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    status: Optional[PitchStatus] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
+    min_score: Optional[float] = Query(None, ge=0, le=10),
+    score_dimension: str = Query("overall", description="Dimension min_score applies to: clarity, differentiation, traction, scalability or overall"),
+    fields: Optional[str] = Query(None, description="Comma-separated optional fields: score, feedback, elevator_pitch (first 500 characters of the deck text)"),
+):
+    """
+    Endpoint to list pitches, newest first, one page at a time.
+    
+    Pages are chained with cursors rather than offsets: pass the next_cursor
+    of a page to get the following one. Only the summary columns are read by
+    default, the large feedback fields are returned when listed in `fields`.
+    `elevator_pitch` is the opening of the deck text (first 500 characters),
+    read from the content store for the whole page at once; the full text
+    is served by GET /pitches/{pitch_id}/content.
+    
+    Args:
+        limit: Page size
+        cursor: Cursor of the page to get, from the previous response
+        status: Only pitches with this status
+        created_after: Only pitches created at or after this time (UTC when naive)
+        created_before: Only pitches created before this time (UTC when naive)
+        min_score: Only pitches with at least this score
+        score_dimension: Score dimension of min_score
+        fields: Optional fields to include
+    
+    Returns:
+        PitchListResponse with the page of pitches and the cursor of the next page
+    """
+    try:
+        requested_fields = [field.strip() for field in (fields or "").split(",") if field.strip()]
+        unknown_fields = [field for field in requested_fields if field not in LIST_OPTIONAL_COLUMNS]
+        if unknown_fields:
+            raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown_fields)}")
+        if score_dimension not in SCORE_DIMENSIONS:
+            raise HTTPException(status_code=422, detail=f"Unknown dimension: {score_dimension}")
+        try:
+            position = decode_cursor(cursor) if cursor else None
+        except ValueError as invalid:
+            raise HTTPException(status_code=400, detail=str(invalid))
+        
+        evaluation_service = EvaluationService()
+        with metrics.timer("pitches.list"):
+            # One extra row tells whether there is a next page
+            rows = await evaluation_service.db_actions.list_pitches(
+                limit + 1,
+                cursor=position,
+                status=status.value if status else None,
+                created_after=created_after,
+                created_before=created_before,
+                min_score=min_score,
+                score_dimension=score_dimension,
+                fields=requested_fields
+            )
         
-        # Store in database using db_actions service
-        db_actions = DatabaseActions()
-        new_pitch = await db_actions.create_pitch(new_pitch_data, file_path)
+        versioning = evaluation_service.versioning
+        excerpts = {}
+        if "elevator_pitch" in requested_fields:
+            excerpts = await evaluation_service.content_store.get_excerpts(row["contentHash"] for row in rows[:limit])
+        pitches = []
+        for row in rows[:limit]:
+            optional = {}
+            if "score" in requested_fields:
+                optional["score"] = versioning.score_from_json(row["scores"], row["overallScore"])
+            if "feedback" in requested_fields:
+                optional["feedback"] = versioning.feedback_from_json(row["suggestions"])
+            if "elevator_pitch" in requested_fields:
+                legacy_text = row["elevatorPitch"]
+                optional["elevator_pitch"] = excerpts.get(row["contentHash"]) or (legacy_text[:EXCERPT_CHARS] if legacy_text else None)
+            pitches.append(PitchSummary(
+                pitch_id=row["id"],
+                title=row["title"],
+                status=row["status"],
+                version=row["version"],
+                file_type=row["fileType"],
+                overall_score=row["overallScore"],
+                created_at=row["createdAt"],
+                updated_at=row["updatedAt"],
+                **optional
+            ))
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last["createdAt"], last["id"])
+        return PitchListResponse(pitches=pitches, next_cursor=next_cursor)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error listing pitches: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while listing pitches."
+        )
 
-        pitch_graph = PitchGraph()
-        update_pitch_status = await db_actions.update_pitch_status(new_pitch.id, PitchStatus.PROCESSING)
-        logger.info(f"Pitch status updated to: {update_pitch_status}")
+@router.get("/pitches/{pitch_id}", response_model=PitchStatusResponse)
+async def get_pitch_status(pitch_id: str):
+    """
+    Endpoint to get the status of a pitch evaluation and, once completed, its results.
+    
+    Args:
+        pitch_id: The ID of the pitch
+    
+    Returns:
+        PitchStatusResponse with the evaluation status, attempts and results
+    """
+    try:
+        evaluation_service = EvaluationService()
+        pitch = await evaluation_service.db_actions.get_pitch(pitch_id)
+        if not pitch:
+            raise HTTPException(status_code=404, detail="Pitch not found")
         
-        # Create PitchData for analysis with user query
-        analysis_pitch_data = PitchData(
-            pitch_text=file_content,
-            user_query=user_query
+        return PitchStatusResponse(
+            pitch_id=pitch.id,
+            title=pitch.title,
+            status=pitch.status,
+            version=pitch.version,
+            attempts=pitch.attempts,
+            last_error=pitch.lastError,
+            feedback=evaluation_service.versioning.parse_feedback(pitch.feedback),
+            score=evaluation_service.versioning.parse_score(pitch.feedback),
+            created_at=pitch.createdAt,
+            updated_at=pitch.updatedAt
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error retrieving pitch {pitch_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while retrieving the pitch."
         )
+
+@router.get("/pitches/{pitch_id}/similar", response_model=SimilarPitchesResponse)
+async def get_similar_pitches(pitch_id: str, k: int = Query(5, ge=1, le=50)):
+    """
+    Endpoint to find the evaluated pitches most similar to a pitch.
+    
+    Args:
+        pitch_id: The ID of the pitch
+        k: Number of similar pitches to return
+    
+    Returns:
+        SimilarPitchesResponse with the similar pitches and their scores, most similar first
+    """
+    try:
+        evaluation_service = EvaluationService()
+        vector_index = evaluation_service.vector_index
+        embedding = vector_index.get_vector(pitch_id)
+        if embedding is None:
+            raise HTTPException(status_code=404, detail="Pitch not found in the similarity index")
         
-        evaluation_response = await pitch_graph.analyze_pitch(analysis_pitch_data)
-        logger.info(f"Evaluation response: {evaluation_response}")
+        with metrics.timer("similarity.search"):
+            matches = vector_index.search(embedding, k, exclude_ids=[pitch_id])
+        pitches = await evaluation_service.db_actions.get_pitches_by_ids([match_id for match_id, _ in matches])
+        pitches_by_id = {pitch.id: pitch for pitch in pitches}
         
-        # Update database with feedback and score results separately
-        if evaluation_response.feedback:
-            try:
-                await db_actions.update_pitch_feedback_and_score(
-                    pitch_id=new_pitch.id,
-                    feedback=evaluation_response.feedback,
-                    score=None
-                )
-                logger.info(f"Updated feedback for pitch {new_pitch.id}")
-            except Exception as db_error:
-                logger.error(f"Failed to update pitch feedback: {str(db_error)}")
-                # Continue with response even if database update fails
+        similar = []
+        for match_id, similarity in matches:
+            pitch = pitches_by_id.get(match_id)
+            if pitch is None:
+                continue
+            similar.append(SimilarPitch(
+                pitch_id=pitch.id,
+                title=pitch.title,
+                similarity=round(similarity, 4),
+                status=pitch.status,
+                overall_score=pitch.feedback.overallScore if pitch.feedback else None,
+                score=evaluation_service.versioning.parse_score(pitch.feedback),
+                created_at=pitch.createdAt
+            ))
+        return SimilarPitchesResponse(pitch_id=pitch_id, similar=similar)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error finding similar pitches: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while finding similar pitches."
+        )
+
+async def load_pitch_text(evaluation_service: EvaluationService, pitch) -> Optional[str]:
+    """Extracted text of a pitch, None when it was not stored."""
+    if pitch.contentHash:
+        with metrics.timer("pitches.content"):
+            return await evaluation_service.content_store.get(pitch.contentHash)
+    if pitch.feedback and pitch.feedback.elevatorPitch:
+        # Evaluated before the content store, not migrated yet
+        return pitch.feedback.elevatorPitch
+    return None
+
+@router.get("/pitches/{pitch_id}/content", response_model=PitchContentResponse)
+async def get_pitch_content(pitch_id: str):
+    """
+    Endpoint to get the extracted text of a pitch deck.
+    
+    The text lives in the content store, apart from the pitch and feedback
+    rows, and is only loaded by this endpoint.
+    
+    Args:
+        pitch_id: The ID of the pitch
+    
+    Returns:
+        PitchContentResponse with the extracted deck text
+    """
+    try:
+        evaluation_service = EvaluationService()
+        pitch = await evaluation_service.db_actions.get_pitch(pitch_id)
+        if not pitch:
+            raise HTTPException(status_code=404, detail="Pitch not found")
+        
+        text = await load_pitch_text(evaluation_service, pitch)
+        if text is None:
+            raise HTTPException(status_code=404, detail="Pitch content not available")
         
-        if evaluation_response.score:
+        return PitchContentResponse(
+            pitch_id=pitch_id,
+            content_hash=pitch.contentHash,
+            size=len(text.encode("utf-8")),
+            text=text
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error loading the content of pitch {pitch_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while loading the pitch content."
+        )
+
+@router.get("/pitches/{pitch_id}/questions", response_model=QuestionsResponse)
+async def get_pitch_questions(pitch_id: str):
+    """
+    Endpoint to get the investor questions generated for a pitch.
+    
+    Args:
+        pitch_id: The ID of the pitch
+    
+    Returns:
+        QuestionsResponse with the stored questions
+    """
+    try:
+        evaluation_service = EvaluationService()
+        record = await evaluation_service.db_actions.get_investor_questions(pitch_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="No investor questions for this pitch")
+        
+        return QuestionsResponse(
+            id=record.id,
+            pitch_id=record.pitchId,
+            questions=evaluation_service.versioning.parse_questions(record),
+            created_at=record.createdAt,
+            updated_at=record.updatedAt
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error loading the investor questions of pitch {pitch_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while loading the investor questions."
+        )
+
+@router.post("/pitches/{pitch_id}/simulate-qna")
+async def simulate_qna(pitch_id: str):
+    """
+    Endpoint to generate mock investor questions for an evaluated pitch.
+    
+    Questions are streamed as newline-delimited JSON, one object per question
+    as soon as it is generated, followed by {"done": true, "count": n}
+    (or {"error": ...}). The questions replace the stored ones once complete.
+    Evaluations of full decks already generate them; this endpoint is for
+    pitches evaluated without them or to ask again.
+    
+    Args:
+        pitch_id: The ID of the pitch
+    
+    Returns:
+        StreamingResponse of application/x-ndjson
+    """
+    try:
+        evaluation_service = EvaluationService()
+        pitch = await evaluation_service.db_actions.get_pitch(pitch_id)
+        if not pitch:
+            raise HTTPException(status_code=404, detail="Pitch not found")
+        text = await load_pitch_text(evaluation_service, pitch)
+        if text is None:
+            raise HTTPException(status_code=404, detail="Pitch content not available")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error preparing the Q&A of pitch {pitch_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while preparing the investor Q&A."
+        )
+    
+    async def stream_questions():
+        arrived: asyncio.Queue = asyncio.Queue()
+        
+        async def generate():
+            with deadline_scope():
+                return await investor_qna_agent(PitchData(pitch_text=text), on_question=arrived.put)
+        
+        task = asyncio.create_task(generate())
+        task.add_done_callback(lambda _: arrived.put_nowait(None))
+        try:
+            while (question := await arrived.get()) is not None:
+                yield question.model_dump_json() + "\n"
+            if task.exception() is not None:
+                logger.error(f"Investor Q&A of pitch {pitch_id} failed: {str(task.exception())}")
+                yield json.dumps({"error": "Investor questions could not be generated"}) + "\n"
+                return
+            questions = task.result()
             try:
-                await db_actions.update_pitch_feedback_and_score(
-                    pitch_id=new_pitch.id,
-                    feedback=None,
-                    score=evaluation_response.score,
-                    pitch_content=file_content
-                )
-                logger.info(f"Updated score for pitch {new_pitch.id}")
+                await evaluation_service.db_actions.save_investor_questions(pitch_id, questions)
             except Exception as db_error:
-                logger.error(f"Failed to update pitch score: {str(db_error)}")
-                # Continue with response even if database update fails
+                logger.error(f"Failed to store the investor questions of pitch {pitch_id}: {str(db_error)}")
+            yield json.dumps({"done": True, "count": len(questions)}) + "\n"
+        finally:
+            # Client gone before the end: stop the remaining LLM calls
+            task.cancel()
+    
+    return StreamingResponse(stream_questions(), media_type="application/x-ndjson")
+
+@router.post("/pitches/{pitch_id}/slide-suggestions")
+async def suggest_slide_edits(pitch_id: str):
+    """
+    Endpoint to generate edit suggestions for every slide of a pitch deck.
+    
+    Slides (PPTX) or pages (PDF) come from the document stored at evaluation
+    time; the deck file is only extracted again for pitches evaluated before
+    documents were stored. DOCX and TXT pitches have no slides. Suggestions are streamed as
+    newline-delimited JSON, one SlideSuggestion per slide in slide order,
+    followed by {"done": true, "slides": n}.
+    
+    Args:
+        pitch_id: The ID of the pitch
+    
+    Returns:
+        StreamingResponse of application/x-ndjson
+    """
+    try:
+        evaluation_service = EvaluationService()
+        pitch = await evaluation_service.db_actions.get_pitch(pitch_id)
+        if not pitch:
+            raise HTTPException(status_code=404, detail="Pitch not found")
+        if pitch.fileType not in ("pptx", "pdf"):
+            raise HTTPException(status_code=422, detail="Slide suggestions are only available for PPTX and PDF decks")
         
-        try:
-            update_pitch_status = await db_actions.update_pitch_status(new_pitch.id, PitchStatus.COMPLETED)
-            logger.info(f"Pitch status updated to: {update_pitch_status}")
-        except Exception as status_error:
-            logger.error(f"Failed to update pitch status to COMPLETED: {str(status_error)}")
-            # Continue with response even if status update fails
-            
-        return EvaluationResponse(
-            feedback=evaluation_response.feedback,
-            score=evaluation_response.score
+        document = None
+        if pitch.contentHash:
+            document = await evaluation_service.content_store.get_document(pitch.contentHash)
+        if document is None:
+            metrics.increment("slide_suggestions.reextracted")
+            file_content = await evaluation_service.file_service.download_file(pitch.filePath)
+            document = await evaluation_service.file_service.extract_document_from_content(file_content, pitch.fileType)
+            document, _ = await asyncio.to_thread(evaluation_service.normalizer.normalize, document)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logger.error(f"Error preparing the slide suggestions of pitch {pitch_id}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while preparing the slide suggestions."
+        )
+    
+    async def stream_suggestions():
+        count = 0
+        with metrics.timer("slide_suggestions.total"):
+            async for suggestion in SlideSuggestionService().stream(document):
+                count += 1
+                yield suggestion.model_dump_json() + "\n"
+        yield json.dumps({"done": True, "slides": count}) + "\n"
+    
+    return StreamingResponse(stream_suggestions(), media_type="application/x-ndjson")
+
+@router.get("/pitches/{pitch_id}/percentiles", response_model=PitchPercentilesResponse)
+async def get_pitch_percentiles(pitch_id: str):
+    """
+    Endpoint to rank the scores of a pitch against every scored pitch.
+    
+    Ranks come from the score histograms maintained on each scoring write,
+    not from a scan of the stored scores.
+    
+    Args:
+        pitch_id: The ID of the pitch
+    
+    Returns:
+        PitchPercentilesResponse with the percentile rank of every score dimension
+    """
+    try:
+        evaluation_service = EvaluationService()
+        pitch = await evaluation_service.db_actions.get_pitch(pitch_id)
+        if not pitch:
+            raise HTTPException(status_code=404, detail="Pitch not found")
+        score = evaluation_service.versioning.parse_score(pitch.feedback)
+        if score is None:
+            raise HTTPException(status_code=404, detail="Pitch has not been scored")
+        
+        score_stats = ScoreStatsService()
+        percentiles = await score_stats.percentile_ranks(score)
+        histograms = await score_stats.histograms()
+        return PitchPercentilesResponse(
+            pitch_id=pitch_id,
+            score=score,
+            percentiles=percentiles,
+            scored_pitches=histograms.total("overall")
         )
     except HTTPException as he:
-        # Update pitch status to FAILED if possible
-        try:
-            await db_actions.update_pitch_status(new_pitch.id, PitchStatus.FAILED)
-            logger.info(f"Pitch status updated to FAILED due to HTTPException")
-        except Exception as status_error:
-            logger.error(f"Failed to update pitch status to FAILED: {str(status_error)}")
         raise he
     except Exception as e:
-        # Update pitch status to FAILED if possible
-        try:
-            await db_actions.update_pitch_status(new_pitch.id, PitchStatus.FAILED)
-            logger.info(f"Pitch status updated to FAILED due to exception")
-        except Exception as status_error:
-            logger.error(f"Failed to update pitch status to FAILED: {str(status_error)}")
-        logger.error(f"Error processing pitch upload: {str(e)}", exc_info=True)
+        logger.error(f"Error ranking pitch {pitch_id}: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail="An unexpected error occurred while processing your pitch. Please try again later."
+            detail="An unexpected error occurred while ranking the pitch."
+        )
+
+@router.get("/scores/percentile", response_model=ScorePercentile)
+async def get_score_percentile(
+    score: float = Query(..., ge=0, le=10),
+    dimension: str = Query("overall", description="clarity, differentiation, traction, scalability or overall"),
+):
+    """
+    Endpoint to rank any score against every scored pitch.
+    
+    Args:
+        score: Score to rank, from 0 to 10
+        dimension: Score dimension
+    
+    Returns:
+        ScorePercentile with the percentile rank of the score
+    """
+    if dimension not in SCORE_DIMENSIONS:
+        raise HTTPException(status_code=422, detail=f"Unknown dimension: {dimension}")
+    try:
+        histograms = await ScoreStatsService().histograms()
+        return ScorePercentile(
+            dimension=dimension,
+            score=score,
+            percentile=histograms.percentile_rank(dimension, score),
+            scored_pitches=histograms.total(dimension)
+        )
+    except Exception as e:
+        logger.error(f"Error ranking score {score}: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while ranking the score."
+        )
+
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    dimension: str = Query("overall", description="clarity, differentiation, traction, scalability or overall"),
+):
+    """
+    Endpoint to get the best scored pitches.
+    
+    Args:
+        limit: Number of pitches to return
+        dimension: Score dimension to rank by
+    
+    Returns:
+        LeaderboardResponse with the pitches ranked by the dimension's score
+    """
+    if dimension not in SCORE_DIMENSIONS:
+        raise HTTPException(status_code=422, detail=f"Unknown dimension: {dimension}")
+    try:
+        rows = await DatabaseActions().get_leaderboard(limit, dimension)
+        return LeaderboardResponse(dimension=dimension, entries=[
+            LeaderboardEntry(
+                rank=rank,
+                pitch_id=row["id"],
+                title=row["title"],
+                score=row["score"],
+                overall_score=row["overallScore"],
+                created_at=row["createdAt"]
+            )
+            for rank, row in enumerate(rows, 1)
+        ])
+    except Exception as e:
+        logger.error(f"Error building the leaderboard: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="An unexpected error occurred while building the leaderboard."
         )
 
 # @router.get("/get-pitch/{pitch_id}", response_model=EvaluationResponse)
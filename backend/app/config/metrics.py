@@ -0,0 +1,95 @@
+import time
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Any, Deque, Optional
+
+# Number of most recent samples kept per timing series
+MAX_SAMPLES = 10000
+
+
+class Metrics:
+    """In-process counters and timing series, exposed on /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._timings: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value_ms: float) -> None:
+        """Record a timing sample in milliseconds."""
+        with self._lock:
+            self._timings[name].append(value_ms)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the wrapped block and record it under `name`, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def percentile(self, name: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Return a percentile of one timing series.
+
+        Args:
+            name (str): Name of the timing series
+            percentile (float): Percentile between 0 and 100
+            min_samples (int): Minimum number of samples for the value to be meaningful
+
+        Returns:
+            Optional[float]: Percentile in milliseconds, None with fewer than `min_samples` samples
+        """
+        with self._lock:
+            samples = self._timings.get(name)
+            if not samples or len(samples) < min_samples:
+                return None
+            ordered = sorted(samples)
+        return _percentile(ordered, percentile)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current counters and the percentiles of every timing series.
+
+        Returns:
+            Dict[str, Any]: {"counters": {...}, "timings_ms": {name: {count, p50, p95, p99, max}}}
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            series = {name: sorted(samples) for name, samples in self._timings.items()}
+
+        timings = {}
+        for name, samples in series.items():
+            if not samples:
+                continue
+            timings[name] = {
+                "count": len(samples),
+                "p50": round(_percentile(samples, 50), 2),
+                "p95": round(_percentile(samples, 95), 2),
+                "p99": round(_percentile(samples, 99), 2),
+                "max": round(samples[-1], 2)
+            }
+        return {"counters": counters, "timings_ms": timings}
+
+    def reset(self) -> None:
+        """Clear every counter and timing series."""
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+def _percentile(sorted_samples, percentile: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_samples) - 1, int(round(percentile / 100 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+# Process-wide registry
+metrics = Metrics()
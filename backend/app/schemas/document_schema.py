@@ -0,0 +1,148 @@
+# app/schemas/document_schema.py
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Optional, Dict, List, Any, Iterator
+from enum import Enum
+import msgpack
+
+
+class SectionKind(str, Enum):
+    SLIDE = "slide"
+    PAGE = "page"
+    BLOCK = "block"
+
+
+class DocumentSection(BaseModel):
+    """
+    Pydantic model for one slide, page or block of an extracted document.
+    """
+    number: int = Field(..., description="1-based section number")
+    kind: SectionKind = Field(default=SectionKind.BLOCK, description="Whether the section is a slide, page or block")
+    spans: List[str] = Field(default_factory=list, description="Stripped text spans in reading order")
+    tables: List[List[List[str]]] = Field(default_factory=list, description="Tables as rows of cell texts")
+    notes: Optional[str] = Field(default=None, description="Speaker notes attached to the section")
+    offset: int = Field(default=0, description="Character offset of the section in the rendered document text")
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.spans and not self.tables and not self.notes
+
+    def render(self, separator: str = "\n", with_header: bool = True) -> str:
+        """
+        Render the section as plain text.
+
+        Args:
+            separator (str): Separator placed between spans and table rows
+            with_header (bool): Whether to prefix slides with their `--- Slide N ---` header
+
+        Returns:
+            str: Rendered section text
+        """
+        lines = []
+        if with_header and self.kind == SectionKind.SLIDE:
+            lines.append(f"--- Slide {self.number} ---")
+        lines.extend(self.spans)
+        for table in self.tables:
+            lines.extend(" | ".join(row) for row in table)
+        if self.notes:
+            lines.append(f"Speaker notes: {self.notes}")
+        return separator.join(lines)
+
+
+class NormalizationReport(BaseModel):
+    """
+    Pydantic model for the size reduction achieved by text normalization.
+    """
+    level: str = Field(..., description="Normalization level that was applied")
+    chars_before: int = 0
+    chars_after: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    removed_lines: Dict[str, int] = Field(default_factory=dict, description="Removed lines per reason")
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    @property
+    def saved_ratio(self) -> float:
+        return self.tokens_saved / self.tokens_before if self.tokens_before else 0.0
+
+
+class ExtractedDocument(BaseModel):
+    """
+    Pydantic model for a structured extracted document.
+
+    The plain text rendering is built lazily on first access and cached, so the
+    extractors, chunkers and agents share a single copy of the deck text.
+    """
+    file_type: str = Field(..., description="Type of the source file (pdf, docx, pptx, txt)")
+    sections: List[DocumentSection] = Field(default_factory=list, description="Slides, pages or blocks in document order")
+    span_separator: str = Field(default="\n", description="Separator between spans inside a rendered section")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Extraction metadata such as engine and timings")
+
+    _text: Optional[str] = PrivateAttr(default=None)
+
+    @property
+    def text(self) -> str:
+        """Rendered document text, with section offsets filled in on first access."""
+        if self._text is None:
+            rendered = []
+            offset = 0
+            for section in self.sections:
+                if section.is_empty:
+                    continue
+                section_text = section.render(self.span_separator)
+                section.offset = offset
+                rendered.append(section_text)
+                offset += len(section_text) + 2
+            self._text = "\n\n".join(rendered)
+        return self._text
+
+    def iter_sections(self) -> Iterator[DocumentSection]:
+        """Iterate over the non-empty sections of the document."""
+        return (section for section in self.sections if not section.is_empty)
+
+    def to_msgpack(self) -> bytes:
+        """
+        Serialize the document to a compact msgpack payload.
+
+        Sections are packed as positional arrays rather than keyed maps. The
+        rendered text is not stored since it can be rebuilt from the sections.
+
+        Returns:
+            bytes: Msgpack-encoded document
+        """
+        return msgpack.packb([
+            1,
+            self.file_type,
+            self.span_separator,
+            self.metadata,
+            [
+                [section.number, section.kind.value, section.spans, section.tables, section.notes]
+                for section in self.sections
+            ]
+        ], use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, payload: bytes) -> "ExtractedDocument":
+        """
+        Deserialize a document produced by `to_msgpack`.
+
+        Args:
+            payload (bytes): Msgpack-encoded document
+
+        Returns:
+            ExtractedDocument: The decoded document
+        """
+        version, file_type, span_separator, metadata, sections = msgpack.unpackb(payload, raw=False)
+        if version != 1:
+            raise ValueError(f"Unsupported document payload version: {version}")
+        return cls(
+            file_type=file_type,
+            span_separator=span_separator,
+            metadata=metadata,
+            sections=[
+                DocumentSection(number=number, kind=kind, spans=spans, tables=tables, notes=notes)
+                for number, kind, spans, tables, notes in sections
+            ]
+        )
@@ -1,16 +1,18 @@
 # app/schemas/pitch.py
+import operator
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, List, Any, Union, Literal
 from datetime import datetime
 from enum import Enum
-from typing_extensions import TypedDict
-from langgraph.graph import MessagesState
+from typing_extensions import TypedDict, Annotated
+from app.schemas.document_schema import ExtractedDocument
 
 class PitchStatus(str, Enum):
     PENDING = "pending"
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 class FileType(str, Enum):
     PDF = "pdf"
@@ -24,6 +26,11 @@ class PitchAction(str, Enum):
     SCORING = "scoring"
     COMPLETE = "complete"
 
+class EvaluationKind(str, Enum):
+    ANALYSIS_ONLY = "analysis_only"
+    SCORING_ONLY = "scoring_only"
+    FULL = "full"
+
 
 # Request Models
 class PitchCreate(BaseModel):
@@ -31,6 +38,19 @@ class PitchCreate(BaseModel):
     description: Optional[str] = None
     file_type: Optional[FileType] = None
     file_content: Optional[str] = None
+    user_query: Optional[str] = None
+
+class EvaluationRequest(BaseModel):
+    """
+    An /evaluate-pitch submission, with the uploaded file already read into memory.
+    """
+    file_content: bytes
+    filename: str
+    content_type: Optional[str] = None
+    title: str
+    description: Optional[str] = None
+    user_query: Optional[str] = None
+    parent_pitch_id: Optional[str] = None
 
 # Response Models
 class PitchResponse(BaseModel):
@@ -93,14 +113,219 @@ class ScoreModel(BaseModel):
     traction: float = Field(default=0.0, description="Score for demonstrated traction")
     scalability: float = Field(default=0.0, description="Score for scalability potential")
     overall: float = Field(default=0.0, description="Overall score of the pitch")
-    
+
+class DeckFeatures(BaseModel):
+    """
+    Pydantic model for the facts the local pre-scorer finds in a deck, without any LLM call.
+    """
+    slides: int = Field(default=0, description="Slides, pages or blocks with text")
+    words: int = Field(default=0, description="Words in the deck")
+    words_per_slide: float = Field(default=0.0, description="Mean words per slide")
+    text_heavy_slides: int = Field(default=0, description="Slides over the text-heavy word count")
+    revenue_mentions: int = Field(default=0, description="Revenue, ARR or MRR figures")
+    max_revenue_usd: Optional[float] = Field(default=None, description="Largest revenue figure, in dollars")
+    growth_mentions: int = Field(default=0, description="Growth rates (MoM, YoY, CAGR, multiples)")
+    max_monthly_growth_pct: Optional[float] = Field(default=None, description="Largest month-over-month growth rate, in percent")
+    user_mentions: int = Field(default=0, description="User or customer counts")
+    max_users: Optional[float] = Field(default=None, description="Largest user or customer count")
+    retention_mentions: int = Field(default=0, description="Retention, churn or NRR mentions")
+    tam_mentions: int = Field(default=0, description="TAM, SAM or SOM mentions")
+    tam_figures: int = Field(default=0, description="Amounts next to a market size mention")
+    unit_economics_mentions: int = Field(default=0, description="CAC, LTV, payback or margin mentions")
+    moat_mentions: int = Field(default=0, description="Proprietary, patent, network effect or switching cost mentions")
+    sections: List[str] = Field(default_factory=list, description="Canonical pitch sections found in the deck")
+    missing_sections: List[str] = Field(default_factory=list, description="Canonical pitch sections not found")
+    section_coverage: float = Field(default=0.0, description="Share of the canonical sections found, from 0 to 1")
+    readability: float = Field(default=0.0, description="Flesch reading ease of the deck text, higher is easier")
+    words_per_sentence: float = Field(default=0.0, description="Mean words per sentence or bullet")
+
+# Topics of the investor Q&A
+QnaCategory = Literal["market", "product", "traction", "team", "financials"]
+
+class GeneratedQuestion(BaseModel):
+    """
+    Pydantic model for one investor question as generated.
+    """
+    category: QnaCategory = Field(..., description="Topic the question belongs to")
+    question: str = Field(..., description="Question as an investor would ask it in the meeting")
+    importance: Literal["high", "medium", "low"] = Field(..., description="How much a weak answer would weigh on the decision")
+    rationale: str = Field(default="", description="Why an investor would ask it, citing the pitch, in one sentence")
+
+class SlideEditsModel(BaseModel):
+    """
+    Pydantic model for the edit suggestions of one slide.
+    """
+    slide_number: int = Field(..., description="Number of the slide, as in its --- Slide N --- header")
+    suggestions: List[str] = Field(default_factory=list, description="Concrete edits to this slide, most important first")
+
+class SlideBatchEditsModel(BaseModel):
+    """
+    Pydantic model for the edit suggestions of the slides sent in one call.
+    """
+    slides: List[SlideEditsModel] = Field(default_factory=list, description="Suggestions for every slide given, in slide order")
+
+class FusedEvaluationModel(BaseModel):
+    """
+    Pydantic model for a combined analysis and scoring produced in a single call.
+    """
+    feedback: FeedbackModel = Field(default_factory=FeedbackModel, description="Structured feedback on the pitch")
+    score: ScoreModel = Field(default_factory=ScoreModel, description="Scores of the pitch from 0 to 10")
+
+class PreScoreResponse(BaseModel):
+    """
+    Response of /prescore: a provisional, LLM-free estimate of the scores of a deck.
+    """
+    score: ScoreModel = Field(..., description="Provisional scores from the deck features, not the agents' evaluation")
+    features: DeckFeatures
+    elapsed_ms: float = Field(..., description="Time spent extracting the features and scoring, extraction of the file excluded")
+
+class SimilarPitch(BaseModel):
+    pitch_id: str
+    title: str
+    similarity: float
+    status: str
+    overall_score: Optional[float] = None
+    score: Optional[ScoreModel] = None
+    created_at: Optional[datetime] = None
+
+class SimilarPitchesResponse(BaseModel):
+    pitch_id: str
+    similar: List[SimilarPitch]
+
+class EvaluationQueuedResponse(BaseModel):
+    """
+    Response of /evaluate-pitch when evaluations run on queue workers.
+    """
+    pitch_id: str
+    status: PitchStatus
+    status_url: str = Field(..., description="Poll this endpoint for the status and results")
+
+class PitchStatusResponse(BaseModel):
+    pitch_id: str
+    title: str
+    status: str
+    version: int
+    attempts: int = 0
+    last_error: Optional[str] = None
+    feedback: Optional[FeedbackModel] = None
+    score: Optional[ScoreModel] = None
+    created_at: datetime
+    updated_at: datetime
+
+class PitchSummary(BaseModel):
+    """
+    Pydantic model for a pitch in the pitch list.
+
+    The large fields (scores, feedback, elevator_pitch) are only set when
+    requested through the `fields` parameter of GET /pitches; elevator_pitch
+    is an excerpt, the opening of the deck text.
+    """
+    pitch_id: str
+    title: str
+    status: str
+    version: int
+    file_type: str
+    overall_score: Optional[float] = None
+    score: Optional[ScoreModel] = None
+    feedback: Optional[FeedbackModel] = None
+    elevator_pitch: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+class PitchListResponse(BaseModel):
+    pitches: List[PitchSummary]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, None on the last page")
+
+class PitchContentResponse(BaseModel):
+    pitch_id: str
+    content_hash: Optional[str] = Field(default=None, description="SHA-256 of the text, shared by every pitch with the same content")
+    size: int = Field(..., description="Size of the text in bytes")
+    text: str = Field(..., description="Extracted deck text")
+
+class ScorePercentile(BaseModel):
+    dimension: str
+    score: float
+    percentile: Optional[float] = Field(default=None, description="Share of the scored pitches below this score, ties counted as half; None before any pitch was scored")
+    scored_pitches: int
+
+class PitchPercentilesResponse(BaseModel):
+    pitch_id: str
+    score: ScoreModel
+    percentiles: Dict[str, Optional[float]] = Field(default_factory=dict, description="Percentile rank of every score dimension")
+    scored_pitches: int
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    pitch_id: str
+    title: str
+    score: float = Field(..., description="Score of the ranked dimension")
+    overall_score: Optional[float] = None
+    created_at: datetime
+
+class LeaderboardResponse(BaseModel):
+    dimension: str
+    entries: List[LeaderboardEntry]
+
+class SlideSuggestion(BaseModel):
+    """
+    Pydantic model for the edit suggestions of one slide, as streamed by the slide suggestion stage.
+    """
+    slide_number: int
+    suggestions: List[str] = Field(default_factory=list)
+    cached: bool = Field(default=False, description="Whether the suggestions were reused from an identical slide")
+    error: Optional[str] = Field(default=None, description="Set when no suggestions could be generated for the slide")
+
+class SlideContent(BaseModel):
+    """
+    Pydantic model for the text of a single slide.
+    """
+    number: int = Field(..., description="1-based slide number")
+    text: str = Field(default="", description="Extracted text of the slide")
+
+class SlideDiff(BaseModel):
+    """
+    Pydantic model for the slide-level difference between two deck versions.
+    """
+    total_slides: int = Field(default=0, description="Number of slides in the new version")
+    changed_slides: List[SlideContent] = Field(default_factory=list, description="Slides that are new or edited")
+    removed_slide_numbers: List[int] = Field(default_factory=list, description="Slide numbers of the previous version that no longer exist")
+
+    @property
+    def is_unchanged(self) -> bool:
+        return not self.changed_slides and not self.removed_slide_numbers
+
+    @property
+    def changed_ratio(self) -> float:
+        if not self.total_slides:
+            return 1.0
+        return len(self.changed_slides) / self.total_slides
+
+class RevisionContext(BaseModel):
+    """
+    Pydantic model for the previous evaluation of a deck, used for incremental re-evaluation.
+    """
+    previous_pitch_id: str = Field(..., description="ID of the previous deck version")
+    previous_feedback: Optional[FeedbackModel] = Field(default=None, description="Feedback of the previous version")
+    previous_score: Optional[ScoreModel] = Field(default=None, description="Scores of the previous version")
+    diff: SlideDiff = Field(default_factory=SlideDiff, description="Slide diff against the previous version")
+
 class PitchData(BaseModel):
     """
     Pydantic model for pitch data.
     """
     pitch_text: str = Field(default="", description="Extracted text of the the elevator pitch")
+    document: Optional[ExtractedDocument] = Field(default=None, description="Structured extracted document, rendered to text lazily")
     user_query: Optional[str] = Field(default=None, description="User's specific query or request for the pitch analysis")
+    revision: Optional[RevisionContext] = Field(default=None, description="Previous evaluation to update incrementally, if any")
+    features: Optional[DeckFeatures] = Field(default=None, description="Facts found by the local pre-scorer, passed to the agents as context")
     # action: Literal["analysis", "scoring", "complete"] = Field(..., description="Requested action: analysis, scoring, or complete")
+
+    @property
+    def content(self) -> str:
+        """Text of the pitch, taken from the structured document when one is attached."""
+        if self.document is not None:
+            return self.document.text
+        return self.pitch_text
     
 class NextAgentResponse(BaseModel):
     agent_name: str = Field(default="", description="The name of the next agent to call (pitch_analysis_agent or score_pitch_agent)")
@@ -119,15 +344,20 @@ class EvaluationResponse(BaseModel):
     pitch: Optional[PitchData] = None
     feedback: Optional[FeedbackModel] = None
     score: Optional[ScoreModel] = None
+    questions: Optional[List[QuestionItem]] = None
     
     
-class State(MessagesState):
+class State(TypedDict, total=False):
     """
     Type definition for the state of the application.
+
+    The state is checkpointed after every step, so it stays small: the pitch
+    is referenced by a handle into the in-process pitch store instead of being
+    embedded, and agents append the name of the step they completed to
+    `completed` instead of a string rendering of their structured result.
     """
-    pitch_data: Optional[PitchData] = None
-    feedback: Optional[FeedbackModel] = None
-    score: Optional[ScoreModel] = None
-    workflow_stage: Optional[str] = None
-    next_step: Optional[str] = None
-    user_query: Optional[str] = None
+    pitch_ref: str
+    user_query: Optional[str]
+    feedback: Optional[FeedbackModel]
+    score: Optional[ScoreModel]
+    completed: Annotated[List[str], operator.add]
@@ -0,0 +1,240 @@
+# app/services/content_store.py
+import os
+import sys
+import zlib
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Iterable, Optional, Tuple, Union
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+from app.config.prisma_client import get_prisma
+from app.schemas.document_schema import ExtractedDocument
+from prisma import Base64
+
+# zstandard is optional, deck text falls back to zlib without it
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Suffix of the encoding of rows holding a structured document rather than plain text
+DOCUMENT_SUFFIX = "+msgpack"
+
+# Length of the deck excerpts listed as elevator_pitch by GET /pitches
+EXCERPT_CHARS = 500
+
+# Legacy rows still holding the deck text in Feedback.elevatorPitch, moved per batch
+MIGRATE_BATCH_SQL = """
+SELECT f."pitchId", f."elevatorPitch"
+FROM "Feedback" f JOIN "Pitch" p ON p."id" = f."pitchId"
+WHERE f."elevatorPitch" IS NOT NULL AND p."contentHash" IS NULL
+LIMIT $1
+"""
+
+
+class DeckContentStore:
+    """
+    Content-addressed, compressed storage of extracted decks.
+
+    Decks are keyed by the SHA-256 of their text and stored once in the
+    DeckContent table, whatever the number of pitches (re-uploads, versions
+    with the same text) pointing to them through Pitch.contentHash. Extracted
+    documents are stored as their msgpack payload, so that slides, pages and
+    tables can be read back without extracting the file again; rows written
+    from plain text (older rows, the Feedback migration) only hold the text.
+    Payloads are compressed with zstd when available, zlib otherwise; the
+    encoding is stored with every row so that either can be read back.
+    """
+
+    def __init__(self, level: Optional[int] = None):
+        """
+        Initialize DeckContentStore instance.
+
+        Args:
+            level (Optional[int]): Compression level, DECK_CONTENT_COMPRESSION_LEVEL by default
+        """
+        self.level = level if level is not None else int(os.getenv("DECK_CONTENT_COMPRESSION_LEVEL", "9"))
+        self.encoding = "zstd" if ZSTD_AVAILABLE else "zlib"
+
+    def content_hash(self, text: str) -> str:
+        """Key of a deck text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def compress(self, text: str) -> Tuple[str, bytes]:
+        """
+        Compress a deck text.
+
+        Args:
+            text (str): Extracted deck text
+
+        Returns:
+            Tuple[str, bytes]: (encoding, compressed bytes)
+        """
+        return self.compress_bytes(text.encode("utf-8"))
+
+    def compress_bytes(self, raw: bytes) -> Tuple[str, bytes]:
+        """Compress a payload with the configured encoding."""
+        if self.encoding == "zstd":
+            return "zstd", zstandard.ZstdCompressor(level=self.level).compress(raw)
+        return "zlib", zlib.compress(raw, min(self.level, 9))
+
+    def decompress_bytes(self, encoding: str, data: bytes) -> bytes:
+        """
+        Decompress a stored payload.
+
+        Raises:
+            RuntimeError: If the payload was stored with zstd and zstandard is not installed
+        """
+        if encoding.startswith("zstd"):
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Deck content is zstd-compressed, install zstandard to read it")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def decompress(self, encoding: str, data: bytes) -> str:
+        """Decompress a stored deck to its text, whether the row holds a document or plain text."""
+        raw = self.decompress_bytes(encoding, data)
+        if encoding.endswith(DOCUMENT_SUFFIX):
+            return ExtractedDocument.from_msgpack(raw).text
+        return raw.decode("utf-8")
+
+    async def put(self, content: Union[ExtractedDocument, str], client=None) -> str:
+        """
+        Store an extracted deck, once per distinct text.
+
+        A document replaces a plain text row of the same text, so that older
+        decks gain their structure when uploaded again.
+
+        Args:
+            content (Union[ExtractedDocument, str]): Extracted document, or deck text
+            client: Prisma client or transaction to write with, a new connection by default
+
+        Returns:
+            str: Content hash to reference the deck with
+        """
+        is_document = isinstance(content, ExtractedDocument)
+        text = content.text if is_document else content
+        digest = self.content_hash(text)
+        raw = content.to_msgpack() if is_document else text.encode("utf-8")
+        encoding, data = await asyncio.to_thread(self.compress_bytes, raw)
+        if is_document:
+            encoding += DOCUMENT_SUFFIX
+        row = {
+            "hash": digest,
+            "encoding": encoding,
+            "size": len(raw),
+            "compressedSize": len(data),
+            "content": Base64.encode(data),
+        }
+        upsert = {"create": row, "update": row if is_document else {}}
+        if client is None:
+            async with get_prisma() as prisma:
+                await prisma.deckcontent.upsert(where={"hash": digest}, data=upsert)
+        else:
+            await client.deckcontent.upsert(where={"hash": digest}, data=upsert)
+        metrics.increment("deck_content.bytes_raw", row["size"])
+        metrics.increment("deck_content.bytes_stored", row["compressedSize"])
+        logger.info(f"Stored deck content {digest[:12]} ({row['size']} -> {row['compressedSize']} bytes, {encoding})")
+        return digest
+
+    async def _load(self, content_hash: str):
+        async with get_prisma() as prisma:
+            return await prisma.deckcontent.find_unique(where={"hash": content_hash})
+
+    async def get(self, content_hash: str) -> Optional[str]:
+        """
+        Load a deck text by its hash.
+
+        Args:
+            content_hash (str): Hash returned by `put`
+
+        Returns:
+            Optional[str]: The text, None if unknown
+        """
+        row = await self._load(content_hash)
+        if row is None:
+            return None
+        with metrics.timer("deck_content.decompress"):
+            return await asyncio.to_thread(self.decompress, row.encoding, row.content.decode())
+
+    async def get_excerpts(self, content_hashes: Iterable[str], max_chars: int = EXCERPT_CHARS) -> Dict[str, str]:
+        """
+        Load the opening text of several decks in one query.
+
+        Args:
+            content_hashes (Iterable[str]): Hashes returned by `put`, unknown ones are left out
+            max_chars (int): Length of every excerpt
+
+        Returns:
+            Dict[str, str]: Excerpt per content hash
+        """
+        hashes = list({content_hash for content_hash in content_hashes if content_hash})
+        if not hashes:
+            return {}
+        async with get_prisma() as prisma:
+            rows = await prisma.deckcontent.find_many(where={"hash": {"in": hashes}})
+
+        def excerpts() -> Dict[str, str]:
+            return {row.hash: self.decompress(row.encoding, row.content.decode())[:max_chars] for row in rows}
+
+        with metrics.timer("deck_content.decompress"):
+            return await asyncio.to_thread(excerpts)
+
+    async def get_document(self, content_hash: str) -> Optional[ExtractedDocument]:
+        """
+        Load an extracted document by its hash.
+
+        Args:
+            content_hash (str): Hash returned by `put`
+
+        Returns:
+            Optional[ExtractedDocument]: The document, None if unknown or stored as plain text only
+        """
+        row = await self._load(content_hash)
+        if row is None or not row.encoding.endswith(DOCUMENT_SUFFIX):
+            return None
+        with metrics.timer("deck_content.decompress"):
+            raw = await asyncio.to_thread(self.decompress_bytes, row.encoding, row.content.decode())
+        return ExtractedDocument.from_msgpack(raw)
+
+    async def migrate_feedback_text(self, batch_size: int = 500) -> int:
+        """
+        Move deck texts stored in Feedback.elevatorPitch to the content store.
+
+        Each batch stores the texts, points their pitches at them and clears
+        the Feedback column in one transaction. Safe to run again.
+
+        Args:
+            batch_size (int): Pitches moved per transaction
+
+        Returns:
+            int: Number of pitches moved
+        """
+        moved = 0
+        while True:
+            async with get_prisma() as prisma:
+                rows = await prisma.query_raw(MIGRATE_BATCH_SQL, batch_size)
+                if not rows:
+                    break
+                async with prisma.tx() as transaction:
+                    for row in rows:
+                        digest = await self.put(row["elevatorPitch"], client=transaction)
+                        await transaction.pitch.update(where={"id": row["pitchId"]}, data={"contentHash": digest})
+                        await transaction.feedback.update(where={"pitchId": row["pitchId"]}, data={"elevatorPitch": None})
+            moved += len(rows)
+            logger.info(f"Moved {moved} deck texts to the content store")
+        return moved
+
+
+if __name__ == "__main__":
+    # python -m app.services.content_store migrate
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("Usage: python -m app.services.content_store migrate")
+    print(f"Moved {asyncio.run(DeckContentStore().migrate_feedback_text())} deck texts to the content store")
@@ -1,38 +1,140 @@
 from app.config.prisma_client import get_prisma
-from app.schemas.pitch_schema import PitchCreate, PitchStatus, FeedbackModel, ScoreModel
+from app.schemas.pitch_schema import PitchCreate, PitchStatus, FeedbackModel, ScoreModel, QuestionItem
+from app.services.deck_versioning import DeckVersioningService
+from app.services.score_stats import ScoreStatsService
+from prisma import Json
+from prisma.errors import UniqueViolationError
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
 import logging
+import base64
 import json
 
 logger = logging.getLogger(__name__)
 
+# Attempts at taking the next version number of a deck when concurrent uploads take the same one
+VERSION_ATTEMPTS = 5
+
+# Columns of the pitch list that are only read when asked for, by projection field
+LIST_OPTIONAL_COLUMNS = {
+    "score": 'f."scores"',
+    "feedback": 'f."suggestions"',
+    # The deck text lives in DeckContent; rows not migrated yet still hold it in Feedback
+    "elevator_pitch": 'p."contentHash", f."elevatorPitch"',
+}
+
+# SQL of each score dimension, matching the expression indexes of prisma/sql/001_native_feedback_json.sql
+SCORE_EXPRESSIONS = {
+    "overall": 'f."overallScore"',
+    "clarity": """(f."scores" -> 'clarity' ->> 'score')::float8""",
+    "differentiation": """(f."scores" -> 'differentiation' ->> 'score')::float8""",
+    "traction": """(f."scores" -> 'traction' ->> 'score')::float8""",
+    "scalability": """(f."scores" -> 'scalability' ->> 'score')::float8""",
+}
+
+
+def encode_cursor(created_at, pitch_id: str) -> str:
+    """Opaque cursor pointing after a pitch in the (createdAt, id) descending order."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([created_at, pitch_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor made by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, pitch_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        datetime.fromisoformat(created_at)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, str(pitch_id)
+
+
 class DatabaseActions:
     def __init__(self):
-        pass
+        self.score_stats = ScoreStatsService()
 
-    async def create_pitch(self, pitch_data: PitchCreate, file_path: str):
+    async def create_pitch(self, pitch_data: PitchCreate, file_path: str, deck_key: Optional[str] = None, slide_hashes: Optional[List[str]] = None, parent_pitch=None, queued: bool = False, content_hash: Optional[str] = None):
         """
         Create a new pitch record in the database.
         
+        The version is the one after the highest version of the deck, whatever
+        the status of that row, so uploads made while an evaluation is pending
+        or failed still get their own number. Concurrent uploads of the same
+        deck collide on the unique (deckKey, version) index and take the next one.
+        
         Args:
             pitch_data: PitchCreate object containing pitch details
             file_path: Path where the pitch file is stored
+            deck_key: Deck the pitch is a version of
+            slide_hashes: Per-slide content hashes of this version
+            parent_pitch: Version this upload revises, if any
+            queued: Whether the evaluation is left to the queue workers
+            content_hash: Key of the extracted deck text in the content store
         
         Returns:
             The created pitch record
         """
         async with get_prisma() as prisma:
-            new_pitch = await prisma.pitch.create(
+            data = {
+                "title": pitch_data.title,
+                "description": pitch_data.description,
+                "filePath": file_path,
+                "fileType": pitch_data.file_type,
+                "status": PitchStatus.PENDING,
+                "deckKey": deck_key,
+                "parentId": parent_pitch.id if parent_pitch else None,
+                "userQuery": pitch_data.user_query,
+                "contentHash": content_hash
+            }
+            if slide_hashes is not None:
+                data["slideHashes"] = Json(slide_hashes)
+            if queued:
+                data["runAfter"] = datetime.now(timezone.utc)
+
+            for attempt in range(VERSION_ATTEMPTS):
+                rows = await prisma.query_raw(
+                    'SELECT COALESCE(MAX("version"), 0)::int + 1 AS "next" FROM "Pitch" WHERE "deckKey" = $1', deck_key
+                ) if deck_key else [{"next": 1}]
+                data["version"] = rows[0]["next"]
+                try:
+                    new_pitch = await prisma.pitch.create(data=data)
+                    break
+                except UniqueViolationError:
+                    if attempt == VERSION_ATTEMPTS - 1:
+                        raise
+                    logger.info(f"Version {data['version']} of deck {deck_key} taken by a concurrent upload, retrying")
+            logger.info(f"Pitch created with ID: {new_pitch.id} (version {new_pitch.version})")
+            return new_pitch 
+        
+    async def update_pitch_slides(self, pitch_id: str, slide_hashes: List[str], content_hash: Optional[str] = None):
+        """
+        Attach the slide hashes and content of a queued pitch once its deck has been extracted.
+        
+        Its version and parent were set when it was queued.
+        
+        Args:
+            pitch_id: The ID of the pitch to update
+            slide_hashes: Per-slide content hashes of this version
+            content_hash: Key of the extracted deck text in the content store
+        
+        Returns:
+            The updated pitch record
+        """
+        async with get_prisma() as prisma:
+            return await prisma.pitch.update(
+                where={"id": pitch_id},
                 data={
-                    "title": pitch_data.title,
-                    "description": pitch_data.description,
-                    "filePath": file_path,
-                    "fileType": pitch_data.file_type,
-                    "status": PitchStatus.PENDING
+                    "slideHashes": Json(slide_hashes),
+                    "contentHash": content_hash
                 }
             )
-            logger.info(f"Pitch created with ID: {new_pitch.id}")
-            return new_pitch 
-        
+
     async def get_pitch(self, pitch_id: str):
         """
         Get a pitch record from the database by ID.
@@ -52,33 +154,190 @@ class DatabaseActions:
             )
             logger.info(f"Retrieved pitch with ID: {pitch_id}")
             return pitch
+
+    async def get_pitches_by_ids(self, pitch_ids: List[str]):
+        """
+        Get pitch records with their feedback by ID.
+        
+        Args:
+            pitch_ids: IDs of the pitches to get
+        
+        Returns:
+            The pitch records found, in no particular order
+        """
+        if not pitch_ids:
+            return []
+        async with get_prisma() as prisma:
+            return await prisma.pitch.find_many(
+                where={"id": {"in": pitch_ids}},
+                include={"feedback": True}
+            )
+
+    async def list_pitches(
+        self,
+        limit: int,
+        cursor: Optional[Tuple[str, str]] = None,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        min_score: Optional[float] = None,
+        score_dimension: str = "overall",
+        fields: Sequence[str] = (),
+    ) -> List[Dict]:
+        """
+        List pitches, newest first, with keyset pagination.
+        
+        Pages are delimited by the (createdAt, id) of the last row of the
+        previous page instead of an OFFSET, so every page costs an index range
+        scan whatever its depth. The large feedback columns are only selected
+        when listed in `fields`.
+        
+        Args:
+            limit: Maximum number of pitches to return
+            cursor: (createdAt, id) of the last pitch of the previous page
+            status: Only pitches with this status
+            created_after: Only pitches created at or after this time
+            created_before: Only pitches created before this time
+            min_score: Only pitches with at least this score
+            score_dimension: Score dimension `min_score` applies to, a key of SCORE_EXPRESSIONS
+            fields: Optional columns to read, keys of LIST_OPTIONAL_COLUMNS
+        
+        Returns:
+            Rows with id, title, status, version, fileType, createdAt, updatedAt,
+            overallScore and the requested optional columns
+        """
+        columns = ['p."id"', 'p."title"', 'p."status"', 'p."version"', 'p."fileType"',
+                   'p."createdAt"', 'p."updatedAt"', 'f."overallScore"']
+        columns += [LIST_OPTIONAL_COLUMNS[field] for field in fields]
+
+        conditions = []
+        params = []
+
+        def param(value) -> str:
+            params.append(value)
+            return f"${len(params)}"
+
+        def timestamp_param(value) -> str:
+            # createdAt is a UTC timestamp without time zone; naive filters are taken as UTC
+            if isinstance(value, datetime):
+                value = value.replace(tzinfo=value.tzinfo or timezone.utc).isoformat()
+            return f"({param(value)}::timestamptz AT TIME ZONE 'UTC')"
+
+        if status:
+            conditions.append(f'p."status" = {param(status)}')
+        if created_after:
+            conditions.append(f'p."createdAt" >= {timestamp_param(created_after)}')
+        if created_before:
+            conditions.append(f'p."createdAt" < {timestamp_param(created_before)}')
+        if min_score is not None:
+            conditions.append(f'{SCORE_EXPRESSIONS[score_dimension]} >= {param(min_score)}')
+        if cursor:
+            created_at = timestamp_param(cursor[0])
+            # The first comparison lets the planner bound the createdAt index scan
+            conditions.append(f'p."createdAt" <= {created_at} AND (p."createdAt", p."id") < ({created_at}, {param(cursor[1])})')
+
+        query = (
+            f'SELECT {", ".join(columns)} FROM "Pitch" p '
+            f'LEFT JOIN "Feedback" f ON f."pitchId" = p."id" '
+            f'WHERE {" AND ".join(conditions) or "TRUE"} '
+            f'ORDER BY p."createdAt" DESC, p."id" DESC '
+            f'LIMIT {param(limit)}'
+        )
+        async with get_prisma() as prisma:
+            rows = await prisma.query_raw(query, *params)
+            logger.info(f"Listed {len(rows)} pitches")
+            return rows
+
+    async def get_leaderboard(self, limit: int, dimension: str = "overall") -> List[Dict]:
+        """
+        Get the best scored completed pitches.
+        
+        The index of the score dimension (Feedback(overallScore), or the
+        per-dimension expression indexes) is read backwards from the top, so
+        only about `limit` rows are visited.
+        
+        Args:
+            limit: Number of pitches to return
+            dimension: Score dimension to rank by, a key of SCORE_EXPRESSIONS
         
+        Returns:
+            Rows with id, title, score, overallScore and createdAt, best first
+        """
+        score = SCORE_EXPRESSIONS[dimension]
+        async with get_prisma() as prisma:
+            return await prisma.query_raw(
+                f'SELECT p."id", p."title", {score} AS "score", f."overallScore", p."createdAt" '
+                f'FROM "Feedback" f JOIN "Pitch" p ON p."id" = f."pitchId" '
+                f'WHERE {score} IS NOT NULL AND p."status" = $1 '
+                f'ORDER BY {score} DESC, f."pitchId" '
+                f'LIMIT $2',
+                PitchStatus.COMPLETED.value, limit
+            )
+
+    async def lock_pitch_status(self, transaction, pitch_id: str) -> Optional[str]:
+        """
+        Lock a pitch row until the end of the transaction and read its status.
+        
+        Writes of the same pitch that change the score histograms take this
+        lock first, so that each one reads the score and status the previous
+        one committed and their histogram deltas add up.
+        
+        Args:
+            transaction: Prisma transaction to lock in
+            pitch_id: The ID of the pitch
+        
+        Returns:
+            The current status, None when the pitch does not exist
+        """
+        rows = await transaction.query_raw('SELECT "status" FROM "Pitch" WHERE "id" = $1 FOR UPDATE', pitch_id)
+        return rows[0]["status"] if rows else None
 
     async def update_pitch_status(self, pitch_id: str, status: PitchStatus):
         """
         Update the status of a pitch record in the database.
         
+        A pitch's scores enter or leave the score histograms when it becomes
+        or stops being completed, in the same transaction.
+        
         Args:
             pitch_id: The ID of the pitch to update
             status: The new status to set
         """
         async with get_prisma() as prisma:
-            updated_pitch = await prisma.pitch.update(
-                where={"id": pitch_id},
-                data={"status": status}
-            )
+            async with prisma.tx() as transaction:
+                previous_status = await self.lock_pitch_status(transaction, pitch_id)
+                deltas = {}
+                if (previous_status == PitchStatus.COMPLETED.value) != (status == PitchStatus.COMPLETED):
+                    existing_feedback = await transaction.feedback.find_unique(where={"pitchId": pitch_id})
+                    score = DeckVersioningService().parse_score(existing_feedback)
+                    deltas = self.score_stats.histogram_deltas(
+                        self.score_stats.counted_score(score, PitchStatus(status).value),
+                        self.score_stats.counted_score(score, previous_status)
+                    )
+                    await self.score_stats.write_deltas(transaction, deltas)
+                updated_pitch = await transaction.pitch.update(
+                    where={"id": pitch_id},
+                    data={"status": status}
+                )
+            self.score_stats.applied(deltas)
             logger.info(f"Updated pitch {pitch_id} status to: {status}")
             return updated_pitch
         
-    async def update_pitch_feedback_and_score(self, pitch_id: str, feedback: FeedbackModel=None, score: ScoreModel = None, pitch_content: str = None):
+    async def update_pitch_feedback_and_score(self, pitch_id: str, feedback: FeedbackModel=None, score: ScoreModel = None, pitch_content: str = None, status: Optional[PitchStatus] = None, questions: Optional[List[QuestionItem]] = None):
         """
         Update or create feedback for a pitch record in the database.
         
+        Feedback, scores, score histograms, investor questions and the pitch
+        status are written in a single transaction. Scores and suggestions are stored as native JSON
+        objects, so that they can be queried and indexed per field.
+        
         Args:
             pitch_id: The ID of the pitch to update feedback for
             feedback: The feedback data to store
             score: The score data to store
             pitch_content: The elevator pitch content to store
+            status: New status of the pitch, if it changes with this write
+            questions: Investor questions generated with the evaluation, if any
         
         Returns:
             The updated/created feedback record
@@ -92,7 +351,7 @@ class DatabaseActions:
             
             if score:
                 feedback_data["overallScore"] = score.overall
-                feedback_data["scores"] = json.dumps({
+                feedback_data["scores"] = Json({
                     "clarity": {"score": score.clarity},
                     "differentiation": {"score": score.differentiation},
                     "traction": {"score": score.traction},
@@ -100,7 +359,7 @@ class DatabaseActions:
                 })
             
             if feedback:
-                feedback_data["suggestions"] = json.dumps({
+                feedback_data["suggestions"] = Json({
                     "overall_feedback": feedback.overall_feedback,
                     "strengths": feedback.strengths,
                     "weaknesses": feedback.weaknesses,
@@ -109,26 +368,94 @@ class DatabaseActions:
                     "suggestions": feedback.suggestions
                 })
             
-            # Check if feedback already exists
-            existing_feedback = await prisma.feedback.find_unique(
-                where={"pitchId": pitch_id}
-            )
-            
-            if existing_feedback:
-                # Update existing feedback
-                updated_feedback = await prisma.feedback.update(
-                    where={"pitchId": pitch_id},
-                    data=feedback_data
+            # The score histograms change in the same transaction as the scores they count
+            async with prisma.tx() as transaction:
+                # Serialize with other writes of this pitch before reading what they left
+                previous_status = await self.lock_pitch_status(transaction, pitch_id)
+                
+                # Check if feedback already exists
+                existing_feedback = await transaction.feedback.find_unique(
+                    where={"pitchId": pitch_id}
+                )
+                
+                # Only completed pitches are counted: replace the old contribution
+                # with the new one, which also covers the transition to COMPLETED
+                previous_score = DeckVersioningService().parse_score(existing_feedback)
+                new_status = PitchStatus(status).value if status else previous_status
+                deltas = self.score_stats.histogram_deltas(
+                    self.score_stats.counted_score(score or previous_score, new_status),
+                    self.score_stats.counted_score(previous_score, previous_status)
                 )
-                logger.info(f"Updated existing feedback for pitch {pitch_id}")
-                return updated_feedback
-            else:
-                # Create new feedback
-                new_feedback = await prisma.feedback.create(
+                await self.score_stats.write_deltas(transaction, deltas)
+                
+                saved_feedback = await transaction.feedback.upsert(
+                    where={"pitchId": pitch_id},
                     data={
-                        "pitchId": pitch_id,
-                        **feedback_data
+                        "create": {"pitchId": pitch_id, **feedback_data},
+                        "update": feedback_data
                     }
                 )
-                logger.info(f"Created new feedback for pitch {pitch_id}")
-                return new_feedback
+                logger.info(f"{'Updated existing' if existing_feedback else 'Created new'} feedback for pitch {pitch_id}")
+                
+                if questions:
+                    await self.upsert_investor_questions(transaction, pitch_id, questions)
+                
+                if status:
+                    await transaction.pitch.update(
+                        where={"id": pitch_id},
+                        data={"status": status}
+                    )
+                    logger.info(f"Updated pitch {pitch_id} status to: {status}")
+            
+            self.score_stats.applied(deltas)
+            return saved_feedback
+
+    async def upsert_investor_questions(self, client, pitch_id: str, questions: List[QuestionItem]):
+        """
+        Replace the investor questions of a pitch.
+        
+        Args:
+            client: Prisma client or transaction to write with
+            pitch_id: The ID of the pitch
+            questions: Questions to store
+        
+        Returns:
+            The updated/created InvestorQuestions record
+        """
+        data = Json([question.model_dump() for question in questions])
+        record = await client.investorquestions.upsert(
+            where={"pitchId": pitch_id},
+            data={
+                "create": {"pitchId": pitch_id, "questions": data},
+                "update": {"questions": data}
+            }
+        )
+        logger.info(f"Stored {len(questions)} investor questions for pitch {pitch_id}")
+        return record
+
+    async def save_investor_questions(self, pitch_id: str, questions: List[QuestionItem]):
+        """
+        Store investor questions generated outside of an evaluation.
+        
+        Args:
+            pitch_id: The ID of the pitch
+            questions: Questions to store
+        
+        Returns:
+            The updated/created InvestorQuestions record
+        """
+        async with get_prisma() as prisma:
+            return await self.upsert_investor_questions(prisma, pitch_id, questions)
+
+    async def get_investor_questions(self, pitch_id: str):
+        """
+        Get the investor questions of a pitch.
+        
+        Args:
+            pitch_id: The ID of the pitch
+        
+        Returns:
+            The InvestorQuestions record, None if no questions were generated
+        """
+        async with get_prisma() as prisma:
+            return await prisma.investorquestions.find_unique(where={"pitchId": pitch_id})
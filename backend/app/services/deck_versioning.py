@@ -0,0 +1,205 @@
+# app/services/deck_versioning.py
+import json
+import hashlib
+import logging
+from typing import List, Optional, Any
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+from app.schemas.pitch_schema import SlideContent, SlideDiff, RevisionContext, FeedbackModel, ScoreModel, QuestionItem
+from app.schemas.document_schema import ExtractedDocument, SectionKind
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class DeckVersioningService:
+    """Per-slide hashing and diffing between versions of the same deck."""
+
+    def __init__(self, max_changed_ratio: float = 0.6):
+        """
+        Initialize DeckVersioningService instance.
+
+        Args:
+            max_changed_ratio (float): Above this fraction of changed slides a
+                full re-evaluation is cheaper than an incremental one
+        """
+        self.max_changed_ratio = max_changed_ratio
+
+    def split_slides(self, document: ExtractedDocument) -> List[SlideContent]:
+        """
+        Split an extracted document into slides.
+
+        PPTX and PDF documents map one slide or page to a section. Single-block
+        formats (DOCX, TXT) fall back to their blank-line separated spans.
+
+        Args:
+            document (ExtractedDocument): Extracted deck
+
+        Returns:
+            List[SlideContent]: Slides in document order
+        """
+        sections = list(document.iter_sections())
+        slides = []
+
+        if len(sections) > 1 or (sections and sections[0].kind != SectionKind.BLOCK):
+            for section in sections:
+                slides.append(SlideContent(number=section.number, text=section.render(document.span_separator, with_header=False)))
+        else:
+            blocks = [block.strip() for block in document.text.split("\n\n")]
+            for number, block in enumerate((b for b in blocks if b), 1):
+                slides.append(SlideContent(number=number, text=block))
+
+        logger.debug(f"Split deck into {len(slides)} slides")
+        return slides
+
+    def hash_slide(self, text: str) -> str:
+        """Return a whitespace-insensitive content hash for a slide."""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def compute_slide_hashes(self, slides: List[SlideContent]) -> List[str]:
+        """Return the content hash of every slide, in slide order."""
+        return [self.hash_slide(slide.text) for slide in slides]
+
+    def diff_slides(self, previous_hashes: List[str], slides: List[SlideContent]) -> SlideDiff:
+        """
+        Diff the slides of a new deck version against the hashes of the previous one.
+
+        Slides are matched by content rather than position, so moving a slide
+        does not count as a change.
+
+        Args:
+            previous_hashes (List[str]): Slide hashes of the previous version
+            slides (List[SlideContent]): Slides of the new version
+
+        Returns:
+            SlideDiff: Changed and removed slides
+        """
+        new_hashes = self.compute_slide_hashes(slides)
+        previous_set = set(previous_hashes)
+        new_set = set(new_hashes)
+
+        changed = [slide for slide, slide_hash in zip(slides, new_hashes) if slide_hash not in previous_set]
+        removed = [number for number, slide_hash in enumerate(previous_hashes, 1) if slide_hash not in new_set]
+
+        diff = SlideDiff(
+            total_slides=len(slides),
+            changed_slides=changed,
+            removed_slide_numbers=removed
+        )
+        logger.info(
+            f"Slide diff - total: {diff.total_slides}, changed: {len(changed)}, removed: {len(removed)}"
+        )
+        return diff
+
+    def load_json_field(self, value: Any) -> Any:
+        """
+        Decode a Prisma Json column.
+
+        Columns are written as native JSON; rows written before
+        prisma/sql/001_native_feedback_json.sql ran still hold a JSON-encoded
+        string and are decoded a second time (counted as db.legacy_json_reads).
+        """
+        if value is None:
+            return None
+        if isinstance(value, str):
+            metrics.increment("db.legacy_json_reads")
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                return None
+        return value
+
+    def parse_feedback(self, feedback) -> Optional[FeedbackModel]:
+        """
+        Read the structured feedback stored on a Feedback record.
+
+        Args:
+            feedback: Feedback record
+
+        Returns:
+            Optional[FeedbackModel]: None when the pitch was never analyzed
+        """
+        if feedback is None:
+            return None
+        return self.feedback_from_json(feedback.suggestions)
+
+    def feedback_from_json(self, suggestions: Any) -> Optional[FeedbackModel]:
+        """Build the structured feedback from a `suggestions` column value, None when empty."""
+        suggestions = self.load_json_field(suggestions)
+        if not suggestions:
+            return None
+        return FeedbackModel(**suggestions)
+
+    def parse_score(self, feedback) -> Optional[ScoreModel]:
+        """
+        Read the scores stored on a Feedback record.
+
+        Args:
+            feedback: Feedback record
+
+        Returns:
+            Optional[ScoreModel]: None when the pitch was never scored
+        """
+        if feedback is None:
+            return None
+        return self.score_from_json(feedback.scores, feedback.overallScore)
+
+    def parse_questions(self, record) -> List[QuestionItem]:
+        """
+        Read the questions stored on an InvestorQuestions record.
+
+        Args:
+            record: InvestorQuestions record
+
+        Returns:
+            List[QuestionItem]: Empty when no questions were generated
+        """
+        if record is None:
+            return []
+        return [QuestionItem.model_validate(question) for question in self.load_json_field(record.questions) or []]
+
+    def score_from_json(self, scores: Any, overall_score: Optional[float]) -> Optional[ScoreModel]:
+        """Build the scores from a `scores` column value and the overall score, None when unscored."""
+        scores = self.load_json_field(scores)
+        if not scores or overall_score is None:
+            return None
+        return ScoreModel(
+            clarity=scores.get("clarity", {}).get("score", 0.0),
+            differentiation=scores.get("differentiation", {}).get("score", 0.0),
+            traction=scores.get("traction", {}).get("score", 0.0),
+            scalability=scores.get("scalability", {}).get("score", 0.0),
+            overall=overall_score
+        )
+
+    def build_revision_context(self, previous_pitch, diff: SlideDiff) -> Optional[RevisionContext]:
+        """
+        Build the revision context handed to the agents for an incremental run.
+
+        Args:
+            previous_pitch: Previous pitch version record with feedback included
+            diff (SlideDiff): Slide diff against the previous version
+
+        Returns:
+            Optional[RevisionContext]: None when a full evaluation is required
+        """
+        if not previous_pitch or not previous_pitch.feedback:
+            return None
+
+        if diff.total_slides and diff.changed_ratio > self.max_changed_ratio:
+            logger.info(f"Changed ratio {diff.changed_ratio:.2f} too high for incremental evaluation")
+            return None
+
+        previous_feedback = self.parse_feedback(previous_pitch.feedback)
+        previous_score = self.parse_score(previous_pitch.feedback)
+
+        if previous_feedback is None and previous_score is None:
+            return None
+
+        return RevisionContext(
+            previous_pitch_id=previous_pitch.id,
+            previous_feedback=previous_feedback,
+            previous_score=previous_score,
+            diff=diff
+        )
@@ -0,0 +1,95 @@
+# app/services/embedding_service.py
+import os
+import re
+import zlib
+import logging
+import numpy as np
+from typing import Optional
+from app.config.logging_config import setup_logging
+
+# Sentence-transformers is optional, the hashing embedder needs no model download
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.,%$][0-9]+)*")
+
+# Loaded once per process
+_model = None
+
+
+class EmbeddingService:
+    """
+    Local text embeddings for deck similarity, without any network call.
+
+    EMBEDDING_BACKEND selects the embedder:
+      - hashing (default): signed feature hashing of word unigrams and bigrams
+        into EMBEDDING_DIM dimensions with sublinear term frequency. Cheap and
+        deterministic, good at near-duplicate detection.
+      - sentence-transformers: the local EMBEDDING_MODEL, for semantic similarity.
+    Vectors are L2-normalized, so a dot product is the cosine similarity.
+    """
+
+    def __init__(self, backend: Optional[str] = None, dim: Optional[int] = None):
+        self.backend = (backend or os.getenv("EMBEDDING_BACKEND", "hashing")).lower()
+        self.model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+        if self.backend == "sentence-transformers" and not SENTENCE_TRANSFORMERS_AVAILABLE:
+            logger.warning("sentence-transformers is not installed, falling back to the hashing embedder")
+            self.backend = "hashing"
+        self.dim = dim or int(os.getenv("EMBEDDING_DIM", "256"))
+        if self.backend == "sentence-transformers":
+            self.dim = self._get_model().get_sentence_embedding_dimension()
+
+    @property
+    def name(self) -> str:
+        """Identifies the embedding space, vectors of different spaces are not comparable."""
+        if self.backend == "sentence-transformers":
+            return f"sentence-transformers:{self.model_name}"
+        return f"hashing:{self.dim}"
+
+    def _get_model(self):
+        global _model
+        if _model is None:
+            logger.info(f"Loading embedding model {self.model_name}")
+            _model = SentenceTransformer(self.model_name)
+        return _model
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a document.
+
+        Args:
+            text (str): Document text
+
+        Returns:
+            np.ndarray: L2-normalized float32 vector of `self.dim` values
+        """
+        if self.backend == "sentence-transformers":
+            vector = self._get_model().encode(text, normalize_embeddings=True)
+            return np.asarray(vector, dtype=np.float32)
+        return self._embed_hashing(text)
+
+    def _embed_hashing(self, text: str) -> np.ndarray:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+        if not features:
+            return np.zeros(self.dim, dtype=np.float32)
+
+        hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.uint32, count=len(features))
+        indexes = (hashes % self.dim).astype(np.int64)
+        # The top bit decides the sign, so that colliding features tend to cancel out
+        signs = np.where(hashes >> 31, -1.0, 1.0)
+
+        positive = np.bincount(indexes, weights=(signs > 0), minlength=self.dim)
+        negative = np.bincount(indexes, weights=(signs < 0), minlength=self.dim)
+        vector = (np.log1p(positive) - np.log1p(negative)).astype(np.float32)
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
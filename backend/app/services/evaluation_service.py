@@ -0,0 +1,435 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from typing import Optional, Set
+from fastapi import HTTPException
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+from app.schemas.pitch_schema import PitchCreate, PitchData, PitchStatus, EvaluationRequest, EvaluationResponse, EvaluationKind
+from app.services.file_service import FileService
+from app.services.db_actions import DatabaseActions
+from app.services.deck_versioning import DeckVersioningService
+from app.services.embedding_service import EmbeddingService
+from app.services.text_normalizer import TextNormalizer
+from app.services.content_store import DeckContentStore
+from app.services.prescorer import PitchPreScorer
+from app.services.vector_index import VectorIndex, get_vector_index
+from app.ai.pitch_graph import PitchGraph
+from app.ai.agents import investor_qna_agent
+from app.ai.routing import classify_user_query
+from app.ai.resilience import deadline_scope
+
+# Set up logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Investor Q&A runs outlive the request that started them, keep them referenced
+_qna_tasks: Set[asyncio.Task] = set()
+
+
+class EvaluationService:
+    """Runs the full evaluation pipeline of one pitch submission."""
+
+    def __init__(self):
+        self.file_service = FileService()
+        self.db_actions = DatabaseActions()
+        self.versioning = DeckVersioningService()
+        self.embedder = EmbeddingService()
+        self.normalizer = TextNormalizer()
+        self.content_store = DeckContentStore()
+        self.prescorer = PitchPreScorer()
+
+    @property
+    def vector_index(self) -> VectorIndex:
+        """Process-wide similarity index of the configured embedding space."""
+        return get_vector_index(self.embedder.name, self.embedder.dim)
+
+    def covers_evaluation(self, revision, evaluation_kind: EvaluationKind) -> bool:
+        """
+        Whether the previous version stored everything a query asks for.
+
+        Args:
+            revision: Revision context of the upload, with the previous feedback and score
+            evaluation_kind (EvaluationKind): What the new query asks for
+
+        Returns:
+            bool: True when the previous evaluation can be reused for the query
+        """
+        if evaluation_kind == EvaluationKind.ANALYSIS_ONLY:
+            return revision.previous_feedback is not None
+        if evaluation_kind == EvaluationKind.SCORING_ONLY:
+            return revision.previous_score is not None
+        return revision.previous_feedback is not None and revision.previous_score is not None
+
+    def use_investor_qna(self, pitch_data: PitchData) -> bool:
+        """
+        Decide whether investor questions are generated along with an evaluation.
+
+        Enabled with QNA_ENABLED (default true) for full evaluations only;
+        analysis-only and scoring-only requests did not ask for them.
+        """
+        if os.getenv("QNA_ENABLED", "true").lower() != "true":
+            return False
+        return classify_user_query(pitch_data.user_query) == EvaluationKind.FULL
+
+    def start_investor_qna(self, pitch_id: str, pitch_data: PitchData) -> asyncio.Task:
+        """
+        Generate the investor questions of a pitch next to its evaluation.
+
+        The Q&A never holds the evaluation response: it stores its questions
+        itself once done, and GET /pitches/{id}/questions serves them. It runs
+        under the deadline of the request that started it.
+
+        Args:
+            pitch_id (str): The ID of the pitch
+            pitch_data (PitchData): Pitch to question
+
+        Returns:
+            asyncio.Task: The running Q&A, to cancel if the evaluation fails
+        """
+        task = asyncio.create_task(self.generate_investor_questions(pitch_id, pitch_data))
+        _qna_tasks.add(task)
+        task.add_done_callback(_qna_tasks.discard)
+        return task
+
+    async def generate_investor_questions(self, pitch_id: str, pitch_data: PitchData) -> None:
+        """Run the investor Q&A of a pitch and store its questions; failures are logged only."""
+        try:
+            with metrics.timer("qna.total"):
+                questions = await investor_qna_agent(pitch_data)
+            if questions:
+                await self.db_actions.save_investor_questions(pitch_id, questions)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            metrics.increment("qna.failed")
+            logger.error(f"Investor Q&A of pitch {pitch_id} failed: {str(e)}")
+
+    async def get_parent_pitch(self, parent_pitch_id: Optional[str]):
+        """
+        Pitch an upload revises, when the client named one.
+
+        Args:
+            parent_pitch_id (Optional[str]): ID of the revised pitch
+
+        Returns:
+            The parent pitch record with feedback included, or None
+
+        Raises:
+            HTTPException: 404 if the parent pitch does not exist
+        """
+        if not parent_pitch_id:
+            return None
+        parent_pitch = await self.db_actions.get_pitch(parent_pitch_id)
+        if not parent_pitch:
+            raise HTTPException(status_code=404, detail="Parent pitch not found")
+        return parent_pitch
+
+    def deck_key_for(self, parent_pitch) -> str:
+        """
+        Deck of a new upload: the deck of its parent, or a new deck.
+
+        Decks are only continued when the client names the revised pitch,
+        never matched by title, so an upload never reuses the evaluation of
+        somebody else's deck with the same title.
+        """
+        if parent_pitch is None:
+            return uuid.uuid4().hex
+        return parent_pitch.deckKey or parent_pitch.id
+
+    async def evaluate(self, request: EvaluationRequest) -> EvaluationResponse:
+        """
+        Extract, store, version and evaluate a pitch, then persist the results.
+
+        The whole pipeline runs under one deadline of EVALUATION_SLA_SECONDS,
+        from which the LLM calls of the graph get their time budgets.
+
+        Args:
+            request (EvaluationRequest): The pitch submission
+
+        Returns:
+            EvaluationResponse: Feedback and scores of the pitch
+
+        Raises:
+            HTTPException: If any stage fails
+        """
+        with deadline_scope():
+            return await self._evaluate(request)
+
+    async def submit(self, request: EvaluationRequest):
+        """
+        Store a pitch submission and queue its evaluation for the workers.
+
+        Args:
+            request (EvaluationRequest): The pitch submission
+
+        Returns:
+            The created pitch record, with status PENDING
+        """
+        parent_pitch = await self.get_parent_pitch(request.parent_pitch_id)
+        file_path, file_type = await self.file_service.save_file_content(
+            request.file_content, request.filename, request.content_type
+        )
+        pitch = await self.db_actions.create_pitch(
+            PitchCreate(title=request.title, description=request.description, file_type=file_type, user_query=request.user_query),
+            file_path,
+            deck_key=self.deck_key_for(parent_pitch),
+            parent_pitch=parent_pitch,
+            queued=True
+        )
+        metrics.increment("queue.enqueued")
+        logger.info(f"Queued evaluation of pitch {pitch.id}")
+        return pitch
+
+    async def evaluate_queued(self, pitch) -> EvaluationResponse:
+        """
+        Evaluate a pitch claimed from the queue.
+
+        The stored file is read back and runs through the same pipeline as an
+        inline evaluation, updating the existing pitch record. Errors are
+        raised as is, for the worker to retry the job.
+
+        Args:
+            pitch: Claimed pitch record
+
+        Returns:
+            EvaluationResponse: Feedback and scores of the pitch
+        """
+        request = EvaluationRequest(
+            file_content=await self.file_service.download_file(pitch.filePath),
+            filename=f"{pitch.id}.{pitch.fileType}",
+            title=pitch.title,
+            description=pitch.description,
+            user_query=pitch.userQuery,
+            parent_pitch_id=pitch.parentId
+        )
+        with deadline_scope():
+            return await self._evaluate(request, pitch)
+
+    async def _evaluate(self, request: EvaluationRequest, queued_pitch=None) -> EvaluationResponse:
+        request_start = time.perf_counter()
+        new_pitch = None
+        file_path = None
+        qna_task = None
+        stage = "extract"
+        try:
+            file_type = self.file_service.get_file_type(request.filename)
+            parent_pitch = await self.get_parent_pitch(request.parent_pitch_id)
+            with metrics.timer("stage.extract"):
+                document = await self.file_service.extract_document_from_content(request.file_content, file_type)
+            stage = "normalize"
+            with metrics.timer("stage.normalize"):
+                document, normalization = await asyncio.to_thread(self.normalizer.normalize, document)
+            metrics.increment("normalization.tokens_before", normalization.tokens_before)
+            metrics.increment("normalization.tokens_saved", normalization.tokens_saved)
+            logger.info(
+                f"Normalized deck text ({normalization.level}): {normalization.tokens_before} -> "
+                f"{normalization.tokens_after} tokens ({normalization.saved_ratio:.1%} saved), removed {normalization.removed_lines}"
+            )
+            file_content = document.text
+            logger.info(f"Extracted {len(document.sections)} sections, {len(file_content)} characters")
+            if queued_pitch is None:
+                stage = "upload"
+                with metrics.timer("stage.upload"):
+                    file_path, file_type = await self.file_service.save_file_content(
+                        request.file_content, request.filename, request.content_type
+                    )
+                logger.info(f"File uploaded successfully to {file_path}")
+
+            # Create pitch data object
+            new_pitch_data = PitchCreate(
+                title=request.title,
+                description=request.description,
+                file_type=file_type,
+                file_content=file_content,
+                user_query=request.user_query
+            )
+
+            # Diff the slides against the version the upload revises
+            deck_key = queued_pitch.deckKey if queued_pitch is not None else self.deck_key_for(parent_pitch)
+            slides = self.versioning.split_slides(document)
+            slide_hashes = self.versioning.compute_slide_hashes(slides)
+            stage = "embed"
+            with metrics.timer("stage.embed"):
+                embedding = await asyncio.to_thread(self.embedder.embed, file_content)
+
+            stage = "db_setup"
+            with metrics.timer("stage.db_setup"):
+                content_hash = None
+                try:
+                    content_hash = await self.content_store.put(document)
+                except Exception as content_error:
+                    logger.error(f"Failed to store the deck content: {str(content_error)}")
+                revision = None
+                if parent_pitch and parent_pitch.status == PitchStatus.COMPLETED and parent_pitch.slideHashes:
+                    diff = self.versioning.diff_slides(self.versioning.load_json_field(parent_pitch.slideHashes), slides)
+                    revision = self.versioning.build_revision_context(parent_pitch, diff)
+
+                if queued_pitch is None:
+                    # Store in database using db_actions service
+                    new_pitch = await self.db_actions.create_pitch(new_pitch_data, file_path, deck_key, slide_hashes, parent_pitch, content_hash=content_hash)
+
+                    update_pitch_status = await self.db_actions.update_pitch_status(new_pitch.id, PitchStatus.PROCESSING)
+                    logger.info(f"Pitch status updated to: {update_pitch_status}")
+                else:
+                    # Claiming the job already set the queued pitch to PROCESSING
+                    new_pitch = await self.db_actions.update_pitch_slides(queued_pitch.id, slide_hashes, content_hash)
+
+            evaluation_kind = classify_user_query(request.user_query)
+            if revision and revision.diff.is_unchanged and self.covers_evaluation(revision, evaluation_kind):
+                # Nothing changed since the previous version and it stored what
+                # this query asks for: reuse that part of its evaluation
+                logger.info(f"Deck unchanged since pitch {revision.previous_pitch_id}, skipping evaluation")
+                questions = None
+                if evaluation_kind == EvaluationKind.FULL:
+                    try:
+                        previous_questions = await self.db_actions.get_investor_questions(revision.previous_pitch_id)
+                        questions = self.versioning.parse_questions(previous_questions) or None
+                    except Exception as questions_error:
+                        logger.error(f"Failed to load the investor questions of pitch {revision.previous_pitch_id}: {str(questions_error)}")
+                evaluation_response = EvaluationResponse(
+                    feedback=revision.previous_feedback if evaluation_kind != EvaluationKind.SCORING_ONLY else None,
+                    score=revision.previous_score if evaluation_kind != EvaluationKind.ANALYSIS_ONLY else None,
+                    questions=questions
+                )
+            else:
+                # Deck facts from the local pre-scorer, sent to the agents along with the deck
+                features = None
+                if os.getenv("PRESCORE_PROMPT_CONTEXT", "false").lower() == "true":
+                    with metrics.timer("stage.prescore"):
+                        features = self.prescorer.extract(document)
+
+                # Create PitchData for analysis with user query
+                analysis_pitch_data = PitchData(
+                    document=document,
+                    user_query=request.user_query,
+                    revision=revision,
+                    features=features
+                )
+
+                if self.use_investor_qna(analysis_pitch_data):
+                    qna_task = self.start_investor_qna(new_pitch.id, analysis_pitch_data)
+
+                stage = "graph"
+                with metrics.timer("stage.graph"):
+                    evaluation_response = await PitchGraph().analyze_pitch(analysis_pitch_data)
+            logger.info(
+                f"Evaluated pitch {new_pitch.id}: overall score "
+                f"{evaluation_response.score.overall if evaluation_response.score else None}, "
+                f"{len(evaluation_response.questions or [])} questions"
+            )
+
+            # Store feedback, scores and the COMPLETED status in one transaction
+            stage = "persist"
+            persist_start = time.perf_counter()
+            persisted = False
+            if evaluation_response.feedback or evaluation_response.score:
+                try:
+                    await self.db_actions.update_pitch_feedback_and_score(
+                        pitch_id=new_pitch.id,
+                        feedback=evaluation_response.feedback,
+                        score=evaluation_response.score,
+                        status=PitchStatus.COMPLETED,
+                        questions=evaluation_response.questions
+                    )
+                    persisted = True
+                    logger.info(f"Updated feedback and score for pitch {new_pitch.id}")
+                except Exception as db_error:
+                    logger.error(f"Failed to update pitch feedback and score: {str(db_error)}")
+                    # Continue with response even if database update fails
+
+            if not persisted:
+                try:
+                    update_pitch_status = await self.db_actions.update_pitch_status(new_pitch.id, PitchStatus.COMPLETED)
+                    logger.info(f"Pitch status updated to: {update_pitch_status}")
+                except Exception as status_error:
+                    logger.error(f"Failed to update pitch status to COMPLETED: {str(status_error)}")
+                    # Continue with response even if status update fails
+            metrics.observe("stage.db_persist", (time.perf_counter() - persist_start) * 1000)
+
+            if evaluation_response.feedback or evaluation_response.score:
+                try:
+                    await asyncio.to_thread(self.vector_index.add, new_pitch.id, embedding)
+                except Exception as index_error:
+                    logger.error(f"Failed to add pitch {new_pitch.id} to the similarity index: {str(index_error)}")
+            metrics.observe("stage.total", (time.perf_counter() - request_start) * 1000)
+            metrics.increment("evaluations.completed")
+
+            return EvaluationResponse(
+                feedback=evaluation_response.feedback,
+                score=evaluation_response.score,
+                questions=evaluation_response.questions
+            )
+        except asyncio.CancelledError:
+            if qna_task is not None:
+                qna_task.cancel()
+            # A cancelled queued job is taken over by another worker, keep its pitch and file
+            if queued_pitch is None:
+                await asyncio.shield(self.handle_cancelled(new_pitch, file_path, stage, request_start))
+            raise
+        except HTTPException:
+            metrics.increment("evaluations.failed")
+            if qna_task is not None:
+                qna_task.cancel()
+            if queued_pitch is None:
+                await self.mark_failed(new_pitch)
+            raise
+        except Exception as e:
+            metrics.increment("evaluations.failed")
+            if qna_task is not None:
+                qna_task.cancel()
+            if queued_pitch is not None:
+                # The worker decides between a retry and a final failure
+                raise
+            await self.mark_failed(new_pitch)
+            logger.error(f"Error processing pitch upload: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail="An unexpected error occurred while processing your pitch. Please try again later."
+            )
+
+    async def handle_cancelled(self, pitch, file_path: Optional[str], stage: str, request_start: float) -> None:
+        """
+        Clean up after an evaluation cancelled because every client waiting for it went away.
+
+        The pitch is marked CANCELLED in a single write and the stored file is
+        removed. The work avoided is estimated from the median duration of
+        completed evaluations.
+
+        Args:
+            pitch: Pitch record, if it was created
+            file_path (Optional[str]): Stored file, if it was uploaded
+            stage (str): Pipeline stage that was running
+            request_start (float): perf_counter() value at the start of the evaluation
+        """
+        elapsed_ms = (time.perf_counter() - request_start) * 1000
+        metrics.increment("evaluations.cancelled")
+        metrics.increment(f"evaluations.cancelled.{stage}")
+        metrics.observe("evaluations.cancelled_after", elapsed_ms)
+        typical_ms = metrics.percentile("stage.total", 50)
+        if typical_ms is not None:
+            metrics.increment("evaluations.cancelled_saved_ms", max(0.0, typical_ms - elapsed_ms))
+        logger.info(f"Evaluation cancelled during {stage} after {elapsed_ms:.0f} ms")
+
+        if pitch is not None:
+            try:
+                await self.db_actions.update_pitch_status(pitch.id, PitchStatus.CANCELLED)
+            except Exception as status_error:
+                logger.error(f"Failed to update pitch status to CANCELLED: {str(status_error)}")
+        if file_path is not None:
+            try:
+                await self.file_service.delete_file(file_path)
+            except Exception as storage_error:
+                logger.error(f"Failed to remove stored file of cancelled evaluation: {str(storage_error)}")
+
+    async def mark_failed(self, pitch) -> None:
+        """Update the pitch status to FAILED if the pitch was created."""
+        if pitch is None:
+            return
+        try:
+            await self.db_actions.update_pitch_status(pitch.id, PitchStatus.FAILED)
+            logger.info(f"Pitch {pitch.id} status updated to FAILED")
+        except Exception as status_error:
+            logger.error(f"Failed to update pitch status to FAILED: {str(status_error)}")
@@ -2,22 +2,31 @@
 import os
 import logging
 import io
+import time
+import asyncio
 from fastapi import UploadFile, HTTPException
-from typing import Tuple
+from typing import Optional, Tuple
 import uuid
+from urllib.parse import urlparse
 from app.config.logging_config import setup_logging
 from app.services.supabase_connection import SupabaseConnection
+from app.services.ocr_service import OcrService
+from app.schemas.document_schema import ExtractedDocument, DocumentSection, SectionKind
 
 # Text extraction imports
 import PyPDF2
 import pdfplumber
 from docx import Document
 from pptx import Presentation
+from pptx.shapes.group import GroupShape
 
 # Setup logging
 setup_logging() 
 logger = logging.getLogger(__name__)
 
+# Pages with less text than this from the fast PDF parser are re-extracted with pdfplumber
+PDF_FAST_MIN_CHARS = int(os.getenv("PDF_FAST_MIN_CHARS", "20"))
+
 
 class FileService:
     def __init__(self):
@@ -50,85 +59,169 @@ class FileService:
                 detail="Unsupported file type. Supported types: pdf, pptx, docx, txt"
             )
     
-    def extract_text_from_pdf(self, file_content: bytes) -> str:
+    def is_fast_pdf_text_usable(self, page_text: str) -> bool:
         """
-        Extract text from PDF file content.
+        Check whether a page extracted by the fast PyPDF2 parser is good enough to keep.
+        
+        Rejects pages that are empty or too short, contain unmapped glyphs, or
+        look like a complex layout where words ran together or got split into
+        single characters.
+        
+        Args:
+            page_text (str): Text extracted by PyPDF2
+            
+        Returns:
+            bool: True if the text can be used without pdfplumber
+        """
+        stripped = page_text.strip() if page_text else ""
+        if len(stripped) < PDF_FAST_MIN_CHARS:
+            return False
+        
+        if "(cid:" in stripped or "\ufffd" in stripped:
+            return False
+        
+        printable = sum(1 for char in stripped if char.isprintable() or char in "\n\t")
+        if printable / len(stripped) < 0.97:
+            return False
+        
+        words = stripped.split()
+        average_word_length = sum(len(word) for word in words) / len(words)
+        return 2.0 <= average_word_length <= 15.0
+    
+    def extract_document_from_pdf(self, file_content: bytes) -> ExtractedDocument:
+        """
+        Extract a structured document from PDF file content, one section per page.
+        
+        Every page is first read with the fast PyPDF2 parser. Only the pages whose
+        text fails the quality heuristics are re-extracted with pdfplumber, which
+        computes the full character layout. The engine used per page and the
+        timings are recorded in the document metadata.
         
         Args:
             file_content (bytes): PDF file content
             
         Returns:
-            str: Extracted text content
+            ExtractedDocument: Extracted document
         """
         logger.info("Extracting text from PDF file")
         try:
-            # Try with pdfplumber first (better for complex layouts)
-            with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-                text_content = []
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(page_text)
-                
-                if text_content:
-                    extracted_text = "\n\n".join(text_content)
-                    logger.info(f"Successfully extracted {len(extracted_text)} characters using pdfplumber")
-                    return extracted_text
+            start_time = time.perf_counter()
+            engine_mode = os.getenv("PDF_ENGINE", "auto").lower()
+            page_texts = []
+            
+            # Probe the text layer with the fast parser
+            if engine_mode != "pdfplumber":
+                try:
+                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+                    page_texts = [page.extract_text() or "" for page in pdf_reader.pages]
+                except Exception as probe_error:
+                    logger.warning(f"PyPDF2 probe failed, using pdfplumber for all pages: {str(probe_error)}")
+                    page_texts = []
+            probe_time = time.perf_counter() - start_time
+            
+            if engine_mode == "pypdf2" and page_texts:
+                slow_pages = []
+            elif page_texts:
+                slow_pages = [index for index, page_text in enumerate(page_texts) if not self.is_fast_pdf_text_usable(page_text)]
+            else:
+                slow_pages = None
             
-            # Fallback to PyPDF2 if pdfplumber fails
-            logger.info("Falling back to PyPDF2 for PDF extraction")
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text_content = []
+            # Re-extract complex-layout pages with pdfplumber (better for complex layouts)
+            fallback_start = time.perf_counter()
+            if slow_pages is None or slow_pages:
+                with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+                    if slow_pages is None:
+                        page_texts = [page.extract_text() or "" for page in pdf.pages]
+                        slow_pages = list(range(len(page_texts)))
+                    else:
+                        for index in slow_pages:
+                            page_text = pdf.pages[index].extract_text() or ""
+                            # Keep the fast text when pdfplumber finds nothing better
+                            if len(page_text.strip()) >= len(page_texts[index].strip()):
+                                page_texts[index] = page_text
+            fallback_time = time.perf_counter() - fallback_start
             
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
+            # OCR pages that have no text layer at all (image-only slides)
+            empty_pages = [index for index, page_text in enumerate(page_texts) if not page_text.strip()]
+            ocr_stats = None
+            if empty_pages:
+                ocr_texts, ocr_stats = OcrService().ocr_pdf_pages(file_content, empty_pages)
+                for index, page_text in ocr_texts.items():
+                    page_texts[index] = page_text
+            
+            sections = []
+            for page_num, page_text in enumerate(page_texts, 1):
                 if page_text:
-                    text_content.append(page_text)
+                    sections.append(DocumentSection(number=page_num, kind=SectionKind.PAGE, spans=[page_text]))
             
-            extracted_text = "\n\n".join(text_content)
-            logger.info(f"Successfully extracted {len(extracted_text)} characters using PyPDF2")
-            return extracted_text
+            if not slow_pages:
+                engine = "pypdf2"
+            elif len(slow_pages) == len(page_texts):
+                engine = "pdfplumber"
+            else:
+                engine = "mixed"
             
+            metadata = {
+                "engine": engine,
+                "page_count": len(page_texts),
+                "pdfplumber_pages": [index + 1 for index in slow_pages],
+                "timings_ms": {
+                    "probe": round(probe_time * 1000, 2),
+                    "pdfplumber": round(fallback_time * 1000, 2),
+                    "ocr": ocr_stats["elapsed_ms"] if ocr_stats else 0.0,
+                    "total": round((time.perf_counter() - start_time) * 1000, 2)
+                }
+            }
+            if ocr_stats:
+                metadata["ocr"] = ocr_stats
+            document = ExtractedDocument(file_type="pdf", sections=sections, metadata=metadata)
+            logger.info(
+                f"Successfully extracted {len(sections)} of {len(page_texts)} pages using {engine} "
+                f"({len(slow_pages)} pages via pdfplumber) in {metadata['timings_ms']['total']} ms"
+            )
+            return document
+
         except Exception as e:
             logger.error(f"Failed to extract text from PDF: {str(e)}", exc_info=True)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to extract text from PDF: {str(e)}"
             )
-    
-    def extract_text_from_docx(self, file_content: bytes) -> str:
+
+    def extract_document_from_docx(self, file_content: bytes) -> ExtractedDocument:
         """
-        Extract text from DOCX file content.
+        Extract a structured document from DOCX file content.
         
         Args:
             file_content (bytes): DOCX file content
             
         Returns:
-            str: Extracted text content
+            ExtractedDocument: Extracted document with a single block section
         """
         logger.info("Extracting text from DOCX file")
         try:
             doc = Document(io.BytesIO(file_content))
-            text_content = []
+            section = DocumentSection(number=1, kind=SectionKind.BLOCK)
             
             # Extract text from paragraphs
             for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text.strip())
+                paragraph_text = paragraph.text.strip()
+                if paragraph_text:
+                    section.spans.append(paragraph_text)
             
             # Extract text from tables
             for table in doc.tables:
+                table_rows = []
                 for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
+                    row_text = [cell_text for cell_text in (cell.text.strip() for cell in row.cells) if cell_text]
                     if row_text:
-                        text_content.append(" | ".join(row_text))
+                        table_rows.append(row_text)
+                if table_rows:
+                    section.tables.append(table_rows)
             
-            extracted_text = "\n\n".join(text_content)
-            logger.info(f"Successfully extracted {len(extracted_text)} characters from DOCX")
-            return extracted_text
+            document = ExtractedDocument(file_type="docx", sections=[section], span_separator="\n\n")
+            logger.info(f"Successfully extracted {len(section.spans)} paragraphs and {len(section.tables)} tables from DOCX")
+            return document
             
         except Exception as e:
             logger.error(f"Failed to extract text from DOCX: {str(e)}", exc_info=True)
@@ -137,47 +230,76 @@ class FileService:
                 detail=f"Failed to extract text from DOCX: {str(e)}"
             )
     
-    def extract_text_from_pptx(self, file_content: bytes) -> str:
+    def _collect_pptx_shapes(self, shapes, section: DocumentSection) -> None:
         """
-        Extract text from PPTX file content.
+        Walk a PPTX shape tree once, recursing into group shapes.
+        
+        Each text frame and table cell is read and stripped exactly once.
+        
+        Args:
+            shapes: Shape collection of a slide or group shape
+            section (DocumentSection): Section receiving the text spans and tables
+        """
+        stack = list(shapes)[::-1]
+        while stack:
+            shape = stack.pop()
+            
+            # Descend into grouped shapes, preserving reading order
+            if isinstance(shape, GroupShape):
+                stack.extend(list(shape.shapes)[::-1])
+                continue
+            
+            # Extract text from tables in slides
+            if shape.has_table:
+                table_rows = []
+                for row in shape.table.rows:
+                    row_text = [cell_text for cell_text in (cell.text.strip() for cell in row.cells) if cell_text]
+                    if row_text:
+                        table_rows.append(row_text)
+                if table_rows:
+                    section.tables.append(table_rows)
+                continue
+            
+            # Extract text from text frames
+            if shape.has_text_frame:
+                shape_text = shape.text_frame.text.strip()
+                if shape_text:
+                    section.spans.append(shape_text)
+    
+    def extract_document_from_pptx(self, file_content: bytes) -> ExtractedDocument:
+        """
+        Extract a structured document from PPTX file content, one section per slide.
+        
+        Shapes are visited in a single pass over the shape tree, including
+        grouped shapes, tables and speaker notes.
         
         Args:
             file_content (bytes): PPTX file content
             
         Returns:
-            str: Extracted text content
+            ExtractedDocument: Extracted document
         """
         logger.info("Extracting text from PPTX file")
         try:
             prs = Presentation(io.BytesIO(file_content))
-            text_content = []
+            sections = []
             
             for slide_num, slide in enumerate(prs.slides, 1):
-                slide_text = []
-                slide_text.append(f"--- Slide {slide_num} ---")
+                section = DocumentSection(number=slide_num, kind=SectionKind.SLIDE)
+                self._collect_pptx_shapes(slide.shapes, section)
                 
-                # Extract text from shapes
-                for shape in slide.shapes:
-                    if hasattr(shape, "text") and shape.text.strip():
-                        slide_text.append(shape.text.strip())
-                    
-                    # Extract text from tables in slides
-                    if shape.has_table:
-                        table = shape.table
-                        for row in table.rows:
-                            row_text = []
-                            for cell in row.cells:
-                                if cell.text.strip():
-                                    row_text.append(cell.text.strip())
-                            if row_text:
-                                slide_text.append(" | ".join(row_text))
+                # Extract speaker notes without creating empty notes slides
+                if slide.has_notes_slide:
+                    notes_frame = slide.notes_slide.notes_text_frame
+                    notes_text = notes_frame.text.strip() if notes_frame is not None else ""
+                    if notes_text:
+                        section.notes = notes_text
                 
-                if len(slide_text) > 1:  # More than just the slide header
-                    text_content.append("\n".join(slide_text))
+                sections.append(section)
             
-            extracted_text = "\n\n".join(text_content)
-            logger.info(f"Successfully extracted {len(extracted_text)} characters from PPTX")
-            return extracted_text
+            document = ExtractedDocument(file_type="pptx", sections=sections)
+            logger.info(f"Successfully extracted {len(sections)} slides from PPTX")
+            return document
             
         except Exception as e:
             logger.error(f"Failed to extract text from PPTX: {str(e)}", exc_info=True)
@@ -188,7 +310,7 @@ class FileService:
     
     def extract_text_from_txt(self, file_content: bytes) -> str:
         """
-        Extract text from TXT file content.
+        Decode text from TXT file content.
         
         Args:
             file_content (bytes): TXT file content
@@ -221,32 +343,59 @@ class FileService:
                 detail=f"Failed to extract text from TXT: {str(e)}"
             )
     
-    def extract_text_content(self, file_content: bytes, file_type: str) -> str:
+    def extract_document_from_txt(self, file_content: bytes) -> ExtractedDocument:
         """
-        Extract text content from file based on file type.
+        Extract a structured document from TXT file content.
+        
+        Args:
+            file_content (bytes): TXT file content
+            
+        Returns:
+            ExtractedDocument: Extracted document with a single block section
+        """
+        extracted_text = self.extract_text_from_txt(file_content)
+        section = DocumentSection(number=1, kind=SectionKind.BLOCK, spans=[extracted_text] if extracted_text else [])
+        return ExtractedDocument(file_type="txt", sections=[section])
+    
+    def extract_document(self, file_content: bytes, file_type: str) -> ExtractedDocument:
+        """
+        Extract a structured document from file based on file type.
         
         Args:
             file_content (bytes): File content as bytes
             file_type (str): Type of file (pdf, docx, pptx, txt)
             
         Returns:
-            str: Extracted and formatted text content
+            ExtractedDocument: Extracted document
         """
-        logger.info(f"Extracting text content for file type: {file_type}")
+        logger.info(f"Extracting document for file type: {file_type}")
         
         if file_type == "pdf":
-            return self.extract_text_from_pdf(file_content)
+            return self.extract_document_from_pdf(file_content)
         elif file_type == "docx":
-            return self.extract_text_from_docx(file_content)
+            return self.extract_document_from_docx(file_content)
         elif file_type == "pptx":
-            return self.extract_text_from_pptx(file_content)
+            return self.extract_document_from_pptx(file_content)
         elif file_type == "txt":
-            return self.extract_text_from_txt(file_content)
+            return self.extract_document_from_txt(file_content)
         else:
             raise HTTPException(
                 status_code=400,
                 detail=f"Unsupported file type for text extraction: {file_type}"
             )
+    
+    def extract_text_content(self, file_content: bytes, file_type: str) -> str:
+        """
+        Extract text content from file based on file type.
+        
+        Args:
+            file_content (bytes): File content as bytes
+            file_type (str): Type of file (pdf, docx, pptx, txt)
+            
+        Returns:
+            str: Extracted and formatted text content
+        """
+        return self.extract_document(file_content, file_type).text
 
     async def save_upload_file(self, file: UploadFile) -> Tuple[str, str]:
         """
@@ -256,23 +405,38 @@ class FileService:
             Tuple[str, str]: (file_path, file_type)
         """
         logger.info(f"Processing file upload: {file.filename}")
-        file_type = self.get_file_type(file.filename)
-        
-        # Generate unique filename
-        unique_filename = f"{uuid.uuid4()}.{file_type}"
-        logger.debug(f"Generated unique filename: {unique_filename}")
         
         # Read file content
         file_content = await file.read()
         logger.debug(f"Read file content, size: {len(file_content)} bytes")
         
+        return await self.save_file_content(file_content, file.filename, file.content_type)
+    
+    async def save_file_content(self, file_content: bytes, filename: str, content_type: Optional[str]) -> Tuple[str, str]:
+        """
+        Save already read file content to Supabase storage and return file path and type.
+        
+        Args:
+            file_content (bytes): Content of the file
+            filename (str): Original filename, used for the file type
+            content_type (Optional[str]): MIME type of the file
+            
+        Returns:
+            Tuple[str, str]: (file_path, file_type)
+        """
+        file_type = self.get_file_type(filename)
+        
+        # Generate unique filename
+        unique_filename = f"{uuid.uuid4()}.{file_type}"
+        logger.debug(f"Generated unique filename: {unique_filename}")
+        
         # Upload to Supabase Storage
         try:
             logger.info(f"Uploading file to Supabase bucket: {self.bucket_name}")
             result = self.supabase.storage.from_(self.bucket_name).upload(
                 unique_filename,
                 file_content,
-                {"content-type": file.content_type}
+                {"content-type": content_type}
             )
             
             # Get the public URL
@@ -288,27 +452,77 @@ class FileService:
                 detail=f"Failed to upload file to Supabase: {str(e)}"
             )
     
-    async def extract_text_from_upload(self, file: UploadFile) -> Tuple[str, str]:
+    async def download_file(self, file_path: str) -> bytes:
         """
-        Extract text content from uploaded file without saving to storage.
+        Read back a file stored by save_file_content.
+        
+        Args:
+            file_path (str): Public URL returned by save_file_content
+            
+        Returns:
+            bytes: Content of the file
+        """
+        object_name = os.path.basename(urlparse(file_path).path)
+        return await asyncio.to_thread(self.supabase.storage.from_(self.bucket_name).download, object_name)
+    
+    async def delete_file(self, file_path: str) -> None:
+        """
+        Remove a stored file from Supabase storage.
+        
+        Args:
+            file_path (str): Public URL returned by save_file_content
+        """
+        object_name = os.path.basename(urlparse(file_path).path)
+        await asyncio.to_thread(self.supabase.storage.from_(self.bucket_name).remove, [object_name])
+        logger.info(f"Removed stored file {object_name}")
+    
+    async def extract_document_from_upload(self, file: UploadFile) -> Tuple[ExtractedDocument, str]:
+        """
+        Extract a structured document from uploaded file without saving to storage.
         
         Args:
             file (UploadFile): The uploaded file
             
         Returns:
-            Tuple[str, str]: (extracted_text, file_type)
+            Tuple[ExtractedDocument, str]: (extracted_document, file_type)
         """
-        logger.info(f"Extracting text from uploaded file: {file.filename}")
+        logger.info(f"Extracting document from uploaded file: {file.filename}")
         file_type = self.get_file_type(file.filename)
         
         # Read file content
         file_content = await file.read()
         logger.debug(f"Read file content, size: {len(file_content)} bytes")
         
-        # Extract text content
-        extracted_text = self.extract_text_content(file_content, file_type)
+        document = await self.extract_document_from_content(file_content, file_type)
         
         # Reset file position for potential future reads
         await file.seek(0)
         
-        return extracted_text, file_type
\ No newline at end of file
+        return document, file_type
+    
+    async def extract_document_from_content(self, file_content: bytes, file_type: str) -> ExtractedDocument:
+        """
+        Extract a structured document from already read file content.
+        
+        Args:
+            file_content (bytes): Content of the file
+            file_type (str): Type of the file
+            
+        Returns:
+            ExtractedDocument: Extracted document
+        """
+        # Extract structured document off the event loop, OCR can take seconds
+        return await asyncio.to_thread(self.extract_document, file_content, file_type)
+    
+    async def extract_text_from_upload(self, file: UploadFile) -> Tuple[str, str]:
+        """
+        Extract text content from uploaded file without saving to storage.
+        
+        Args:
+            file (UploadFile): The uploaded file
+            
+        Returns:
+            Tuple[str, str]: (extracted_text, file_type)
+        """
+        document, file_type = await self.extract_document_from_upload(file)
+        return document.text, file_type
\ No newline at end of file
@@ -0,0 +1,299 @@
+import os
+import socket
+import signal
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+from app.config.prisma_client import get_prisma
+from app.schemas.pitch_schema import PitchStatus
+from app.services.evaluation_service import EvaluationService
+
+# Set up logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Queued pitches carry a runAfter timestamp; inline evaluations never do.
+# Processing rows are reclaimed when their lease expired, or, for inline
+# evaluations which hold no lease, when they have not been updated for
+# stale_seconds (the API process died mid-evaluation).
+CLAIM_SQL = """
+WITH claimable AS (
+    SELECT "id", "status" AS previous_status
+    FROM "Pitch"
+    WHERE ("status" = 'pending' AND "runAfter" <= NOW())
+       OR ("status" = 'processing' AND "leaseUntil" < NOW())
+       OR ("status" = 'processing' AND "leaseUntil" IS NULL AND "updatedAt" < NOW() - ($3::int * INTERVAL '1 second'))
+    ORDER BY "createdAt"
+    LIMIT $4::int
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE "Pitch" AS p
+SET "status" = 'processing',
+    "lockedBy" = $1::text,
+    "leaseUntil" = NOW() + ($2::int * INTERVAL '1 second'),
+    "attempts" = p."attempts" + 1,
+    "updatedAt" = NOW()
+FROM claimable
+WHERE p."id" = claimable."id"
+RETURNING p."id", p."attempts", claimable.previous_status,
+          EXTRACT(EPOCH FROM (NOW() - p."createdAt")) * 1000 AS queued_ms
+"""
+
+HEARTBEAT_SQL = """
+UPDATE "Pitch"
+SET "leaseUntil" = NOW() + ($3::int * INTERVAL '1 second')
+WHERE "id" = $1::text AND "lockedBy" = $2::text AND "status" = 'processing'
+"""
+
+COMPLETE_SQL = """
+UPDATE "Pitch"
+SET "lockedBy" = NULL, "leaseUntil" = NULL, "lastError" = NULL
+WHERE "id" = $1::text AND "lockedBy" = $2::text
+"""
+
+RETRY_SQL = """
+UPDATE "Pitch"
+SET "status" = 'pending', "lockedBy" = NULL, "leaseUntil" = NULL,
+    "runAfter" = NOW() + ($3::int * INTERVAL '1 second'), "lastError" = $4::text, "updatedAt" = NOW()
+WHERE "id" = $1::text AND "lockedBy" = $2::text
+"""
+
+FAIL_SQL = """
+UPDATE "Pitch"
+SET "status" = 'failed', "lockedBy" = NULL, "leaseUntil" = NULL, "lastError" = $3::text, "updatedAt" = NOW()
+WHERE "id" = $1::text AND "lockedBy" = $2::text
+"""
+
+# Hand a job back without counting the attempt, e.g. on worker shutdown
+RELEASE_SQL = """
+UPDATE "Pitch"
+SET "status" = 'pending', "lockedBy" = NULL, "leaseUntil" = NULL,
+    "runAfter" = NOW(), "attempts" = GREATEST("attempts" - 1, 0), "updatedAt" = NOW()
+WHERE "id" = $1::text AND "lockedBy" = $2::text
+"""
+
+
+class EvaluationQueue:
+    """
+    Durable evaluation queue on the Pitch table.
+
+    Workers claim pending pitches with FOR UPDATE SKIP LOCKED, so concurrent
+    workers never take the same job, and hold a lease they extend with
+    heartbeats. A job whose lease expires (worker crash, redeploy) becomes
+    claimable again. Failed jobs are retried with exponential backoff up to
+    QUEUE_MAX_ATTEMPTS attempts, then marked FAILED.
+    """
+
+    def __init__(self):
+        self.lease_seconds = int(os.getenv("QUEUE_LEASE_SECONDS", "120"))
+        self.stale_seconds = int(os.getenv("QUEUE_STALE_PROCESSING_SECONDS", "900"))
+        self.max_attempts = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+        self.backoff_base_seconds = float(os.getenv("QUEUE_BACKOFF_BASE_SECONDS", "10"))
+        self.backoff_max_seconds = float(os.getenv("QUEUE_BACKOFF_MAX_SECONDS", "600"))
+
+    async def claim(self, worker_id: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Claim up to `limit` runnable jobs, oldest first.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker
+            limit (int): Maximum number of jobs
+
+        Returns:
+            List[Dict[str, Any]]: Claimed jobs (id, attempts, previous_status, queued_ms)
+        """
+        async with get_prisma() as prisma:
+            jobs = await prisma.query_raw(CLAIM_SQL, worker_id, self.lease_seconds, self.stale_seconds, limit)
+        for job in jobs:
+            metrics.increment("queue.claimed")
+            if job["previous_status"] == PitchStatus.PROCESSING:
+                metrics.increment("queue.recovered")
+                logger.warning(f"Recovered stuck evaluation of pitch {job['id']} (attempt {job['attempts']})")
+            else:
+                metrics.observe("queue.wait", float(job["queued_ms"]))
+        return jobs
+
+    async def heartbeat(self, pitch_id: str, worker_id: str) -> bool:
+        """
+        Extend the lease of a running job.
+
+        Returns:
+            bool: False if the worker no longer holds the lease
+        """
+        async with get_prisma() as prisma:
+            updated = await prisma.execute_raw(HEARTBEAT_SQL, pitch_id, worker_id, self.lease_seconds)
+        return updated > 0
+
+    async def complete(self, pitch_id: str, worker_id: str) -> None:
+        """Release the lease of a job whose evaluation completed."""
+        async with get_prisma() as prisma:
+            await prisma.execute_raw(COMPLETE_SQL, pitch_id, worker_id)
+        metrics.increment("queue.completed")
+
+    def backoff_seconds(self, attempts: int) -> int:
+        """Delay before the next attempt after `attempts` failed ones."""
+        return int(min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** max(0, attempts - 1)))
+
+    async def fail(self, pitch_id: str, worker_id: str, attempts: int, error: str) -> None:
+        """
+        Schedule a retry of a failed job, or mark it FAILED after the last attempt.
+
+        Args:
+            pitch_id (str): ID of the pitch
+            worker_id (str): Worker holding the lease
+            attempts (int): Attempts made so far, including the failed one
+            error (str): Error to record on the pitch
+        """
+        async with get_prisma() as prisma:
+            if attempts >= self.max_attempts:
+                await prisma.execute_raw(FAIL_SQL, pitch_id, worker_id, error[:1000])
+                metrics.increment("queue.failed")
+                logger.error(f"Evaluation of pitch {pitch_id} failed after {attempts} attempts: {error}")
+            else:
+                delay = self.backoff_seconds(attempts)
+                await prisma.execute_raw(RETRY_SQL, pitch_id, worker_id, delay, error[:1000])
+                metrics.increment("queue.retried")
+                logger.warning(f"Evaluation of pitch {pitch_id} failed (attempt {attempts}), retrying in {delay}s: {error}")
+
+    async def release(self, pitch_id: str, worker_id: str) -> None:
+        """Hand a job back to the queue without counting the attempt."""
+        async with get_prisma() as prisma:
+            await prisma.execute_raw(RELEASE_SQL, pitch_id, worker_id)
+        metrics.increment("queue.released")
+
+
+class EvaluationWorker:
+    """
+    Runs queued evaluations, up to `concurrency` at a time.
+
+    Settings (environment):
+      - WORKER_CONCURRENCY: evaluations run concurrently by this worker
+      - QUEUE_POLL_SECONDS: wait between polls when the queue is empty
+      - QUEUE_HEARTBEAT_SECONDS: lease renewal interval, well below QUEUE_LEASE_SECONDS
+      - WORKER_SHUTDOWN_GRACE_SECONDS: time running evaluations get to finish on SIGTERM
+        before they are handed back to the queue
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, worker_id: Optional[str] = None):
+        self.concurrency = concurrency or int(os.getenv("WORKER_CONCURRENCY", "2"))
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_seconds = float(os.getenv("QUEUE_POLL_SECONDS", "1"))
+        self.heartbeat_seconds = float(os.getenv("QUEUE_HEARTBEAT_SECONDS", "30"))
+        self.shutdown_grace_seconds = float(os.getenv("WORKER_SHUTDOWN_GRACE_SECONDS", "30"))
+        self.queue = EvaluationQueue()
+        self.evaluation_service = EvaluationService()
+        self.running: Dict[asyncio.Task, str] = {}
+        self.stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop claiming jobs; running ones get the shutdown grace period."""
+        if not self.stopping.is_set():
+            logger.info(f"Worker {self.worker_id} stopping")
+            self.stopping.set()
+
+    async def run(self) -> None:
+        """Claim and run jobs until stopped by SIGINT/SIGTERM or `stop()`."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+        while not self.stopping.is_set():
+            jobs = []
+            free = self.concurrency - len(self.running)
+            if free > 0:
+                try:
+                    jobs = await self.queue.claim(self.worker_id, free)
+                except Exception as e:
+                    logger.error(f"Failed to claim jobs: {str(e)}")
+            for job in jobs:
+                task = asyncio.create_task(self.process(job["id"], job["attempts"]))
+                self.running[task] = job["id"]
+                task.add_done_callback(lambda done: self.running.pop(done, None))
+
+            if jobs and len(self.running) < self.concurrency:
+                continue
+            # Wait for a free slot, a new poll or the stop signal
+            waiters = set(self.running) | {asyncio.ensure_future(self.stopping.wait())}
+            done, pending = await asyncio.wait(waiters, timeout=self.poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in pending:
+                if waiter not in self.running:
+                    waiter.cancel()
+
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """Let running evaluations finish within the grace period, hand the others back."""
+        if not self.running:
+            return
+        logger.info(f"Waiting up to {self.shutdown_grace_seconds}s for {len(self.running)} running evaluations")
+        _, pending = await asyncio.wait(set(self.running), timeout=self.shutdown_grace_seconds)
+        for task in pending:
+            pitch_id = self.running.get(task)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            if pitch_id:
+                try:
+                    await self.queue.release(pitch_id, self.worker_id)
+                    logger.info(f"Handed pitch {pitch_id} back to the queue")
+                except Exception as e:
+                    logger.error(f"Failed to release pitch {pitch_id}: {str(e)}")
+
+    async def process(self, pitch_id: str, attempts: int) -> None:
+        """
+        Run one claimed evaluation under a heartbeat, then complete, retry or fail it.
+
+        Args:
+            pitch_id (str): ID of the claimed pitch
+            attempts (int): Attempts made so far, including this one
+        """
+        if attempts > self.queue.max_attempts:
+            # Reclaimed after crashing its worker too many times
+            await self.queue.fail(pitch_id, self.worker_id, attempts, "Evaluation did not finish within the maximum attempts")
+            return
+
+        evaluation = asyncio.create_task(self._evaluate(pitch_id))
+        heartbeat = asyncio.create_task(self._heartbeat(pitch_id, evaluation))
+        try:
+            with metrics.timer("queue.job"):
+                await evaluation
+            await self.queue.complete(pitch_id, self.worker_id)
+        except asyncio.CancelledError:
+            if not evaluation.cancelled() or self.stopping.is_set():
+                raise
+            logger.warning(f"Lost the lease of pitch {pitch_id}, evaluation abandoned")
+        except Exception as e:
+            try:
+                await self.queue.fail(pitch_id, self.worker_id, attempts, str(e) or type(e).__name__)
+            except Exception as queue_error:
+                logger.error(f"Failed to record the failure of pitch {pitch_id}: {str(queue_error)}")
+        finally:
+            heartbeat.cancel()
+            evaluation.cancel()
+
+    async def _evaluate(self, pitch_id: str) -> None:
+        pitch = await self.evaluation_service.db_actions.get_pitch(pitch_id)
+        if pitch is None:
+            raise ValueError(f"Pitch {pitch_id} not found")
+        await self.evaluation_service.evaluate_queued(pitch)
+
+    async def _heartbeat(self, pitch_id: str, evaluation: asyncio.Task) -> None:
+        """Extend the lease while the evaluation runs, cancel it if the lease was lost."""
+        while not evaluation.done():
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                if not await self.queue.heartbeat(pitch_id, self.worker_id):
+                    metrics.increment("queue.lease_lost")
+                    evaluation.cancel()
+                    return
+            except Exception as e:
+                # Keep running: the lease only expires if heartbeats keep failing
+                logger.warning(f"Heartbeat of pitch {pitch_id} failed: {str(e)}")
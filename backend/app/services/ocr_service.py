@@ -0,0 +1,202 @@
+# app/services/ocr_service.py
+import io
+import os
+import time
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+from app.config.logging_config import setup_logging
+
+# OCR libraries are optional: the Tesseract binary is a system dependency
+try:
+    import pypdfium2
+    import pytesseract
+    OCR_AVAILABLE = True
+except ImportError:
+    pypdfium2 = None
+    pytesseract = None
+    OCR_AVAILABLE = False
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Shared worker pool, created on first use and bounded by OCR_MAX_WORKERS
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor(max_workers: int, reset: bool = False) -> ProcessPoolExecutor:
+    """Return the process pool shared by every OCR request."""
+    global _executor
+    if reset and _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _executor is None:
+        logger.info(f"Starting OCR worker pool with {max_workers} processes")
+        # pdfium is not fork-safe, so workers are spawned rather than forked
+        _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _split_pages(file_content: bytes, page_indexes: List[int]) -> Dict[int, bytes]:
+    """
+    Copy each page into its own single-page PDF, so a worker only receives the page it recognizes.
+
+    Args:
+        file_content (bytes): PDF file content
+        page_indexes (List[int]): 0-based page indexes
+
+    Returns:
+        Dict[int, bytes]: page_index -> single-page PDF content
+    """
+    source = pypdfium2.PdfDocument(file_content)
+    pages = {}
+    try:
+        for page_index in page_indexes:
+            page_pdf = pypdfium2.PdfDocument.new()
+            try:
+                page_pdf.import_pages(source, [page_index])
+                buffer = io.BytesIO()
+                page_pdf.save(buffer)
+                pages[page_index] = buffer.getvalue()
+            finally:
+                page_pdf.close()
+    finally:
+        source.close()
+    return pages
+
+
+def _ocr_page(page_content: bytes, page_index: int, dpi: int, language: str, cache_path: str) -> Tuple[int, str]:
+    """
+    Rasterize and OCR a single-page PDF. Runs inside a worker process.
+
+    Args:
+        page_content (bytes): Single-page PDF content
+        page_index (int): 0-based index of the page in the original PDF
+        dpi (int): Rasterization resolution
+        language (str): Tesseract language code
+        cache_path (str): Where to store the recognized text
+
+    Returns:
+        Tuple[int, str]: (page_index, recognized_text)
+    """
+    pdf = pypdfium2.PdfDocument(page_content)
+    try:
+        image = pdf[0].render(scale=dpi / 72).to_pil()
+    finally:
+        pdf.close()
+
+    try:
+        text = pytesseract.image_to_string(image, lang=language)
+    except Exception as e:
+        # Tesseract exceptions do not survive pickling back to the parent process
+        raise RuntimeError(f"Tesseract failed on page {page_index + 1}: {str(e)}")
+
+    # Write atomically so concurrent workers never read a partial entry
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, cache_path)
+    return page_index, text
+
+
+class OcrService:
+    """OCR for PDF pages without a text layer, using local Tesseract."""
+
+    def __init__(self):
+        """Initialize OcrService from environment configuration."""
+        self.enabled = os.getenv("OCR_ENABLED", "true").lower() == "true" and OCR_AVAILABLE
+        self.dpi = int(os.getenv("OCR_DPI", "200"))
+        self.language = os.getenv("OCR_LANGUAGE", "eng")
+        self.max_workers = int(os.getenv("OCR_MAX_WORKERS", "2"))
+        self.time_budget = float(os.getenv("OCR_TIME_BUDGET_SECONDS", "30"))
+        self.cache_dir = os.getenv("OCR_CACHE_DIR", "/tmp/pitchpilot_ocr_cache")
+
+        if os.getenv("OCR_ENABLED", "true").lower() == "true" and not OCR_AVAILABLE:
+            logger.warning("OCR requested but pytesseract/pypdfium2 are not installed, skipping OCR")
+
+    def ocr_pdf_pages(self, file_content: bytes, page_indexes: List[int]) -> Tuple[Dict[int, str], Dict[str, float]]:
+        """
+        OCR the given PDF pages in the worker pool within the per-document time budget.
+
+        Results are cached on disk by (PDF hash, page, DPI, language) and
+        looked up before anything is rendered, so re-uploads of a deck skip
+        rasterization entirely. Each worker only receives its own page, as a
+        single-page PDF. Pages still pending when the budget runs out are
+        cancelled and left empty. Pages already running finish in the
+        background and populate the cache for the next upload.
+
+        Args:
+            file_content (bytes): PDF file content
+            page_indexes (List[int]): 0-based indexes of the pages without a text layer
+
+        Returns:
+            Tuple[Dict[int, str], Dict[str, float]]: (page_index -> text, OCR stats)
+        """
+        stats = {"pages": len(page_indexes), "recognized": 0, "cache_hits": 0, "timed_out": 0, "elapsed_ms": 0.0}
+        if not self.enabled or not page_indexes:
+            return {}, stats
+
+        logger.info(f"Running OCR on {len(page_indexes)} pages at {self.dpi} DPI (budget {self.time_budget}s)")
+        start_time = time.perf_counter()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        texts = {}
+        pdf_hash = hashlib.sha256(file_content).hexdigest()
+        cache_paths = {
+            page_index: os.path.join(self.cache_dir, f"{pdf_hash}-{page_index}-{self.dpi}-{self.language}.txt")
+            for page_index in page_indexes
+        }
+        missing = []
+        for page_index, cache_path in cache_paths.items():
+            if not os.path.exists(cache_path):
+                missing.append(page_index)
+                continue
+            with open(cache_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            stats["cache_hits"] += 1
+            if text.strip():
+                texts[page_index] = text
+                stats["recognized"] += 1
+
+        done, not_done = set(), set()
+        if missing:
+            executor = _get_executor(self.max_workers)
+            futures = [
+                executor.submit(_ocr_page, page_content, page_index, self.dpi, self.language, cache_paths[page_index])
+                for page_index, page_content in _split_pages(file_content, missing).items()
+            ]
+            done, not_done = wait(futures, timeout=self.time_budget)
+            for future in not_done:
+                future.cancel()
+
+        broken_pool = False
+        for future in done:
+            try:
+                page_index, text = future.result()
+            except BrokenProcessPool as e:
+                broken_pool = True
+                logger.error(f"OCR worker pool crashed: {str(e)}")
+                continue
+            except Exception as e:
+                logger.error(f"OCR failed for a page: {str(e)}")
+                continue
+            if text.strip():
+                texts[page_index] = text
+                stats["recognized"] += 1
+
+        if broken_pool:
+            _get_executor(self.max_workers, reset=True)
+
+        stats["timed_out"] = len(not_done)
+        stats["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+        if not_done:
+            logger.warning(f"OCR time budget exhausted, {len(not_done)} pages left without text")
+        logger.info(
+            f"OCR recognized {stats['recognized']} of {stats['pages']} pages "
+            f"({stats['cache_hits']} cached) in {stats['elapsed_ms']} ms"
+        )
+        return texts, stats
@@ -0,0 +1,406 @@
+# app/services/prescorer.py
+import os
+import re
+import time
+import codecs
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
+from app.config.logging_config import setup_logging
+from app.schemas.document_schema import ExtractedDocument, SectionKind
+from app.schemas.pitch_schema import DeckFeatures, ScoreModel
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+SCALE = r"(?:k|mm|m|bn|b|thousand|million|billion)\b"
+MONEY = rf"[$€£]\s?(?:{NUMBER})\s?(?:{SCALE})?"
+GROWTH_PERIOD = r"mom|m/m|month[- ]over[- ]month|monthly|qoq|q/q|quarter[- ]over[- ]quarter|yoy|y/y|year[- ]over[- ]year|annual(?:ly)?|cagr|growth"
+
+# Signals are found in a single pass over the lowercased deck text. Figures
+# start with a digit or a currency sign, terms at a word boundary; splitting
+# the two behind a lookahead and a single \b keeps the alternation from being
+# tried at every position. At the same position the first alternative wins, so
+# figures ("$1.2m arr") come before plain amounts and multi-word terms before
+# the words they contain.
+FIGURE_PATTERNS: Dict[str, str] = {
+    "revenue": rf"{MONEY}\s*(?:in\s+)?(?:arr|mrr|revenue|sales|gmv)\b",
+    "growth": rf"(?:{NUMBER})\s?%\s*(?:{GROWTH_PERIOD})\b|(?:{NUMBER})\s?x\s+(?:{GROWTH_PERIOD}|in\s+\d+\s+months?)\b",
+    "users": rf"(?:{NUMBER})\s?(?:k|m)?\+?\s+(?:(?:paying|active|weekly|monthly|daily|enterprise|registered|new)\s+)*(?:users|customers|clients|companies|businesses|subscribers|merchants|teams|members|brands|mau|dau)\b",
+    "money": MONEY,
+}
+TERM_PATTERNS: Dict[str, str] = {
+    "revenue_stated": rf"(?:arr|mrr|revenue|sales|gmv)\s+(?:of|is|was|reached|at|to)\s+{MONEY}",
+    "unit_economics": r"cac|ltv|clv|lifetime value|customer acquisition cost|payback(?: period)?|gross margins?|contribution margin|unit economics",
+    "tam": r"tam|sam|som|total addressable market|addressable market|serviceable (?:addressable |obtainable )?(?:market|segment)|market size|market opportunity",
+    "retention": r"net (?:revenue|dollar) retention|nrr|ndr|retention|churn",
+    "moat": r"proprietary|patent(?:s|ed)?|network effects?|switching costs?|defensib\w*|moat|exclusive|trade secrets?",
+    "business_model": r"business model|revenue model|pricing|subscription|saas|per seat|take rate|monetiz\w*",
+    "go_to_market": r"go[- ]to[- ]market|gtm|distribution|sales channels?|partnerships?|pipeline",
+    "problem": r"problem|pain ?points?|challenges?",
+    "solution": r"solution|our (?:platform|product)|how it works",
+    "traction": r"traction|milestones?|pilots?|letters? of intent|lois?",
+    "competition": r"competition|competitors?|competitive|incumbents?|alternatives?|versus|vs",
+    "team": r"team|founders?|co-?founders?|ceo|cto|advisors?",
+    "ask": r"the ask|raising|fundrais\w*|seed round|series [a-d]|use of funds",
+}
+# Signal of every pattern group, "revenue of $2m" counts as revenue like "$2m revenue"
+GROUP_SIGNALS = {**{name: name for name in FIGURE_PATTERNS}, **{name: name for name in TERM_PATTERNS}, "revenue_stated": "revenue"}
+SIGNALS = list(dict.fromkeys(GROUP_SIGNALS.values()))
+SIGNAL_INDEX = {name: index for index, name in enumerate(SIGNALS)}
+GROUP_INDEX = {group: SIGNAL_INDEX[signal] for group, signal in GROUP_SIGNALS.items()}
+SIGNAL_SOURCE = (
+    r"(?=[$€£\d])(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in FIGURE_PATTERNS.items()) + ")"
+    r"|\b(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in TERM_PATTERNS.items()) + r")\b"
+)
+SIGNAL_PATTERN = re.compile(SIGNAL_SOURCE)
+# For the rare texts whose lowercase has another length, matched as is so that offsets still hold
+SIGNAL_PATTERN_ANY_CASE = re.compile(SIGNAL_SOURCE, re.IGNORECASE)
+
+AMOUNT = re.compile(rf"({NUMBER})\s?({SCALE})?", re.IGNORECASE)
+SCALE_FACTORS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9, "billion": 1e9}
+MONTHLY_PERIODS = ("mom", "m/m", "month", "monthly")
+QUARTERLY_PERIODS = ("qoq", "q/q", "quarter")
+IN_MONTHS = re.compile(r"in\s+(\d+)\s+months?")
+
+# Canonical pitch sections and the signals that show each one is covered
+CANONICAL_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "problem": ("problem",),
+    "solution": ("solution",),
+    "market": ("tam",),
+    "business_model": ("business_model", "unit_economics"),
+    "traction": ("traction", "revenue", "growth", "users", "retention"),
+    "competition": ("competition",),
+    "team": ("team",),
+    "go_to_market": ("go_to_market",),
+    "ask": ("ask",),
+}
+
+
+def byte_class(characters: str) -> np.ndarray:
+    """Lookup table of the ASCII codes of `characters`, indexed by byte."""
+    table = np.zeros(256, dtype=bool)
+    table[np.frombuffer(characters.encode("ascii"), dtype=np.uint8)] = True
+    return table
+
+
+def neutral_ascii(error: UnicodeEncodeError) -> Tuple[str, int]:
+    """
+    Encoding error handler replacing each non-ASCII character with one ASCII byte:
+    "x" for letters, so that "café" stays one word, and a control byte for the
+    rest, so that dashes or quotes never read as whitespace or a sentence end.
+    """
+    chunk = error.object[error.start:error.end]
+    return "".join("x" if character.isalpha() else "\x1a" for character in chunk), error.end
+
+
+codecs.register_error("prescorer_neutral", neutral_ascii)
+
+LETTERS = byte_class("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+DIGITS = byte_class("0123456789")
+VOWELS = byte_class("aeiouyAEIOUY")
+SENTENCE_ENDS = byte_class(".!?")
+WHITESPACE = byte_class(" \t\r\n")
+NUMBER_SEPARATORS = byte_class(".,")
+SLIDE_HEADER = re.compile(r"^--- Slide \d+ ---$", re.MULTILINE)
+# Amounts within this many characters of a market size mention count as market size figures
+TAM_FIGURE_WINDOW = 120
+
+# Weights of the dimensions in the provisional overall score
+OVERALL_WEIGHTS = {"traction": 0.3, "clarity": 0.25, "differentiation": 0.2, "scalability": 0.25}
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """Value of the first number of a figure, with its k/M/B scale applied."""
+    match = AMOUNT.search(text)
+    if not match:
+        return None
+    value = float(match.group(1).replace(",", ""))
+    scale = (match.group(2) or "").lower()
+    return value * SCALE_FACTORS.get(scale, 1.0)
+
+
+def monthly_growth_pct(text: str) -> Optional[float]:
+    """
+    Month-over-month equivalent of a growth figure such as "22% MoM", "3x YoY" or "150% CAGR".
+
+    Args:
+        text (str): Growth figure matched in the deck
+
+    Returns:
+        Optional[float]: Compounded monthly growth rate in percent
+    """
+    match = AMOUNT.search(text)
+    if not match:
+        return None
+    value = float(match.group(1).replace(",", ""))
+    lowered = text.lower()
+    multiple = value if "x" in lowered[match.end():match.end() + 2] else 1 + value / 100
+    in_months = IN_MONTHS.search(lowered)
+    if in_months:
+        months = max(int(in_months.group(1)), 1)
+    elif any(period in lowered for period in MONTHLY_PERIODS):
+        months = 1
+    elif any(period in lowered for period in QUARTERLY_PERIODS):
+        months = 3
+    else:
+        months = 12
+    if multiple <= 0:
+        return None
+    return (multiple ** (1 / months) - 1) * 100
+
+
+class PitchPreScorer:
+    """
+    Local, deterministic feature extraction and provisional scoring of a deck.
+
+    A single regex pass finds traction figures (revenue, growth, users),
+    market size, unit economics, moat signals and the canonical pitch
+    sections. Matches are attributed to slides with NumPy (searchsorted on
+    the slide offsets, bincount per slide and signal), and words, syllables
+    and sentences are counted on byte class arrays for words per slide and
+    readability. The provisional scores are fixed heuristics over these
+    features, a preview shown in milliseconds while the agents run, not a
+    replacement for their evaluation.
+    """
+
+    def __init__(self, text_heavy_words: Optional[int] = None):
+        """
+        Initialize PitchPreScorer instance.
+
+        Args:
+            text_heavy_words (Optional[int]): Words above which a slide counts as text-heavy (PRESCORE_TEXT_HEAVY_WORDS)
+        """
+        self.text_heavy_words = text_heavy_words or int(os.getenv("PRESCORE_TEXT_HEAVY_WORDS", "120"))
+
+    def section_offsets(self, document: Union[ExtractedDocument, str]) -> Tuple[str, np.ndarray, bool]:
+        """
+        Deck text, the start offset of every slide, page or block in it, and
+        whether these are slides or pages.
+
+        Plain text is split on its `--- Slide N ---` headers, if any.
+        """
+        if isinstance(document, ExtractedDocument):
+            text = document.text
+            sections = list(document.iter_sections())
+            offsets = [section.offset for section in sections]
+            slides = any(section.kind in (SectionKind.SLIDE, SectionKind.PAGE) for section in sections)
+        else:
+            text = document
+            offsets = [match.start() for match in SLIDE_HEADER.finditer(text)]
+            slides = bool(offsets)
+            if not offsets or offsets[0] > 0 and text[:offsets[0]].strip():
+                offsets.insert(0, 0)
+        return text, np.asarray(offsets or [0], dtype=np.int64), slides
+
+    def extract(self, document: Union[ExtractedDocument, str]) -> DeckFeatures:
+        """
+        Extract the features of a deck.
+
+        Args:
+            document (Union[ExtractedDocument, str]): Extracted document, or deck text
+
+        Returns:
+            DeckFeatures: Counts and figures found in the deck
+        """
+        text, offsets, slides = self.section_offsets(document)
+        num_sections = len(offsets)
+        num_signals = len(SIGNALS)
+
+        lowered = text.lower()
+        pattern = SIGNAL_PATTERN
+        if len(lowered) != len(text):
+            lowered, pattern = text, SIGNAL_PATTERN_ANY_CASE
+        starts: List[int] = []
+        kinds: List[int] = []
+        revenues: List[float] = []
+        growths: List[float] = []
+        users: List[float] = []
+        for match in pattern.finditer(lowered):
+            kind = GROUP_INDEX[match.lastgroup]
+            starts.append(match.start())
+            kinds.append(kind)
+            if kind == SIGNAL_INDEX["revenue"]:
+                value = parse_amount(match.group())
+                if value is not None:
+                    revenues.append(value)
+            elif kind == SIGNAL_INDEX["growth"]:
+                value = monthly_growth_pct(match.group())
+                if value is not None:
+                    growths.append(value)
+            elif kind == SIGNAL_INDEX["users"]:
+                value = parse_amount(match.group())
+                if value is not None:
+                    users.append(value)
+
+        # Signal counts per slide: one bincount over (slide, signal) pairs
+        match_sections = np.searchsorted(offsets, np.asarray(starts, dtype=np.int64), side="right") - 1
+        per_section = np.bincount(
+            match_sections * num_signals + np.asarray(kinds, dtype=np.int64),
+            minlength=num_sections * num_signals
+        ).reshape(num_sections, num_signals)
+        totals = per_section.sum(axis=0)
+        tam_figures = self.count_near(starts, kinds, "money", "tam")
+
+        # Words per slide and readability
+        word_starts, letter_words, syllables, sentences = self.text_counts(text)
+        num_words = len(word_starts)
+        words_per_section = np.bincount(
+            np.searchsorted(offsets, word_starts, side="right") - 1, minlength=num_sections
+        )
+        words_per_sentence = num_words / sentences if num_words else 0.0
+        # Flesch reading ease; figures count as words of the sentence but not for syllables per word
+        readability = 206.835 - 1.015 * words_per_sentence - 84.6 * (syllables / letter_words) if letter_words else 0.0
+        non_empty = words_per_section[words_per_section > 0]
+
+        sections = [
+            name for name, signals in CANONICAL_SECTIONS.items()
+            if any(totals[SIGNAL_INDEX[signal]] for signal in signals)
+        ]
+        return DeckFeatures(
+            slides=int(len(non_empty)),
+            words=num_words,
+            words_per_slide=round(float(non_empty.mean()), 1) if len(non_empty) else 0.0,
+            text_heavy_slides=int((words_per_section > self.text_heavy_words).sum()) if slides else 0,
+            revenue_mentions=int(totals[SIGNAL_INDEX["revenue"]]),
+            max_revenue_usd=max(revenues) if revenues else None,
+            growth_mentions=int(totals[SIGNAL_INDEX["growth"]]),
+            max_monthly_growth_pct=round(max(growths), 1) if growths else None,
+            user_mentions=int(totals[SIGNAL_INDEX["users"]]),
+            max_users=max(users) if users else None,
+            retention_mentions=int(totals[SIGNAL_INDEX["retention"]]),
+            tam_mentions=int(totals[SIGNAL_INDEX["tam"]]),
+            tam_figures=tam_figures,
+            unit_economics_mentions=int(totals[SIGNAL_INDEX["unit_economics"]]),
+            moat_mentions=int(totals[SIGNAL_INDEX["moat"]]),
+            sections=sections,
+            missing_sections=[name for name in CANONICAL_SECTIONS if name not in sections],
+            section_coverage=round(len(sections) / len(CANONICAL_SECTIONS), 2),
+            readability=round(readability, 1),
+            words_per_sentence=round(words_per_sentence, 1),
+        )
+
+    def text_counts(self, text: str) -> Tuple[np.ndarray, int, int, int]:
+        """
+        Word, syllable and sentence counts of a text, from byte class arrays.
+
+        Non-ASCII characters are replaced by one neutral byte each (see
+        `neutral_ascii`), so positions stay those of the text. A word is a run of letters and digits, apostrophes
+        between letters and separators of numbers such as 1,200 or 1.2 included;
+        syllables are runs of vowels; sentences end at . ! or ? followed by
+        whitespace, or at a line break, and only count when they have words.
+
+        Args:
+            text (str): Deck text
+
+        Returns:
+            Tuple[np.ndarray, int, int, int]: Start offset of every word, words starting with a letter, syllables and sentences
+        """
+        codes = np.frombuffer(text.encode("ascii", "prescorer_neutral"), dtype=np.uint8)
+        if not len(codes):
+            return np.zeros(0, dtype=np.int64), 0, 0, 1
+        letters = LETTERS[codes]
+        digits = DIGITS[codes]
+        in_word = letters | digits
+        inner = np.zeros_like(in_word)
+        inner[1:-1] = (
+            (codes[1:-1] == ord("'")) & letters[:-2] & letters[2:]
+            | NUMBER_SEPARATORS[codes[1:-1]] & digits[:-2] & digits[2:]
+        )
+        in_word |= inner
+        word_starts = np.flatnonzero(in_word & ~np.concatenate(([False], in_word[:-1])))
+
+        vowels = VOWELS[codes]
+        syllables = int(np.count_nonzero(vowels & ~np.concatenate(([False], vowels[:-1]))))
+
+        followed_by_space = np.concatenate((WHITESPACE[codes[1:]], [True]))
+        ends = SENTENCE_ENDS[codes] & followed_by_space | (codes == ord("\n"))
+        sentence_ids = np.cumsum(ends)[word_starts]
+        sentences = max(int(np.count_nonzero(np.diff(sentence_ids))) + 1, 1) if len(word_starts) else 1
+        return word_starts, int(np.count_nonzero(letters[word_starts])), syllables, sentences
+
+    def count_near(self, starts: List[int], kinds: List[int], signal: str, anchor: str) -> int:
+        """Matches of `signal` within TAM_FIGURE_WINDOW characters of a match of `anchor`, before or after it."""
+        positions = np.asarray(starts, dtype=np.int64)
+        codes = np.asarray(kinds, dtype=np.int64)
+        anchors = positions[codes == SIGNAL_INDEX[anchor]]
+        candidates = positions[codes == SIGNAL_INDEX[signal]]
+        if not len(anchors) or not len(candidates):
+            return 0
+        # Nearest anchor on either side of every candidate
+        after = np.searchsorted(anchors, candidates)
+        distance_before = np.abs(candidates - anchors[np.maximum(after - 1, 0)])
+        distance_after = np.abs(anchors[np.minimum(after, len(anchors) - 1)] - candidates)
+        return int((np.minimum(distance_before, distance_after) <= TAM_FIGURE_WINDOW).sum())
+
+    def score(self, features: DeckFeatures) -> ScoreModel:
+        """
+        Provisional scores of a deck from its features.
+
+        Args:
+            features (DeckFeatures): Features from `extract`
+
+        Returns:
+            ScoreModel: Scores from 0 to 10, rounded to one decimal
+        """
+        revenue = features.max_revenue_usd or 0.0
+        growth = features.max_monthly_growth_pct or 0.0
+        traction = (
+            1.0
+            + 2.0 * (features.revenue_mentions > 0)
+            + 1.5 * (features.growth_mentions > 0)
+            + 1.5 * (features.user_mentions > 0)
+            + 1.0 * (features.retention_mentions > 0)
+            + (1.5 if revenue >= 1e6 else 0.75 if revenue >= 1e5 else 0.0)
+            + (1.5 if growth >= 15 else 0.75 if growth >= 5 else 0.0)
+        )
+
+        text_heavy_share = features.text_heavy_slides / features.slides if features.slides else 1.0
+        clarity = (
+            2.0
+            + 5.0 * features.section_coverage
+            + 2.0 * min(max((features.readability - 10.0) / 50.0, 0.0), 1.0)
+            + 1.0 * (0 < features.words_per_sentence <= 20)
+            - 3.0 * text_heavy_share
+        )
+
+        has = set(features.sections)
+        differentiation = 2.0 + 3.0 * ("competition" in has) + 1.2 * min(features.moat_mentions, 3) + 1.4 * (features.unit_economics_mentions > 0)
+
+        scalability = (
+            2.0
+            + 2.0 * ("market" in has)
+            + 1.5 * (features.tam_figures > 0)
+            + 1.5 * (features.unit_economics_mentions > 0)
+            + 1.5 * ("go_to_market" in has)
+            + 1.5 * ("business_model" in has)
+        )
+
+        scores = {
+            name: float(np.clip(value, 0.0, 10.0))
+            for name, value in (("traction", traction), ("clarity", clarity), ("differentiation", differentiation), ("scalability", scalability))
+        }
+        overall = sum(OVERALL_WEIGHTS[name] * value for name, value in scores.items())
+        return ScoreModel(overall=round(overall, 1), **{name: round(value, 1) for name, value in scores.items()})
+
+    def prescore(self, document: Union[ExtractedDocument, str]) -> Tuple[ScoreModel, DeckFeatures, float]:
+        """
+        Extract the features of a deck and score them.
+
+        Args:
+            document (Union[ExtractedDocument, str]): Extracted document, or deck text
+
+        Returns:
+            Tuple[ScoreModel, DeckFeatures, float]: Provisional scores, features and elapsed milliseconds
+        """
+        start = time.perf_counter()
+        features = self.extract(document)
+        score = self.score(features)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Pre-scored deck in {elapsed_ms:.1f} ms: overall {score.overall}, "
+            f"sections {features.sections}, missing {features.missing_sections}"
+        )
+        return score, features, elapsed_ms
@@ -0,0 +1,196 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+from app.schemas.pitch_schema import EvaluationRequest
+
+# Set up logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace."""
+    return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+
+def evaluation_key(request: EvaluationRequest) -> str:
+    """
+    Identify an evaluation by everything that determines its result.
+
+    The key covers the file content, the normalized title, the revised pitch
+    (which selects the deck version history), the normalized user query and
+    every setting that changes the result (models, evaluation and scoring
+    modes, text extraction and normalization, pre-scorer context, Q&A), so
+    that only truly identical submissions share a result and a stored result
+    is not served after the configuration changed.
+
+    Args:
+        request (EvaluationRequest): The pitch submission
+
+    Returns:
+        str: Hex digest identifying the evaluation
+    """
+    parts = [
+        hashlib.sha256(request.file_content).hexdigest(),
+        _normalize(request.title),
+        request.parent_pitch_id or "",
+        _normalize(request.user_query),
+        os.getenv("OPENAI_MODEL", ""),
+        os.getenv("OPENAI_MODEL_SUPERVISOR", ""),
+        os.getenv("EVALUATION_MODE", "multi_agent"),
+        # Scoring cascade
+        os.getenv("SCORING_MODE", "single"),
+        os.getenv("OPENAI_MODEL_SCORING_CHEAP", "gpt-4.1-nano"),
+        os.getenv("SCORING_CASCADE_SAMPLES", "2"),
+        os.getenv("SCORING_CASCADE_TOLERANCE", "1.0"),
+        os.getenv("SCORING_CASCADE_TEMPERATURE", "0.7"),
+        # Deck text the agents see
+        os.getenv("TEXT_NORMALIZATION_LEVEL", "standard"),
+        os.getenv("PDF_ENGINE", "auto"),
+        os.getenv("PDF_FAST_MIN_CHARS", "20"),
+        os.getenv("OCR_ENABLED", "true"),
+        os.getenv("OCR_DPI", "200"),
+        os.getenv("OCR_LANGUAGE", "eng"),
+        os.getenv("PRESCORE_PROMPT_CONTEXT", "false"),
+        # Investor questions stored with the evaluation
+        os.getenv("QNA_ENABLED", "true"),
+        os.getenv("OPENAI_MODEL_QNA", ""),
+        os.getenv("QNA_QUESTIONS_PER_CATEGORY", "3"),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class RequestCoalescer:
+    """
+    Singleflight for evaluations: concurrent calls with the same key share one run.
+
+    The first caller starts the work as a task; callers arriving while it is in
+    flight await the same task. Waiters are shielded and counted: one of them
+    going away does not cancel the run for the others, but the run is cancelled
+    once the last waiter has gone. The key is released as soon as the run
+    finishes, successful or not.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    async def run(self, key: str, work: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `work` for `key`, or join the run already in flight.
+
+        Args:
+            key (str): Coalescing key
+            work (Callable[[], Awaitable[Any]]): Coroutine factory doing the work
+
+        Returns:
+            Tuple[Any, bool]: (result, True if the result came from another caller's run)
+        """
+        task = self._inflight.get(key)
+        coalesced = task is not None
+        if coalesced:
+            metrics.increment("coalescer.coalesced")
+            logger.info(f"Joining in-flight evaluation {key[:12]}")
+        else:
+            metrics.increment("coalescer.started")
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task), coalesced
+        except asyncio.CancelledError:
+            if self._waiters.get(key) == 1 and not task.done():
+                logger.info(f"Last waiter of evaluation {key[:12]} went away, cancelling it")
+                metrics.increment("coalescer.cancelled")
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the error as retrieved when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def inflight(self) -> int:
+        """Number of evaluations currently in flight."""
+        return len(self._inflight)
+
+
+class IdempotencyConflictError(ValueError):
+    """Raised when an Idempotency-Key is reused for a different request"""
+    pass
+
+
+class IdempotencyStore:
+    """
+    In-process store of completed results by Idempotency-Key, with a TTL.
+
+    Each entry remembers the evaluation key of the request that created it, so
+    a key reused for a different submission is rejected instead of answered
+    with an unrelated result. Oldest entries are evicted beyond `max_keys`.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_keys: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+        self.max_keys = max_keys if max_keys is not None else int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+
+    def get(self, idempotency_key: str, request_key: str) -> Optional[Any]:
+        """
+        Return the stored result of an Idempotency-Key, if it has not expired.
+
+        Args:
+            idempotency_key (str): Client-provided Idempotency-Key
+            request_key (str): Evaluation key of the current request
+
+        Returns:
+            Optional[Any]: Stored result, or None
+
+        Raises:
+            IdempotencyConflictError: If the key was used for a different request
+        """
+        entry = self._entries.get(idempotency_key)
+        if entry is None:
+            return None
+        expires_at, stored_request_key, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[idempotency_key]
+            return None
+        if stored_request_key != request_key:
+            metrics.increment("idempotency.conflicts")
+            raise IdempotencyConflictError(f"Idempotency-Key {idempotency_key} was already used for a different request")
+        metrics.increment("idempotency.hits")
+        return result
+
+    def put(self, idempotency_key: str, request_key: str, result: Any) -> None:
+        """
+        Store the result of a completed request.
+
+        Args:
+            idempotency_key (str): Client-provided Idempotency-Key
+            request_key (str): Evaluation key of the request
+            result (Any): Result to return to retries
+        """
+        self._entries[idempotency_key] = (time.monotonic() + self.ttl_seconds, request_key, result)
+        self._entries.move_to_end(idempotency_key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+
+# Process-wide instances shared by all requests
+evaluation_coalescer = RequestCoalescer()
+idempotency_store = IdempotencyStore()
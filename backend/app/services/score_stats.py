@@ -0,0 +1,241 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+from app.config.prisma_client import get_prisma
+from app.schemas.pitch_schema import PitchStatus, ScoreModel
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+SCORE_DIMENSIONS = ["clarity", "differentiation", "traction", "scalability", "overall"]
+
+# Scores from 0 to 10 are counted in buckets of 0.1, exact for the one-decimal scores the agents give
+BUCKETS_PER_POINT = 10
+BUCKET_COUNT = 10 * BUCKETS_PER_POINT + 1
+
+UPSERT_SQL_PREFIX = 'INSERT INTO "ScoreHistogram" ("dimension", "bucket", "count") VALUES '
+UPSERT_SQL_SUFFIX = ' ON CONFLICT ("dimension", "bucket") DO UPDATE SET "count" = "ScoreHistogram"."count" + EXCLUDED."count"'
+
+# Rebuilds every histogram from the stored scores, for the initial backfill or a repair.
+# Only completed pitches are counted, the population the leaderboard ranks.
+# Older rows hold their scores as a JSON-encoded string inside the Json column.
+REBUILD_SQL = """
+WITH scored AS (
+    SELECT f."overallScore" AS overall,
+           CASE WHEN jsonb_typeof(f."scores") = 'string' THEN (f."scores" #>> '{}')::jsonb ELSE f."scores" END AS scores
+    FROM "Feedback" f JOIN "Pitch" p ON p."id" = f."pitchId"
+    WHERE f."overallScore" IS NOT NULL AND f."scores" IS NOT NULL AND p."status" = $1
+),
+samples AS (
+    SELECT 'overall' AS dimension, overall AS score FROM scored
+    UNION ALL
+    SELECT dimension.name, (scored.scores -> dimension.name ->> 'score')::float8
+    FROM scored CROSS JOIN unnest(ARRAY['clarity', 'differentiation', 'traction', 'scalability']) AS dimension(name)
+)
+INSERT INTO "ScoreHistogram" ("dimension", "bucket", "count")
+SELECT dimension, LEAST(100, GREATEST(0, round(score * 10)::int)), COUNT(*)
+FROM samples
+WHERE score IS NOT NULL
+GROUP BY 1, 2
+"""
+
+
+def score_bucket(score: float) -> int:
+    """Histogram bucket of a score, clamped to [0, 10]."""
+    return min(BUCKET_COUNT - 1, max(0, int(round(score * BUCKETS_PER_POINT))))
+
+
+def score_values(score: ScoreModel) -> Dict[str, float]:
+    """Score of every dimension, overall included."""
+    return {dimension: getattr(score, dimension) for dimension in SCORE_DIMENSIONS}
+
+
+class ScoreHistograms:
+    """
+    Per-dimension score histograms with prefix sums, answering percentile ranks in O(1).
+
+    An in-process copy of the ScoreHistogram table. It is reloaded when older
+    than SCORE_STATS_CACHE_SECONDS, so that the writes of other processes
+    (API replicas, queue workers) show up, and the writes of this process are
+    applied to it right away.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, List[int]] = {dimension: [0] * BUCKET_COUNT for dimension in SCORE_DIMENSIONS}
+        self._below: Dict[str, List[int]] = {}
+        self._loaded_at: Optional[float] = None
+        self._rebuild_prefix_sums()
+
+    def _rebuild_prefix_sums(self) -> None:
+        # _below[d][b] is the number of samples in buckets < b; the last entry is the total
+        for dimension, counts in self._counts.items():
+            below = [0] * (BUCKET_COUNT + 1)
+            for bucket, count in enumerate(counts):
+                below[bucket + 1] = below[bucket] + count
+            self._below[dimension] = below
+
+    def is_stale(self) -> bool:
+        ttl = float(os.getenv("SCORE_STATS_CACHE_SECONDS", "30"))
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > ttl
+
+    def load(self, rows: List[Dict]) -> None:
+        """Replace the histograms with the rows of the ScoreHistogram table."""
+        counts = {dimension: [0] * BUCKET_COUNT for dimension in SCORE_DIMENSIONS}
+        for row in rows:
+            if row["dimension"] in counts and 0 <= row["bucket"] < BUCKET_COUNT:
+                counts[row["dimension"]][row["bucket"]] = max(0, int(row["count"]))
+        with self._lock:
+            self._counts = counts
+            self._rebuild_prefix_sums()
+            self._loaded_at = time.monotonic()
+
+    def apply(self, deltas: Dict[str, Dict[int, int]]) -> None:
+        """Apply count changes written by this process."""
+        with self._lock:
+            for dimension, buckets in deltas.items():
+                for bucket, delta in buckets.items():
+                    self._counts[dimension][bucket] = max(0, self._counts[dimension][bucket] + delta)
+            self._rebuild_prefix_sums()
+
+    def total(self, dimension: str) -> int:
+        with self._lock:
+            return self._below[dimension][-1]
+
+    def percentile_rank(self, dimension: str, score: float) -> Optional[float]:
+        """
+        Share of the scored pitches below a score, counting ties as half.
+
+        Args:
+            dimension (str): One of SCORE_DIMENSIONS
+            score (float): Score to rank
+
+        Returns:
+            Optional[float]: Percentile rank from 0 to 100, None before any pitch was scored
+        """
+        bucket = score_bucket(score)
+        with self._lock:
+            below = self._below[dimension]
+            total = below[-1]
+            if total == 0:
+                return None
+            ties = below[bucket + 1] - below[bucket]
+            return round(100.0 * (below[bucket] + 0.5 * ties) / total, 2)
+
+
+# Process-wide copy of the score histograms
+score_histograms = ScoreHistograms()
+
+
+class ScoreStatsService:
+    """
+    Maintains the score histograms on every scoring write and serves percentile ranks from them.
+
+    The histograms count the scores of completed pitches only, like the
+    leaderboard, so a pitch enters them when it is completed with a score.
+    """
+
+    def counted_score(self, score: Optional[ScoreModel], status: Optional[str]) -> Optional[ScoreModel]:
+        """The scores a pitch contributes to the histograms with the given status, if any."""
+        return score if status == PitchStatus.COMPLETED.value else None
+
+    def histogram_deltas(self, new_score: Optional[ScoreModel], old_score: Optional[ScoreModel] = None) -> Dict[str, Dict[int, int]]:
+        """
+        Bucket count changes of replacing a pitch's scores.
+
+        Args:
+            new_score (Optional[ScoreModel]): Scores being written
+            old_score (Optional[ScoreModel]): Scores they replace, if the pitch was already scored
+
+        Returns:
+            Dict[str, Dict[int, int]]: Non-zero count changes per dimension and bucket
+        """
+        deltas: Dict[str, Dict[int, int]] = {dimension: {} for dimension in SCORE_DIMENSIONS}
+        for score, sign in ((old_score, -1), (new_score, 1)):
+            if score is None:
+                continue
+            for dimension, value in score_values(score).items():
+                bucket = score_bucket(value)
+                deltas[dimension][bucket] = deltas[dimension].get(bucket, 0) + sign
+        return {
+            dimension: {bucket: delta for bucket, delta in buckets.items() if delta}
+            for dimension, buckets in deltas.items()
+            if any(buckets.values())
+        }
+
+    async def write_deltas(self, client, deltas: Dict[str, Dict[int, int]]) -> None:
+        """
+        Add bucket count changes to the ScoreHistogram table in one statement.
+
+        Args:
+            client: Prisma client or transaction to write with, so that the
+                histograms change atomically with the scores
+            deltas (Dict[str, Dict[int, int]]): Changes from `histogram_deltas`
+        """
+        values = []
+        params = []
+        for dimension, buckets in deltas.items():
+            for bucket, delta in buckets.items():
+                params += [dimension, bucket, delta]
+                values.append(f"(${len(params) - 2}::text, ${len(params) - 1}::int, ${len(params)}::int)")
+        if not values:
+            return
+        await client.execute_raw(UPSERT_SQL_PREFIX + ", ".join(values) + UPSERT_SQL_SUFFIX, *params)
+
+    def applied(self, deltas: Dict[str, Dict[int, int]]) -> None:
+        """Reflect committed changes in the in-process histograms."""
+        score_histograms.apply(deltas)
+
+    async def histograms(self) -> ScoreHistograms:
+        """The in-process histograms, reloaded from the database when stale."""
+        if score_histograms.is_stale():
+            with metrics.timer("score_stats.reload"):
+                async with get_prisma() as prisma:
+                    rows = await prisma.query_raw('SELECT "dimension", "bucket", "count" FROM "ScoreHistogram"')
+            score_histograms.load(rows)
+            logger.info(f"Reloaded score histograms ({score_histograms.total('overall')} scored pitches)")
+        return score_histograms
+
+    async def percentile_ranks(self, score: ScoreModel) -> Dict[str, Optional[float]]:
+        """
+        Percentile rank of every dimension of a pitch's scores.
+
+        Args:
+            score (ScoreModel): Scores to rank
+
+        Returns:
+            Dict[str, Optional[float]]: Percentile rank per dimension
+        """
+        histograms = await self.histograms()
+        return {dimension: histograms.percentile_rank(dimension, value) for dimension, value in score_values(score).items()}
+
+    async def rebuild(self) -> int:
+        """
+        Recompute the histograms from the scores of completed pitches (full scan, maintenance only).
+
+        Returns:
+            int: Number of completed, scored pitches counted
+        """
+        async with get_prisma() as prisma:
+            async with prisma.tx() as transaction:
+                await transaction.execute_raw('DELETE FROM "ScoreHistogram"')
+                await transaction.execute_raw(REBUILD_SQL, PitchStatus.COMPLETED.value)
+                rows = await transaction.query_raw('SELECT "dimension", "bucket", "count" FROM "ScoreHistogram"')
+        score_histograms.load(rows)
+        total = score_histograms.total("overall")
+        logger.info(f"Rebuilt score histograms from {total} scored pitches")
+        return total
+
+
+if __name__ == "__main__":
+    # python -m app.services.score_stats rebuild
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("Usage: python -m app.services.score_stats rebuild")
+    print(f"Counted {asyncio.run(ScoreStatsService().rebuild())} scored pitches")
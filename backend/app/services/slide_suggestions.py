@@ -0,0 +1,223 @@
+# app/services/slide_suggestions.py
+import os
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.ai.agents import slide_suggestion_agent
+from app.config.logging_config import setup_logging
+from app.config.metrics import metrics
+from app.schemas.document_schema import DocumentSection, ExtractedDocument, SectionKind
+from app.schemas.pitch_schema import SlideSuggestion
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class SlideSuggestionCache:
+    """
+    In-process LRU cache of slide suggestions by slide content hash.
+
+    Decks are re-uploaded with most slides unchanged, and boilerplate slides
+    (title, contact, appendix dividers) repeat across decks, so their
+    suggestions are reused instead of asked again.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("SLIDE_SUGGESTION_CACHE_SIZE", "5000"))
+        self._entries: "OrderedDict[str, List[str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        suggestions = self._entries.get(key)
+        if suggestions is not None:
+            self._entries.move_to_end(key)
+        return suggestions
+
+    def put(self, key: str, suggestions: List[str]) -> None:
+        self._entries[key] = suggestions
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Process-wide cache and call limit, shared by all requests
+slide_suggestion_cache = SlideSuggestionCache()
+_semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+
+def slide_call_semaphore() -> asyncio.Semaphore:
+    """Process-wide limit of concurrent slide suggestion calls (SLIDE_SUGGESTION_CONCURRENCY)."""
+    global _semaphore
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or _semaphore[0] is not loop:
+        _semaphore = (loop, asyncio.Semaphore(int(os.getenv("SLIDE_SUGGESTION_CONCURRENCY", "8"))))
+    return _semaphore[1]
+
+
+class SlideSuggestionService:
+    """
+    Per-slide edit suggestions, fanned out as small concurrent LLM calls.
+
+    Slides of a PPTX and pages of a PDF are each sent on their own, except
+    runs of consecutive tiny slides (below SLIDE_BATCH_MIN_CHARS) that share
+    a call, up to SLIDE_BATCH_MAX_SLIDES slides and SLIDE_BATCH_MAX_CHARS
+    characters. Calls of every request together stay within
+    SLIDE_SUGGESTION_CONCURRENCY, and slides already seen are answered from
+    the cache. Results are yielded in slide order, each as soon as it and the
+    slides before it are done.
+    """
+
+    def __init__(self, cache: Optional[SlideSuggestionCache] = None):
+        """
+        Initialize SlideSuggestionService instance.
+
+        Args:
+            cache (Optional[SlideSuggestionCache]): Suggestion cache, the process-wide one by default
+        """
+        self.cache = cache if cache is not None else slide_suggestion_cache
+        self.batch_min_chars = int(os.getenv("SLIDE_BATCH_MIN_CHARS", "200"))
+        self.batch_max_chars = int(os.getenv("SLIDE_BATCH_MAX_CHARS", "1200"))
+        self.batch_max_slides = int(os.getenv("SLIDE_BATCH_MAX_SLIDES", "6"))
+
+    def slides(self, document: ExtractedDocument) -> List[DocumentSection]:
+        """Non-empty slides or pages of a document; DOCX and TXT blocks are not slides."""
+        return [
+            section for section in document.iter_sections()
+            if section.kind in (SectionKind.SLIDE, SectionKind.PAGE)
+        ]
+
+    def slide_body(self, section: DocumentSection, separator: str) -> str:
+        """Text of a slide without its header, what its suggestions depend on."""
+        return section.render(separator, with_header=False)
+
+    def cache_key(self, body: str) -> str:
+        model = os.getenv("OPENAI_MODEL_SLIDES") or os.getenv("OPENAI_MODEL") or ""
+        return hashlib.sha256(f"{model}\0{body}".encode("utf-8")).hexdigest()
+
+    def plan_batches(self, slides: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """
+        Group slides into calls: tiny consecutive slides together, the others alone.
+
+        Args:
+            slides (List[Tuple[int, str]]): (slide number, body) of the slides to ask for, in order
+
+        Returns:
+            List[List[Tuple[int, str]]]: Slides of every call, in slide order
+        """
+        batches: List[List[Tuple[int, str]]] = []
+        current: List[Tuple[int, str]] = []
+        current_chars = 0
+        previous_number = None
+        for number, body in slides:
+            tiny = len(body) < self.batch_min_chars
+            fits = (
+                current
+                and previous_number == number - 1
+                and len(current) < self.batch_max_slides
+                and current_chars + len(body) <= self.batch_max_chars
+            )
+            if not (tiny and fits):
+                if current:
+                    batches.append(current)
+                current, current_chars = [], 0
+            current.append((number, body))
+            current_chars += len(body)
+            previous_number = number
+            if not tiny:
+                batches.append(current)
+                current, current_chars = [], 0
+        if current:
+            batches.append(current)
+        return batches
+
+    async def suggest_batch(self, batch: List[Tuple[int, str]], keys: Dict[int, str]) -> Dict[int, List[str]]:
+        """
+        Ask for the suggestions of one batch and cache them per slide.
+
+        Args:
+            batch (List[Tuple[int, str]]): (slide number, body) of the slides of the call
+            keys (Dict[int, str]): Cache key of every slide number
+
+        Returns:
+            Dict[int, List[str]]: Suggestions per slide number returned by the model
+        """
+        slides_text = "\n\n".join(f"--- Slide {number} ---\n{body}" for number, body in batch)
+        async with slide_call_semaphore():
+            with metrics.timer("slide_suggestions.call"):
+                result = await slide_suggestion_agent(slides_text)
+        metrics.increment("slide_suggestions.calls")
+        numbers = {number for number, _ in batch}
+        suggestions = {edits.slide_number: edits.suggestions for edits in result.slides if edits.slide_number in numbers}
+        # Entries numbered otherwise (renumbered from 1) are matched by position
+        unmatched = iter([edits for edits in result.slides if edits.slide_number not in numbers])
+        for number, _ in batch:
+            if number not in suggestions:
+                edits = next(unmatched, None)
+                if edits is not None:
+                    suggestions[number] = edits.suggestions
+        for number, slide_suggestions in suggestions.items():
+            self.cache.put(keys[number], slide_suggestions)
+        
+        # Slides a batched call skipped are asked again on their own
+        skipped = [(number, body) for number, body in batch if number not in suggestions]
+        if skipped and len(batch) > 1:
+            metrics.increment("slide_suggestions.batch_retries", len(skipped))
+            retried = await asyncio.gather(*(self.suggest_batch([slide], keys) for slide in skipped), return_exceptions=True)
+            for result in retried:
+                if not isinstance(result, Exception):
+                    suggestions.update(result)
+        return suggestions
+
+    async def stream(self, document: ExtractedDocument) -> AsyncIterator[SlideSuggestion]:
+        """
+        Generate the suggestions of every slide of a document, in slide order.
+
+        Args:
+            document (ExtractedDocument): Extracted (and normalized) deck
+
+        Yields:
+            SlideSuggestion: Suggestions of the next slide, with `error` set when its call failed
+        """
+        slides = [(section.number, self.slide_body(section, document.span_separator)) for section in self.slides(document)]
+        keys = {number: self.cache_key(body) for number, body in slides}
+        cached = {number: self.cache.get(keys[number]) for number, _ in slides}
+        # Identical slides of the same deck are asked for once
+        first_with_key: Dict[str, int] = {}
+        source: Dict[int, int] = {}
+        missing = []
+        for number, body in slides:
+            if cached[number] is None:
+                source[number] = first_with_key.setdefault(keys[number], number)
+                if source[number] == number:
+                    missing.append((number, body))
+        batches = self.plan_batches(missing)
+        metrics.increment("slide_suggestions.slides", len(slides))
+        metrics.increment("slide_suggestions.cache_hits", len(slides) - len(source))
+        logger.info(f"Slide suggestions for {len(slides)} slides: {len(slides) - len(source)} cached, {len(batches)} calls")
+
+        tasks = {}
+        for batch in batches:
+            task = asyncio.create_task(self.suggest_batch(batch, keys))
+            for number, _ in batch:
+                tasks[number] = task
+        try:
+            for number, _ in slides:
+                if cached[number] is not None:
+                    yield SlideSuggestion(slide_number=number, suggestions=cached[number], cached=True)
+                    continue
+                try:
+                    suggestions = await tasks[source[number]]
+                except Exception as e:
+                    logger.warning(f"Slide suggestions failed for slide {number}: {str(e)}")
+                    yield SlideSuggestion(slide_number=number, error="Suggestions could not be generated for this slide")
+                    continue
+                if source[number] not in suggestions:
+                    yield SlideSuggestion(slide_number=number, error="The model returned no suggestions for this slide")
+                    continue
+                yield SlideSuggestion(slide_number=number, suggestions=suggestions[source[number]])
+        finally:
+            # Calls still running when the consumer stops early are not needed anymore
+            for task in set(tasks.values()):
+                task.cancel()
@@ -0,0 +1,215 @@
+# app/services/text_normalizer.py
+import os
+import re
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from app.config.logging_config import setup_logging
+from app.schemas.document_schema import ExtractedDocument, DocumentSection, NormalizationReport
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+LEVELS = ["off", "light", "standard", "aggressive"]
+
+INVISIBLE_CHARS = re.compile(r"[\u200b\u200c\u200d\u2060\ufeff\u00ad]")
+HORIZONTAL_SPACE = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+# "Page 3", "Page 3 of 20", "3 / 20", "- 3 -", "Slide 3"
+PAGE_NUMBER_LINE = re.compile(r"^(?:page|slide|p\.)?\s*[-–]?\s*(\d{1,4})\s*[-–]?\s*(?:(?:/|of)\s*\d{1,4})?$", re.IGNORECASE)
+# Legal and confidentiality boilerplate, only dropped at the aggressive level.
+# Short markers such as "Confidential" only count on short lines, so that a
+# content sentence mentioning confidentiality is kept.
+BOILERPLATE_MARKER = re.compile(
+    r"confidential|all rights reserved|^©|copyright\s+(©\s*)?\d{4}|for discussion purposes only|do not (copy|distribute)",
+    re.IGNORECASE
+)
+BOILERPLATE_MARKER_MAX_WORDS = 12
+DISCLAIMER = re.compile(
+    r"forward[- ]looking statements?|not an offer to sell|solicitation of an offer|no representation or warranty",
+    re.IGNORECASE
+)
+
+# Fraction of sections a line must appear in to count as a running header or footer
+REPEATED_SHARE = {"standard": 0.5, "aggressive": 0.3}
+REPEATED_MIN_SECTIONS = {"standard": 3, "aggressive": 2}
+
+_token_encoder = None
+_token_encoder_loaded = False
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Count the tokens of a text with tiktoken, or estimate them when its encoding is not available.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Number of tokens
+    """
+    global _token_encoder, _token_encoder_loaded
+    if not _token_encoder_loaded:
+        _token_encoder_loaded = True
+        try:
+            import tiktoken
+            _token_encoder = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.info(f"tiktoken encoding unavailable, estimating tokens from characters: {str(e)}")
+    if _token_encoder is not None:
+        return len(_token_encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+class TextNormalizer:
+    """
+    Reduce the size of extracted deck text before it is sent to the LLM.
+
+    Levels (TEXT_NORMALIZATION_LEVEL):
+      - off: the document is left untouched.
+      - light: invisible characters removed, whitespace collapsed, empty lines
+        and lines holding only the page number of their own page dropped.
+      - standard (default): light, plus running headers and footers. A line
+        repeated in at least half of the pages (3 at least) is kept at its
+        first occurrence only, also when it only differs by the page number.
+      - aggressive: standard with a 30% repetition threshold, plus legal and
+        confidentiality boilerplate lines and lines repeated within a section.
+    Tables are only whitespace-compacted, never removed.
+    """
+
+    def __init__(self, level: Optional[str] = None):
+        self.level = (level or os.getenv("TEXT_NORMALIZATION_LEVEL", "standard")).lower()
+        if self.level not in LEVELS:
+            raise ValueError(f"Invalid text normalization level: {self.level}")
+
+    def normalize(self, document: ExtractedDocument) -> Tuple[ExtractedDocument, NormalizationReport]:
+        """
+        Normalize a document.
+
+        Args:
+            document (ExtractedDocument): Extracted document
+
+        Returns:
+            Tuple[ExtractedDocument, NormalizationReport]: (normalized document, size report)
+        """
+        text_before = document.text
+        report = NormalizationReport(level=self.level, chars_before=len(text_before))
+        if self.level == "off":
+            report.chars_after = report.chars_before
+            return document, report
+
+        removed: Counter = Counter()
+        section_lines = [self._section_lines(section, removed) for section in document.sections]
+        if self.level in REPEATED_SHARE:
+            repeated = self._find_repeated_lines(document.sections, section_lines)
+            section_lines = self._drop_repeated_lines(document.sections, section_lines, repeated, removed)
+
+        sections = []
+        for section, spans in zip(document.sections, section_lines):
+            tables = [[[self._compact(cell) for cell in row] for row in table] for table in section.tables]
+            notes = self._compact_block(section.notes) if section.notes else None
+            sections.append(DocumentSection(
+                number=section.number,
+                kind=section.kind,
+                spans=["\n".join(lines) for lines in spans if lines],
+                tables=tables,
+                notes=notes or None
+            ))
+
+        normalized = ExtractedDocument(
+            file_type=document.file_type,
+            sections=sections,
+            span_separator=document.span_separator,
+            metadata=dict(document.metadata)
+        )
+        text_after = normalized.text
+        report.chars_after = len(text_after)
+        report.tokens_before = estimate_tokens(text_before)
+        report.tokens_after = estimate_tokens(text_after)
+        report.removed_lines = dict(removed)
+        normalized.metadata["normalization"] = report.model_dump()
+        return normalized, report
+
+    def _compact(self, text: str) -> str:
+        """Remove invisible characters and collapse horizontal whitespace of one line."""
+        return HORIZONTAL_SPACE.sub(" ", INVISIBLE_CHARS.sub("", text)).strip()
+
+    def _compact_block(self, text: str) -> str:
+        lines = (self._compact(line) for line in text.splitlines())
+        return "\n".join(line for line in lines if line)
+
+    def _section_lines(self, section: DocumentSection, removed: Counter) -> List[List[str]]:
+        """Split the spans of a section into compacted lines, dropping empty and page number lines."""
+        spans = []
+        for span in section.spans:
+            lines = []
+            for raw_line in span.splitlines():
+                line = self._compact(raw_line)
+                if not line:
+                    removed["empty"] += 1
+                    continue
+                page_number = PAGE_NUMBER_LINE.match(line)
+                if page_number and int(page_number.group(1)) == section.number:
+                    removed["page_number"] += 1
+                    continue
+                if self.level == "aggressive" and self._is_boilerplate(line):
+                    removed["boilerplate"] += 1
+                    continue
+                lines.append(line)
+            spans.append(lines)
+        return spans
+
+    def _is_boilerplate(self, line: str) -> bool:
+        if DISCLAIMER.search(line):
+            return True
+        return len(line.split()) <= BOILERPLATE_MARKER_MAX_WORDS and BOILERPLATE_MARKER.search(line) is not None
+
+    def _line_key(self, line: str, section_number: int) -> str:
+        """Case-folded line with its own page number masked, so running footers compare equal."""
+        key = line.casefold()
+        number = re.escape(str(section_number))
+        key = re.sub(rf"(^|[\s|·•\-–]){number}$", r"\1#", key)
+        key = re.sub(rf"^{number}([\s|·•\-–]|$)", r"#\1", key)
+        return key
+
+    def _find_repeated_lines(self, sections: List[DocumentSection], section_lines: List[List[List[str]]]) -> Set[str]:
+        """Keys of the lines that appear in enough sections to be running headers or footers."""
+        if len(sections) < REPEATED_MIN_SECTIONS[self.level]:
+            return set()
+        section_counts: Counter = Counter()
+        for section, spans in zip(sections, section_lines):
+            section_counts.update({self._line_key(line, section.number) for lines in spans for line in lines})
+        threshold = max(REPEATED_MIN_SECTIONS[self.level], REPEATED_SHARE[self.level] * len(sections))
+        return {key for key, count in section_counts.items() if count >= threshold}
+
+    def _drop_repeated_lines(
+        self,
+        sections: List[DocumentSection],
+        section_lines: List[List[List[str]]],
+        repeated: Set[str],
+        removed: Counter
+    ) -> List[List[List[str]]]:
+        """Keep the first occurrence of every repeated line, and of every line within a section when aggressive."""
+        seen: Set[str] = set()
+        result = []
+        for section, spans in zip(sections, section_lines):
+            seen_in_section: Set[str] = set()
+            kept_spans = []
+            for lines in spans:
+                kept = []
+                for line in lines:
+                    key = self._line_key(line, section.number)
+                    if key in repeated:
+                        if key in seen:
+                            removed["repeated"] += 1
+                            continue
+                        seen.add(key)
+                    elif self.level == "aggressive" and len(line) > 3:
+                        if key in seen_in_section:
+                            removed["duplicate_in_section"] += 1
+                            continue
+                        seen_in_section.add(key)
+                    kept.append(line)
+                kept_spans.append(kept)
+            result.append(kept_spans)
+        return result
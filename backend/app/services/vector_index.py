@@ -0,0 +1,405 @@
+# app/services/vector_index.py
+import os
+import re
+import json
+import math
+import logging
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.config.logging_config import setup_logging
+
+# File locks are POSIX only; elsewhere the index is safe within a single process
+try:
+    import fcntl
+    FILE_LOCK_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    FILE_LOCK_AVAILABLE = False
+
+# Setup logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Pitch ids are UUIDs, stored as fixed-width bytes
+ID_BYTES = 40
+INITIAL_CAPACITY = 1024
+# Rows assigned to clusters per matrix product when (re)assigning
+ASSIGN_CHUNK = 65536
+
+
+class VectorIndex:
+    """
+    On-disk cosine similarity index over pitch embeddings, memory-mapped with NumPy.
+
+    Vectors are appended to `vectors.f32`. Small indexes are searched by brute
+    force. Once the index holds VECTOR_INDEX_TRAIN_MIN vectors, an inverted
+    file (IVF) is built: spherical k-means centroids partition the vectors,
+    and a cluster-ordered copy of them (`ivf.f32`) lets a search score only
+    the VECTOR_INDEX_NPROBE closest clusters as contiguous slices. Vectors
+    added after the last rebuild form a tail that is always scanned in full,
+    and the cluster-ordered copy is rebuilt when that tail grows too large.
+
+    All vectors must be L2-normalized, so dot products are cosine similarities.
+    Several processes (the API and the evaluation workers) may share a
+    folder: every read and write takes a lock on its `lock` file and first
+    catches up with the vectors, growth and rebuilds other processes recorded
+    in `meta.json`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int,
+        nprobe: Optional[int] = None,
+        train_min: Optional[int] = None,
+        nlist: Optional[int] = None
+    ):
+        self.directory = directory
+        self.dim = dim
+        self.nprobe = nprobe or int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+        self.train_min = train_min or int(os.getenv("VECTOR_INDEX_TRAIN_MIN", "20000"))
+        self.nlist_override = nlist or int(os.getenv("VECTOR_INDEX_NLIST", "0"))
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(self._path("lock"), "a+")
+
+        with self._locked(exclusive=True):
+            self.meta = self._read_meta()
+            if self.meta["dim"] != dim:
+                raise ValueError(f"Vector index in {directory} has dimension {self.meta['dim']}, expected {dim}")
+
+            self._open_arrays(self.meta["capacity"])
+            self._load_ivf()
+
+            count = self.meta["count"]
+            self._row_by_id: Dict[str, int] = {
+                pitch_id.decode("ascii"): row for row, pitch_id in enumerate(self.ids[:count])
+            }
+        logger.info(f"Vector index loaded from {directory}: {count} vectors, {self.meta['ivf_count']} in IVF")
+
+    def __len__(self) -> int:
+        with self._locked():
+            self._refresh()
+            return self.meta["count"]
+
+    def __contains__(self, pitch_id: str) -> bool:
+        with self._locked():
+            self._refresh()
+            return pitch_id in self._row_by_id
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """Hold the thread lock and, at the outermost level, a shared or exclusive lock on the folder."""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """Catch up with the vectors, growth and rebuilds written by other processes. Call under `_locked`."""
+        meta = self._read_meta()
+        if meta == self.meta:
+            return
+        if meta["capacity"] != self.meta["capacity"]:
+            self._open_arrays(meta["capacity"])
+        reload_ivf = meta["ivf_count"] != self.meta["ivf_count"] or meta["trained_count"] != self.meta["trained_count"]
+        start = self.meta["count"]
+        self.meta = meta
+        for row in range(start, meta["count"]):
+            self._row_by_id[self.ids[row].decode("ascii")] = row
+        if reload_ivf:
+            self._load_ivf()
+
+    # Storage
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self) -> Dict:
+        if os.path.exists(self._path("meta.json")):
+            with open(self._path("meta.json"), "r") as f:
+                return json.load(f)
+        return {"dim": self.dim, "count": 0, "capacity": INITIAL_CAPACITY, "ivf_count": 0, "trained_count": 0}
+
+    def _write_meta(self) -> None:
+        temp_path = self._path("meta.json.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(temp_path, self._path("meta.json"))
+
+    def _open_array(self, name: str, dtype, shape: Tuple[int, ...]) -> np.memmap:
+        """Open a raw memory-mapped array, creating or growing its file to fit `shape`."""
+        path = self._path(name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not os.path.exists(path) or os.path.getsize(path) < size:
+            with open(path, "ab") as f:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open_arrays(self, capacity: int) -> None:
+        """Map the append-only arrays with room for `capacity` rows."""
+        self.vectors = self._open_array("vectors.f32", np.float32, (capacity, self.dim))
+        self.ids = self._open_array("ids.bin", f"S{ID_BYTES}", (capacity,))
+        self.assignments = self._open_array("assign.i32", np.int32, (capacity,))
+
+    def _grow(self, needed: int) -> None:
+        """Double the capacity (at least to `needed` rows) of the append-only arrays."""
+        capacity = max(self.meta["capacity"] * 2, needed)
+        for array in (self.vectors, self.ids, self.assignments):
+            array.flush()
+        self._open_arrays(capacity)
+        self.meta["capacity"] = capacity
+
+    def _load_ivf(self) -> None:
+        ivf_count = self.meta["ivf_count"]
+        if ivf_count and os.path.exists(self._path("centroids.npy")):
+            self.centroids = np.load(self._path("centroids.npy"))
+            self.ivf_offsets = np.load(self._path("ivf_offsets.npy"))
+            self.ivf_vectors = np.memmap(self._path("ivf.f32"), dtype=np.float32, mode="r", shape=(ivf_count, self.dim))
+            self.ivf_rows = np.memmap(self._path("ivf_rows.i64"), dtype=np.int64, mode="r", shape=(ivf_count,))
+        else:
+            self.centroids = None
+            self.ivf_offsets = None
+            self.ivf_vectors = None
+            self.ivf_rows = None
+            self.meta["ivf_count"] = 0
+
+    # Writes
+
+    def add(self, pitch_id: str, vector: np.ndarray) -> bool:
+        """
+        Add the embedding of a pitch, unless the pitch is already indexed.
+
+        Args:
+            pitch_id (str): Pitch ID
+            vector (np.ndarray): L2-normalized embedding
+
+        Returns:
+            bool: True if the vector was added
+        """
+        return self.add_many([pitch_id], np.asarray(vector, dtype=np.float32).reshape(1, -1)) == 1
+
+    def add_many(self, pitch_ids: Sequence[str], vectors: np.ndarray) -> int:
+        """
+        Add a batch of pitch embeddings, skipping pitches already indexed.
+
+        Args:
+            pitch_ids (Sequence[str]): Pitch IDs
+            vectors (np.ndarray): L2-normalized embeddings, one row per pitch
+
+        Returns:
+            int: Number of vectors added
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(pitch_ids), self.dim):
+            raise ValueError(f"Expected {len(pitch_ids)} vectors of dimension {self.dim}, got {vectors.shape}")
+
+        with self._locked(exclusive=True):
+            self._refresh()
+            keep = [index for index, pitch_id in enumerate(pitch_ids) if pitch_id not in self._row_by_id]
+            if not keep:
+                return 0
+            if len(set(pitch_ids[index] for index in keep)) != len(keep):
+                raise ValueError("Duplicate pitch IDs in batch")
+
+            start = self.meta["count"]
+            end = start + len(keep)
+            if end > self.meta["capacity"]:
+                self._grow(end)
+
+            batch = vectors[keep]
+            encoded = [pitch_ids[index].encode("ascii") for index in keep]
+            if any(len(pitch_id) > ID_BYTES for pitch_id in encoded):
+                raise ValueError(f"Pitch IDs longer than {ID_BYTES} bytes are not supported")
+            self.vectors[start:end] = batch
+            self.ids[start:end] = encoded
+            if self.centroids is not None:
+                self.assignments[start:end] = np.argmax(batch @ self.centroids.T, axis=1)
+            for offset, index in enumerate(keep):
+                self._row_by_id[pitch_ids[index]] = start + offset
+
+            for array in (self.vectors, self.ids, self.assignments):
+                array.flush()
+            self.meta["count"] = end
+            self._write_meta()
+            self._maybe_rebuild()
+            return len(keep)
+
+    def _maybe_rebuild(self) -> None:
+        count = self.meta["count"]
+        tail = count - self.meta["ivf_count"]
+        if self.centroids is None:
+            if count >= self.train_min:
+                self.rebuild(retrain=True)
+        elif count >= 4 * self.meta["trained_count"]:
+            self.rebuild(retrain=True)
+        elif tail > max(10000, 0.05 * self.meta["ivf_count"]):
+            self.rebuild(retrain=False)
+
+    def rebuild(self, retrain: bool = False) -> None:
+        """
+        Rebuild the inverted file, optionally re-training the centroids first.
+
+        Args:
+            retrain (bool): Recompute the cluster centroids from the current vectors
+        """
+        with self._locked(exclusive=True):
+            self._refresh()
+            count = self.meta["count"]
+            if count == 0:
+                return
+            if retrain or self.centroids is None:
+                self._train(count)
+
+            logger.info(f"Building inverted file over {count} vectors")
+            assignments = np.asarray(self.assignments[:count])
+            order = np.argsort(assignments, kind="stable")
+            counts = np.bincount(assignments, minlength=len(self.centroids))
+            offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+            ivf_vectors = np.memmap(self._path("ivf.f32.tmp"), dtype=np.float32, mode="w+", shape=(count, self.dim))
+            for start in range(0, count, ASSIGN_CHUNK):
+                ivf_vectors[start:start + ASSIGN_CHUNK] = self.vectors[order[start:start + ASSIGN_CHUNK]]
+            ivf_vectors.flush()
+            del ivf_vectors
+            order.astype(np.int64).tofile(self._path("ivf_rows.i64.tmp"))
+            np.save(self._path("ivf_offsets.tmp.npy"), offsets)
+
+            os.replace(self._path("ivf.f32.tmp"), self._path("ivf.f32"))
+            os.replace(self._path("ivf_rows.i64.tmp"), self._path("ivf_rows.i64"))
+            os.replace(self._path("ivf_offsets.tmp.npy"), self._path("ivf_offsets.npy"))
+            self.meta["ivf_count"] = count
+            self._write_meta()
+            self._load_ivf()
+
+    def _train(self, count: int, iterations: int = 10) -> None:
+        """Spherical k-means on a sample of the vectors, then assign every vector to a cluster."""
+        nlist = self.nlist_override or max(16, min(4096, int(math.sqrt(count))))
+        rng = np.random.default_rng(0)
+        sample_size = min(count, 64 * nlist)
+        sample = np.asarray(self.vectors[np.sort(rng.choice(count, sample_size, replace=False))])
+        logger.info(f"Training {nlist} centroids on {sample_size} of {count} vectors")
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(labels, kind="stable")
+            present, starts = np.unique(labels[order], return_index=True)
+            centroids[present] = np.add.reduceat(sample[order], starts, axis=0)
+            # Re-seed empty clusters with random sample vectors
+            empty = np.setdiff1d(np.arange(nlist), present)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.maximum(norms, 1e-12)
+
+        for start in range(0, count, ASSIGN_CHUNK):
+            chunk = self.vectors[start:min(count, start + ASSIGN_CHUNK)]
+            self.assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        self.assignments.flush()
+
+        np.save(self._path("centroids.npy"), centroids.astype(np.float32))
+        self.centroids = centroids.astype(np.float32)
+        self.meta["trained_count"] = count
+
+    # Reads
+
+    def get_vector(self, pitch_id: str) -> Optional[np.ndarray]:
+        """Return the stored embedding of a pitch, or None if it is not indexed."""
+        with self._locked():
+            self._refresh()
+            row = self._row_by_id.get(pitch_id)
+            return None if row is None else np.array(self.vectors[row])
+
+    def search(self, vector: np.ndarray, k: int = 10, exclude_ids: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Find the most similar indexed pitches.
+
+        Args:
+            vector (np.ndarray): L2-normalized query embedding
+            k (int): Number of results
+            exclude_ids (Iterable[str]): Pitch IDs to leave out, e.g. the query pitch itself
+
+        Returns:
+            List[Tuple[str, float]]: (pitch_id, cosine similarity), most similar first
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        exclude = set(exclude_ids)
+        with self._locked():
+            self._refresh()
+            count = self.meta["count"]
+            ivf_count = self.meta["ivf_count"]
+            centroids, offsets = self.centroids, self.ivf_offsets
+            ivf_vectors, ivf_rows = self.ivf_vectors, self.ivf_rows
+            vectors, ids = self.vectors, self.ids
+        if count == 0 or k <= 0:
+            return []
+
+        score_parts = []
+        row_parts = []
+        if centroids is not None and ivf_count:
+            nprobe = min(self.nprobe, len(centroids))
+            probes = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+            for cluster in probes:
+                start, end = offsets[cluster], offsets[cluster + 1]
+                if end > start:
+                    score_parts.append(ivf_vectors[start:end] @ query)
+                    row_parts.append(ivf_rows[start:end])
+        # Vectors added since the last rebuild are scanned in full
+        if count > ivf_count:
+            score_parts.append(vectors[ivf_count:count] @ query)
+            row_parts.append(np.arange(ivf_count, count))
+        if not score_parts:
+            return []
+
+        scores = np.concatenate(score_parts)
+        rows = np.concatenate(row_parts)
+        wanted = min(k + len(exclude), len(scores))
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for index in top:
+            pitch_id = ids[rows[index]].decode("ascii")
+            if pitch_id in exclude:
+                continue
+            results.append((pitch_id, float(scores[index])))
+            if len(results) == k:
+                break
+        return results
+
+
+# Loaded once per process
+_vector_index: Optional[VectorIndex] = None
+_vector_index_lock = threading.Lock()
+
+
+def get_vector_index(space: str, dim: int) -> VectorIndex:
+    """
+    Return the process-wide vector index of an embedding space.
+
+    Each embedding space gets its own folder under VECTOR_INDEX_DIR, so
+    switching the embedder never mixes incomparable vectors.
+
+    Args:
+        space (str): Name of the embedding space, e.g. "hashing:256"
+        dim (int): Embedding dimension
+
+    Returns:
+        VectorIndex: The index
+    """
+    global _vector_index
+    with _vector_index_lock:
+        if _vector_index is None:
+            folder = re.sub(r"[^a-zA-Z0-9_.-]+", "_", space)
+            _vector_index = VectorIndex(os.path.join(os.getenv("VECTOR_INDEX_DIR", "vector_index"), folder), dim)
+        return _vector_index
@@ -0,0 +1,130 @@
+# benchmarks/bench_admission.py
+"""
+Behaviour of the evaluation admission control under a burst.
+
+Wraps a stand-in /evaluate-pitch endpoint in the evaluation slot the real
+endpoint takes for new evaluations, holds it for a simulated evaluation time, sends a burst of
+interactive and batch requests at once and probes /health meanwhile. Reports
+per priority class the admitted and rejected requests and the queue wait,
+plus the /health latency during the burst.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_admission --burst 200 --batch-share 0.5 --evaluation-ms 2000
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+from typing import Any, Dict, List
+import httpx
+from benchmarks.load_test import percentile
+
+
+def build_app(evaluation_ms: float):
+    from typing import Optional
+    from fastapi import FastAPI, Form, Header
+    from app.api.admission import evaluation_slot
+
+    app = FastAPI()
+
+    @app.post("/evaluate-pitch")
+    async def evaluate(title: str = Form(...), priority: Optional[str] = Header(None, alias="X-Priority")):
+        async with evaluation_slot(None, priority):
+            await asyncio.sleep(evaluation_ms / 1000)
+        return {"title": title}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy and running"}
+
+    return app
+
+
+async def run(args) -> Dict[str, Any]:
+    from app.api.admission import evaluation_admission
+    from app.config.metrics import metrics
+
+    metrics.reset()
+    rng = random.Random(7)
+    transport = httpx.ASGITransport(app=build_app(args.evaluation_ms))
+    outcomes: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    health_ms: List[float] = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def submit(index: int):
+            priority = "batch" if rng.random() < args.batch_share else "interactive"
+            start = time.perf_counter()
+            response = await client.post("/evaluate-pitch", data={"title": f"deck {index}"}, headers={"X-Priority": priority})
+            outcomes[priority][response.status_code] += 1
+            if response.status_code == 200:
+                latencies[priority].append((time.perf_counter() - start) * 1000)
+
+        async def probe_health(stop: asyncio.Event):
+            while not stop.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_ms.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.05)
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(submit(index) for index in range(args.burst)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await prober
+
+    timings = metrics.snapshot()["timings_ms"]
+    return {
+        "burst": args.burst,
+        "max_concurrent": evaluation_admission.max_concurrent,
+        "max_queue": evaluation_admission.max_queue,
+        "elapsed_s": round(elapsed, 2),
+        "classes": {
+            priority: {
+                "statuses": dict(outcomes[priority]),
+                "queue_wait_ms": timings.get(f"admission.wait.{priority}"),
+                "admitted_latency_p95_ms": round(percentile(latencies[priority], 95)),
+            }
+            for priority in ("interactive", "batch")
+        },
+        "health_ms": {"p50": round(percentile(health_ms, 50), 2), "max": round(max(health_ms), 2)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admission control under a burst of evaluations")
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--batch-share", type=float, default=0.5)
+    parser.add_argument("--evaluation-ms", type=float, default=2000.0)
+    parser.add_argument("--max-concurrent", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--max-wait-seconds", type=float, default=30.0)
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    # The controller reads its limits when app.api.admission is imported
+    os.environ["ADMISSION_MAX_CONCURRENT"] = str(args.max_concurrent)
+    os.environ["ADMISSION_MAX_QUEUE"] = str(args.max_queue)
+    os.environ["ADMISSION_MAX_WAIT_SECONDS"] = str(args.max_wait_seconds)
+    report = asyncio.run(run(args))
+
+    print(f"\nburst of {report['burst']} in {report['elapsed_s']}s, {report['max_concurrent']} slots, queue of {report['max_queue']}")
+    for priority, stats in report["classes"].items():
+        wait = stats["queue_wait_ms"] or {}
+        print(
+            f"{priority:<12} statuses {stats['statuses']}  queue wait p50 {wait.get('p50')} ms p99 {wait.get('p99')} ms"
+            f"  admitted p95 {stats['admitted_latency_p95_ms']} ms"
+        )
+    print(f"/health during the burst: p50 {report['health_ms']['p50']} ms, max {report['health_ms']['max']} ms")
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
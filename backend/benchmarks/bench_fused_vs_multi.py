@@ -0,0 +1,172 @@
+# benchmarks/bench_fused_vs_multi.py
+"""
+Compare the fused single-call evaluation with the multi-agent workflow.
+
+Runs every synthetic deck through PitchGraph once with EVALUATION_MODE=multi_agent
+and once with EVALUATION_MODE=fused, and reports per mode the end-to-end latency,
+the number of LLM calls and the prompt/completion tokens per evaluation, plus the
+agreement between the two modes' scores on the same deck.
+
+By default LLM calls go to benchmarks.mock_openai, which is enough for latency,
+call and token counts. Score agreement is only meaningful against a real model:
+pass --openai-base-url (and OPENAI_API_KEY) for that.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_fused_vs_multi --slides 10 50 --types pdf pptx --iterations 3
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+from typing import Any, Dict, List, Optional
+import httpx
+from benchmarks.load_test import percentile, wait_for_port
+from benchmarks.synthetic_decks import FILE_TYPES, generate_deck
+
+MODES = ["multi_agent", "fused"]
+SCORE_FIELDS = ["clarity", "differentiation", "traction", "scalability", "overall"]
+FEEDBACK_FIELDS = ["overall_feedback", "strengths", "weaknesses", "opportunities", "threats", "suggestions"]
+
+
+async def mock_stats(args) -> Optional[Dict[str, int]]:
+    """Cumulative request and token counters of the mock server."""
+    if args.openai_base_url:
+        return None
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{args.mock_port}/stats")).json()
+
+
+def feedback_words(evaluation) -> int:
+    """Words across all feedback sections, a rough completeness measure of the analysis."""
+    return sum(len(getattr(evaluation.feedback, field).split()) for field in FEEDBACK_FIELDS)
+
+
+async def run_mode(args, mode: str, documents: List[Any]) -> Dict[str, Any]:
+    """Evaluate every document `args.iterations` times with one evaluation mode."""
+    from app.ai.pitch_graph import PitchGraph
+    from app.schemas.pitch_schema import PitchData
+
+    os.environ["EVALUATION_MODE"] = mode
+    pitch_graph = PitchGraph()
+    latencies: List[float] = []
+    evaluations: List[Any] = []
+
+    before = await mock_stats(args)
+    for _ in range(args.iterations):
+        for document in documents:
+            pitch_data = PitchData(document=document, user_query=args.user_query)
+            start = time.perf_counter()
+            evaluation = await pitch_graph.analyze_pitch(pitch_data)
+            latencies.append((time.perf_counter() - start) * 1000)
+            evaluations.append(evaluation)
+    after = await mock_stats(args)
+
+    runs = len(latencies)
+    report = {
+        "mode": mode,
+        "runs": runs,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "mean": round(statistics.mean(latencies), 1),
+        },
+        "feedback_words_mean": round(statistics.mean(feedback_words(evaluation) for evaluation in evaluations), 1),
+    }
+    if before is not None:
+        report["llm_calls_per_run"] = round((after["requests"] - before["requests"]) / runs, 2)
+        report["prompt_tokens_per_run"] = round((after["prompt_tokens"] - before["prompt_tokens"]) / runs)
+        report["cached_tokens_per_run"] = round((after["cached_tokens"] - before["cached_tokens"]) / runs)
+        report["completion_tokens_per_run"] = round((after["completion_tokens"] - before["completion_tokens"]) / runs)
+    return report, evaluations
+
+
+def score_agreement(multi: List[Any], fused: List[Any]) -> Dict[str, Any]:
+    """Mean absolute difference per score dimension and share of overall scores within one point."""
+    differences = {
+        field: round(statistics.mean(
+            abs(getattr(a.score, field) - getattr(b.score, field)) for a, b in zip(multi, fused)
+        ), 2)
+        for field in SCORE_FIELDS
+    }
+    within_one = sum(abs(a.score.overall - b.score.overall) <= 1 for a, b in zip(multi, fused)) / len(multi)
+    return {"mean_abs_diff": differences, "overall_within_1_point": round(within_one, 2)}
+
+
+async def compare(args) -> Dict[str, Any]:
+    from app.services.file_service import FileService
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+    documents = [
+        file_service.extract_document(generate_deck(file_type, num_slides), file_type)
+        for num_slides in args.slides
+        for file_type in args.types
+    ]
+
+    reports = {}
+    evaluations = {}
+    for mode in MODES:
+        reports[mode], evaluations[mode] = await run_mode(args, mode, documents)
+
+    multi, fused = reports["multi_agent"], reports["fused"]
+    summary = {"latency_speedup_p50": round(multi["latency_ms"]["p50"] / max(fused["latency_ms"]["p50"], 0.001), 2)}
+    if "prompt_tokens_per_run" in multi:
+        summary["llm_call_reduction"] = round(multi["llm_calls_per_run"] / max(fused["llm_calls_per_run"], 0.001), 2)
+        summary["prompt_token_reduction"] = round(multi["prompt_tokens_per_run"] / max(fused["prompt_tokens_per_run"], 1), 2)
+
+    return {
+        "modes": reports,
+        "summary": summary,
+        "score_agreement": score_agreement(evaluations["multi_agent"], evaluations["fused"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fused single-call evaluation versus the multi-agent workflow")
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--types", nargs="+", default=["pdf", "pptx"], choices=FILE_TYPES)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--user-query", default="Please analyze and score this pitch")
+    parser.add_argument("--mock-port", type=int, default=8101)
+    parser.add_argument("--mock-latency-ms", type=float, default=800.0)
+    parser.add_argument("--mock-tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--openai-base-url", default=None, help="Use an OpenAI-compatible endpoint instead of the mock")
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    mock_process = None
+    if args.openai_base_url:
+        os.environ["OPENAI_BASE_URL"] = args.openai_base_url
+    else:
+        mock_process = subprocess.Popen([
+            sys.executable, "-m", "benchmarks.mock_openai",
+            "--port", str(args.mock_port),
+            "--latency-ms", str(args.mock_latency_ms),
+            "--tokens-per-sec", str(args.mock_tokens_per_sec),
+            "--seed", "7",
+        ])
+        wait_for_port("127.0.0.1", args.mock_port)
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}/v1"
+        os.environ["OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("OPENAI_MODEL", "gpt-4.1-mini")
+    os.environ.setdefault("OPENAI_MODEL_SUPERVISOR", "gpt-4.1")
+
+    try:
+        report = asyncio.run(compare(args))
+    finally:
+        if mock_process:
+            mock_process.terminate()
+            mock_process.wait()
+
+    print(json.dumps(report, indent=2))
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
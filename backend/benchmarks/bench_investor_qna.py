@@ -0,0 +1,170 @@
+# benchmarks/bench_investor_qna.py
+"""
+End-to-end cost of generating investor questions along with an evaluation.
+
+Runs every synthetic deck through PitchGraph alone and with the investor Q&A
+started next to it, as EvaluationService does for full evaluations, and
+reports per setting the evaluation latency, the LLM calls per run and the
+questions generated, plus how long the background Q&A took to finish after
+the evaluation had already returned. A last pass runs the Q&A on its own, as
+POST /pitches/{pitch_id}/simulate-qna does, and reports the time to the first
+question against the time to the last one.
+
+LLM calls go to benchmarks.mock_openai.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_investor_qna --slides 10 50 --iterations 3
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+from typing import Any, Dict, List
+import httpx
+from benchmarks.load_test import percentile, wait_for_port
+from benchmarks.synthetic_decks import FILE_TYPES, generate_deck
+
+
+async def mock_requests(args) -> int:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{args.mock_port}/stats")).json()["requests"]
+
+
+async def run_setting(args, qna_enabled: bool, documents: List[Any]) -> Dict[str, Any]:
+    """Evaluate every document `args.iterations` times with or without a background Q&A."""
+    from app.ai.agents import investor_qna_agent
+    from app.ai.pitch_graph import PitchGraph
+    from app.ai.resilience import deadline_scope
+    from app.config.metrics import metrics
+    from app.schemas.pitch_schema import PitchData
+
+    metrics.reset()
+    pitch_graph = PitchGraph()
+    latencies: List[float] = []
+    questions: List[int] = []
+    qna_after_ms: List[float] = []
+
+    before = await mock_requests(args)
+    for _ in range(args.iterations):
+        for document in documents:
+            pitch_data = PitchData(document=document, user_query=args.user_query)
+            start = time.perf_counter()
+            with deadline_scope():
+                qna_task = asyncio.create_task(investor_qna_agent(pitch_data)) if qna_enabled else None
+                await pitch_graph.analyze_pitch(pitch_data)
+            evaluated = time.perf_counter()
+            latencies.append((evaluated - start) * 1000)
+            if qna_task is not None:
+                questions.append(len(await qna_task))
+                qna_after_ms.append((time.perf_counter() - evaluated) * 1000)
+    after = await mock_requests(args)
+
+    snapshot = metrics.snapshot()
+    timings = snapshot["timings_ms"]
+    qna_call = timings.get("llm.investor_qna_agent.latency", {})
+    return {
+        "qna_enabled": qna_enabled,
+        "runs": len(latencies),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "mean": round(statistics.mean(latencies), 1),
+        },
+        "llm_calls_per_run": round((after - before) / len(latencies), 2),
+        "questions_per_run": round(statistics.mean(questions), 1) if questions else 0,
+        "qna_call_ms": {"p50": qna_call.get("p50"), "p95": qna_call.get("p95")},
+        # Questions land in the store this long after the evaluation returned
+        "qna_done_after_evaluation_ms": {
+            "p50": round(percentile(qna_after_ms, 50), 1) if qna_after_ms else None,
+            "p95": round(percentile(qna_after_ms, 95), 1) if qna_after_ms else None,
+        },
+    }
+
+
+async def run_streaming(args, documents: List[Any]) -> Dict[str, Any]:
+    """Time to the first and to the last question of a standalone Q&A run."""
+    from app.ai.agents import investor_qna_agent
+    from app.schemas.pitch_schema import PitchData
+
+    first_ms: List[float] = []
+    last_ms: List[float] = []
+    for document in documents:
+        start = time.perf_counter()
+        arrivals: List[float] = []
+
+        async def on_question(_):
+            arrivals.append((time.perf_counter() - start) * 1000)
+
+        await investor_qna_agent(PitchData(document=document), on_question=on_question)
+        first_ms.append(arrivals[0])
+        last_ms.append(arrivals[-1])
+    return {
+        "first_question_ms_p50": round(percentile(first_ms, 50), 1),
+        "last_question_ms_p50": round(percentile(last_ms, 50), 1),
+    }
+
+
+async def compare(args) -> Dict[str, Any]:
+    from app.services.file_service import FileService
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+    documents = [
+        file_service.extract_document(generate_deck(file_type, num_slides), file_type)
+        for num_slides in args.slides
+        for file_type in args.types
+    ]
+
+    without_qna = await run_setting(args, False, documents)
+    with_qna = await run_setting(args, True, documents)
+    return {
+        "without_qna": without_qna,
+        "with_qna": with_qna,
+        "latency_overhead_p50_ms": round(with_qna["latency_ms"]["p50"] - without_qna["latency_ms"]["p50"], 1),
+        "streaming": await run_streaming(args, documents),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluation latency with and without the background investor Q&A")
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--types", nargs="+", default=["pdf", "pptx"], choices=FILE_TYPES)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--user-query", default="Please analyze and score this pitch")
+    parser.add_argument("--mock-port", type=int, default=8102)
+    parser.add_argument("--mock-latency-ms", type=float, default=800.0)
+    parser.add_argument("--mock-tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    mock_process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_openai",
+        "--port", str(args.mock_port),
+        "--latency-ms", str(args.mock_latency_ms),
+        "--tokens-per-sec", str(args.mock_tokens_per_sec),
+        "--seed", "7",
+    ])
+    wait_for_port("127.0.0.1", args.mock_port)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("OPENAI_MODEL", "gpt-4.1-mini")
+    os.environ.setdefault("OPENAI_MODEL_SUPERVISOR", "gpt-4.1")
+
+    try:
+        report = asyncio.run(compare(args))
+    finally:
+        mock_process.terminate()
+        mock_process.wait()
+
+    print(json.dumps(report, indent=2))
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_pdf_extraction.py
+"""
+Benchmark the adaptive PDF engine against pdfplumber-only extraction.
+
+Runs every PDF of a local corpus folder through both paths and reports the
+engine chosen per document, the extraction time and how much of the
+pdfplumber text the adaptive output retains.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_pdf_extraction --corpus-dir ~/decks/pdf --repeat 3
+"""
+import io
+import os
+import glob
+import time
+import argparse
+import difflib
+import pdfplumber
+from app.services.file_service import FileService
+
+
+def pdfplumber_extract_text(file_content: bytes) -> str:
+    """Extract every page with pdfplumber, as the service did before the adaptive engine."""
+    with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+        return "\n\n".join(page_text for page_text in (page.extract_text() for page in pdf.pages) if page_text)
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Return the best wall-clock time of `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive PDF engine benchmark")
+    parser.add_argument("--corpus-dir", default=os.getenv("PDF_CORPUS_DIR"), help="Folder of deck PDFs")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not args.corpus_dir:
+        parser.error("--corpus-dir (or PDF_CORPUS_DIR) is required")
+
+    paths = sorted(glob.glob(os.path.join(os.path.expanduser(args.corpus_dir), "*.pdf")))
+    if not paths:
+        parser.error(f"No PDF files found in {args.corpus_dir}")
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+
+    total_plumber = 0.0
+    total_adaptive = 0.0
+    print(f"{'document':<36}{'pages':>7}{'engine':>12}{'pdfplumber ms':>15}{'adaptive ms':>13}{'speedup':>9}{'similarity':>12}")
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+
+        plumber_time = best_of(args.repeat, pdfplumber_extract_text, content)
+        adaptive_time = best_of(args.repeat, file_service.extract_document_from_pdf, content)
+        total_plumber += plumber_time
+        total_adaptive += adaptive_time
+
+        document = file_service.extract_document_from_pdf(content)
+        reference = pdfplumber_extract_text(content)
+        similarity = difflib.SequenceMatcher(None, reference.split(), document.text.split(), autojunk=False).ratio() if reference else 1.0
+
+        print(
+            f"{os.path.basename(path)[:35]:<36}"
+            f"{document.metadata['page_count']:>7}"
+            f"{document.metadata['engine']:>12}"
+            f"{plumber_time * 1000:>15.1f}"
+            f"{adaptive_time * 1000:>13.1f}"
+            f"{plumber_time / adaptive_time:>8.2f}x"
+            f"{similarity:>12.3f}"
+        )
+
+    print(f"\nCorpus total: pdfplumber {total_plumber * 1000:.1f} ms, adaptive {total_adaptive * 1000:.1f} ms ({total_plumber / total_adaptive:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
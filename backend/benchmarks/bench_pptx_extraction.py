@@ -0,0 +1,121 @@
+# benchmarks/bench_pptx_extraction.py
+"""
+Benchmark the single-pass PPTX walker against the previous extractor.
+
+Generates a corpus of large decks (200+ slides, heavy tables, grouped shapes
+and speaker notes) and reports throughput in slides/sec for both extractors.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_pptx_extraction --slides 200 400 --repeat 3
+"""
+import io
+import os
+import time
+import argparse
+import tempfile
+from typing import List
+from pptx import Presentation
+from app.services.file_service import FileService
+from benchmarks.synthetic_decks import generate_slides, generate_pptx
+
+
+def generate_large_deck(num_slides: int) -> bytes:
+    """Generate a PPTX deck with two heavy tables, a grouped callout and notes per slide."""
+    slides = generate_slides(num_slides)
+    for content in slides:
+        content["table"] = [
+            [f"  Q{row} metric {col}: {row * col * 1.5:.1f}%  " for col in range(6)]
+            for row in range(12)
+        ]
+    return generate_pptx(slides, tables_per_slide=2)
+
+
+def legacy_extract_text_from_pptx(file_content: bytes) -> str:
+    """Extractor as it was before the single-pass walker, kept for comparison."""
+    prs = Presentation(io.BytesIO(file_content))
+    text_content = []
+
+    for slide_num, slide in enumerate(prs.slides, 1):
+        slide_text = []
+        slide_text.append(f"--- Slide {slide_num} ---")
+
+        for shape in slide.shapes:
+            if hasattr(shape, "text") and shape.text.strip():
+                slide_text.append(shape.text.strip())
+
+            if shape.has_table:
+                table = shape.table
+                for row in table.rows:
+                    row_text = []
+                    for cell in row.cells:
+                        if cell.text.strip():
+                            row_text.append(cell.text.strip())
+                    if row_text:
+                        slide_text.append(" | ".join(row_text))
+
+        if len(slide_text) > 1:
+            text_content.append("\n".join(slide_text))
+
+    return "\n\n".join(text_content)
+
+
+def build_corpus(corpus_dir: str, slide_counts: List[int]) -> List[str]:
+    """Generate (or reuse) one deck per slide count in the corpus folder."""
+    os.makedirs(corpus_dir, exist_ok=True)
+    paths = []
+    for num_slides in slide_counts:
+        path = os.path.join(corpus_dir, f"deck_{num_slides}_slides.pptx")
+        if not os.path.exists(path):
+            print(f"Generating {path}")
+            with open(path, "wb") as f:
+                f.write(generate_large_deck(num_slides))
+        paths.append(path)
+    return paths
+
+
+def best_of(repeat: int, func, *args) -> float:
+    """Return the best wall-clock time of `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPTX extraction throughput benchmark")
+    parser.add_argument("--slides", type=int, nargs="+", default=[200, 400])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "pitchpilot_pptx_corpus"))
+    args = parser.parse_args()
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+
+    paths = build_corpus(args.corpus_dir, args.slides)
+
+    print(f"{'deck':<28}{'legacy slides/s':>18}{'walker slides/s':>18}{'speedup':>10}{'legacy chars':>14}{'walker chars':>14}")
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+        num_slides = len(Presentation(io.BytesIO(content)).slides)
+
+        legacy_time = best_of(args.repeat, legacy_extract_text_from_pptx, content)
+        walker_time = best_of(args.repeat, file_service.extract_document_from_pptx, content)
+
+        legacy_chars = len(legacy_extract_text_from_pptx(content))
+        walker_chars = len(file_service.extract_document_from_pptx(content).text)
+
+        print(
+            f"{os.path.basename(path):<28}"
+            f"{num_slides / legacy_time:>18.1f}"
+            f"{num_slides / walker_time:>18.1f}"
+            f"{legacy_time / walker_time:>9.2f}x"
+            f"{legacy_chars:>14}"
+            f"{walker_chars:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
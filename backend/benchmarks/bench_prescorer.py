@@ -0,0 +1,122 @@
+# benchmarks/bench_prescorer.py
+"""
+Throughput of the local pre-scorer (app/services/prescorer.py).
+
+Builds a synthetic corpus of decks of every file type and slide count, each
+in several variants: full decks with every sentence of the generator, and
+sparse decks whose slides only use a random subset of the sentences, so that
+figures and sections are missing and the provisional scores spread out.
+
+Reports, per slide count, the decks/sec and p50/p95 milliseconds of the
+pre-scorer alone on already extracted documents, and of extraction,
+normalization and pre-scoring together (what POST /prescore does per
+upload), plus the range of the provisional overall scores and the size of
+the [DECK FACTS] block against the deck text, in tokens.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_prescorer --slides 10 50 200 --variants 8
+"""
+import json
+import time
+import random
+import argparse
+import statistics
+from typing import Any, Dict, List
+from benchmarks.load_test import percentile
+from benchmarks.synthetic_decks import FILE_TYPES, SENTENCES, generate_docx, generate_pdf, generate_pptx, generate_slides, generate_txt
+
+WRITERS = {"pdf": generate_pdf, "pptx": generate_pptx, "docx": generate_docx, "txt": generate_txt}
+
+
+def corpus_deck(file_type: str, num_slides: int, variant: int) -> bytes:
+    """Variant 0 uses every generator sentence, the others a random subset of 2 to 8 sentences."""
+    rng = random.Random(variant)
+    slides = generate_slides(num_slides, seed=variant)
+    if variant:
+        kept = set(rng.sample(SENTENCES, rng.randint(2, 8)))
+        for slide in slides:
+            slide["body"] = [sentence for sentence in slide["body"] if sentence in kept] or [rng.choice(sorted(kept))]
+    return WRITERS[file_type](slides)
+
+
+def run(args) -> List[Dict[str, Any]]:
+    from app.ai.prompts import deck_facts_message
+    from app.services.file_service import FileService
+    from app.services.prescorer import PitchPreScorer
+    from app.services.text_normalizer import TextNormalizer, estimate_tokens
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+    normalizer = TextNormalizer()
+    prescorer = PitchPreScorer()
+    rows = []
+    for num_slides in args.slides:
+        files = [
+            (file_type, corpus_deck(file_type, num_slides, variant))
+            for file_type in args.types
+            for variant in range(args.variants)
+        ]
+        documents = []
+        end_to_end_ms = []
+        for file_type, content in files:
+            start = time.perf_counter()
+            document = file_service.extract_document(content, file_type)
+            document, _ = normalizer.normalize(document)
+            prescorer.prescore(document)
+            end_to_end_ms.append((time.perf_counter() - start) * 1000)
+            documents.append(document)
+
+        prescore_ms = []
+        overall = []
+        facts_tokens = []
+        deck_tokens = []
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for document in documents:
+                deck_start = time.perf_counter()
+                score, features, _ = prescorer.prescore(document)
+                prescore_ms.append((time.perf_counter() - deck_start) * 1000)
+                overall.append(score.overall)
+        elapsed = time.perf_counter() - start
+        for document in documents:
+            facts_tokens.append(estimate_tokens(deck_facts_message(prescorer.extract(document))))
+            deck_tokens.append(estimate_tokens(document.text))
+
+        rows.append({
+            "slides": num_slides,
+            "decks": len(documents),
+            "prescore_decks_per_sec": round(len(prescore_ms) / elapsed, 1),
+            "prescore_ms": {"p50": round(percentile(prescore_ms, 50), 2), "p95": round(percentile(prescore_ms, 95), 2)},
+            "with_extraction_decks_per_sec": round(len(end_to_end_ms) / (sum(end_to_end_ms) / 1000), 1),
+            "with_extraction_ms": {"p50": round(percentile(end_to_end_ms, 50), 2), "p95": round(percentile(end_to_end_ms, 95), 2)},
+            "overall_score": {"min": min(overall), "max": max(overall), "mean": round(statistics.mean(overall), 2)},
+            "facts_tokens": round(statistics.mean(facts_tokens)),
+            "deck_tokens": round(statistics.mean(deck_tokens)),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local pre-scorer throughput benchmark")
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--types", nargs="+", default=FILE_TYPES, choices=FILE_TYPES)
+    parser.add_argument("--variants", type=int, default=8, help="Decks per file type and slide count")
+    parser.add_argument("--repeat", type=int, default=5, help="Pre-scoring passes over the extracted corpus")
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    rows = run(args)
+    print(f"\n{'slides':>7}{'decks':>7}{'decks/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'+extract/s':>12}{'p50 ms':>9}{'overall':>14}{'facts tok':>11}{'deck tok':>10}")
+    for row in rows:
+        print(
+            f"{row['slides']:>7}{row['decks']:>7}{row['prescore_decks_per_sec']:>10}{row['prescore_ms']['p50']:>9}{row['prescore_ms']['p95']:>9}"
+            f"{row['with_extraction_decks_per_sec']:>12}{row['with_extraction_ms']['p50']:>9}"
+            f"{str(row['overall_score']['min']) + '-' + str(row['overall_score']['max']):>14}{row['facts_tokens']:>11}{row['deck_tokens']:>10}"
+        )
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/bench_slide_suggestions.py
+"""
+Slide suggestion fan-out: LLM calls, time to the first slide and total time.
+
+Generates decks in which a share of the slides is tiny (a title and one
+sentence, like section dividers and contact slides) and streams their slide
+suggestions through SlideSuggestionService, with every slide in its own call
+(SLIDE_BATCH_MIN_CHARS=0) and with tiny slides batched, at each concurrency
+limit given. A last pass repeats the batched run with the cache filled by
+the previous one. Also checks that the slides come back in order.
+
+LLM calls go to benchmarks.mock_openai. It answers every string field with
+40-120 words while real suggestions are a sentence or two, so it runs at a
+higher token rate than the other benchmarks by default.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_slide_suggestions --slides 20 60 --concurrency 4 8 16
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from typing import Any, Dict, List
+from benchmarks.load_test import wait_for_port
+from benchmarks.synthetic_decks import generate_pdf, generate_pptx, generate_slides
+
+
+def mixed_deck(file_type: str, num_slides: int, tiny_share: float, seed: int = 7) -> bytes:
+    """Synthetic deck where `tiny_share` of the slides only have a title, one sentence and one table row."""
+    rng = random.Random(seed)
+    slides = generate_slides(num_slides, seed=seed)
+    for slide in slides:
+        if rng.random() < tiny_share:
+            slide["body"] = slide["body"][:1]
+            slide["table"] = slide["table"][:1]
+    return generate_pdf(slides) if file_type == "pdf" else generate_pptx(slides, notes=False, grouped=False)
+
+
+async def stream_once(document, batch_min_chars: int, concurrency: int, cache) -> Dict[str, Any]:
+    from app.config.metrics import metrics
+    from app.services import slide_suggestions
+    from app.services.slide_suggestions import SlideSuggestionService
+
+    os.environ["SLIDE_BATCH_MIN_CHARS"] = str(batch_min_chars)
+    os.environ["SLIDE_SUGGESTION_CONCURRENCY"] = str(concurrency)
+    slide_suggestions._semaphore = None
+    calls_before = metrics.snapshot()["counters"].get("slide_suggestions.calls", 0)
+
+    start = time.perf_counter()
+    first_ms = None
+    numbers: List[int] = []
+    errors = 0
+    async for suggestion in SlideSuggestionService(cache=cache).stream(document):
+        if first_ms is None:
+            first_ms = (time.perf_counter() - start) * 1000
+        numbers.append(suggestion.slide_number)
+        errors += suggestion.error is not None
+    total_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "batch_min_chars": batch_min_chars,
+        "concurrency": concurrency,
+        "slides": len(numbers),
+        "llm_calls": metrics.snapshot()["counters"].get("slide_suggestions.calls", 0) - calls_before,
+        "first_slide_ms": round(first_ms or 0.0, 1),
+        "total_ms": round(total_ms, 1),
+        "errors": errors,
+        "in_order": numbers == sorted(numbers),
+    }
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    from app.services.file_service import FileService
+    from app.services.slide_suggestions import SlideSuggestionCache
+    from app.services.text_normalizer import TextNormalizer
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+    normalizer = TextNormalizer()
+    rows = []
+    for file_type in args.types:
+        for num_slides in args.slides:
+            document = file_service.extract_document(mixed_deck(file_type, num_slides, args.tiny_share), file_type)
+            document, _ = normalizer.normalize(document)
+            for concurrency in args.concurrency:
+                for batch_min_chars in (0, args.batch_min_chars):
+                    row = await stream_once(document, batch_min_chars, concurrency, SlideSuggestionCache())
+                    rows.append({"type": file_type, "deck_slides": num_slides, "cache": "cold", **row})
+            cache = SlideSuggestionCache()
+            await stream_once(document, args.batch_min_chars, args.concurrency[-1], cache)
+            row = await stream_once(document, args.batch_min_chars, args.concurrency[-1], cache)
+            rows.append({"type": file_type, "deck_slides": num_slides, "cache": "warm", **row})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-slide suggestion fan-out benchmark")
+    parser.add_argument("--slides", type=int, nargs="+", default=[20, 60])
+    parser.add_argument("--types", nargs="+", default=["pptx", "pdf"], choices=["pptx", "pdf"])
+    parser.add_argument("--tiny-share", type=float, default=0.4)
+    parser.add_argument("--batch-min-chars", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--mock-port", type=int, default=8103)
+    parser.add_argument("--mock-latency-ms", type=float, default=800.0)
+    parser.add_argument("--mock-tokens-per-sec", type=float, default=400.0)
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    mock_process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_openai",
+        "--port", str(args.mock_port),
+        "--latency-ms", str(args.mock_latency_ms),
+        "--tokens-per-sec", str(args.mock_tokens_per_sec),
+        "--seed", "7",
+    ])
+    wait_for_port("127.0.0.1", args.mock_port)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("OPENAI_MODEL", "gpt-4.1-mini")
+
+    try:
+        rows = asyncio.run(run(args))
+    finally:
+        mock_process.terminate()
+        mock_process.wait()
+
+    print(f"\n{'type':<6}{'slides':>7}{'cache':>7}{'batch <':>9}{'limit':>7}{'calls':>7}{'first ms':>10}{'total ms':>10}{'errors':>8}{'ordered':>9}")
+    for row in rows:
+        print(
+            f"{row['type']:<6}{row['deck_slides']:>7}{row['cache']:>7}{row['batch_min_chars']:>9}{row['concurrency']:>7}"
+            f"{row['llm_calls']:>7}{row['first_slide_ms']:>10}{row['total_ms']:>10}{row['errors']:>8}{str(row['in_order']):>9}"
+        )
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
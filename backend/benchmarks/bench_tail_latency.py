@@ -0,0 +1,161 @@
+# benchmarks/bench_tail_latency.py
+"""
+Tail latency of evaluations when some LLM responses stall.
+
+Starts benchmarks.mock_openai with a share of stalled responses and runs the
+same evaluations through PitchGraph under three policies:
+
+  - none: no hedging, a deadline far above the stall (the previous behaviour)
+  - deadline: per-node budgets from a tight EVALUATION_SLA_SECONDS, no hedging;
+    stalled supervisor calls fall back to deterministic routing, stalled
+    analysis or scoring calls fail the evaluation fast
+  - hedged: the same deadline plus a duplicate call after the p95 latency
+
+For each policy it reports p50/p95/p99/max latency, failed evaluations and the
+LLM calls per evaluation (hedges included).
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_tail_latency --runs 200 --concurrency 10 --stall-prob 0.03
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+from typing import Any, Dict, List
+import httpx
+from benchmarks.load_test import percentile, wait_for_port
+from benchmarks.synthetic_decks import generate_deck
+
+POLICIES = {
+    "none": {"LLM_HEDGE_ENABLED": "false", "EVALUATION_SLA_SECONDS": "3600"},
+    "deadline": {"LLM_HEDGE_ENABLED": "false"},
+    "hedged": {"LLM_HEDGE_ENABLED": "true"},
+}
+
+
+async def mock_stats(port: int) -> Dict[str, int]:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{port}/stats")).json()
+
+
+async def run_policy(args, policy: str, documents: List[Any]) -> Dict[str, Any]:
+    """Evaluate `args.runs` decks with `args.concurrency` in flight under one policy."""
+    from app.ai.pitch_graph import PitchGraph
+    from app.ai.resilience import reset_circuit_breakers, reset_hedge_delays
+    from app.config.metrics import metrics
+    from app.schemas.pitch_schema import PitchData
+
+    os.environ["EVALUATION_SLA_SECONDS"] = str(args.sla_seconds)
+    os.environ.update(POLICIES[policy])
+    metrics.reset()
+    reset_circuit_breakers()
+    reset_hedge_delays()
+    pitch_graph = PitchGraph()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one_run(index: int, measure: bool):
+        nonlocal failures
+        async with semaphore:
+            pitch_data = PitchData(document=documents[index % len(documents)], user_query=args.user_query)
+            start = time.perf_counter()
+            try:
+                await pitch_graph.analyze_pitch(pitch_data)
+            except Exception:
+                if measure:
+                    failures += 1
+            if measure:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    # Warm-up runs fill the latency series the hedge delay is derived from
+    await asyncio.gather(*(one_run(index, False) for index in range(args.warmup)))
+    before = await mock_stats(args.mock_port)
+    await asyncio.gather(*(one_run(index, True) for index in range(args.runs)))
+    after = await mock_stats(args.mock_port)
+
+    counters = metrics.snapshot()["counters"]
+    return {
+        "policy": policy,
+        "runs": args.runs,
+        "failed": failures,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50)),
+            "p95": round(percentile(latencies, 95)),
+            "p99": round(percentile(latencies, 99)),
+            "max": round(max(latencies)),
+        },
+        "llm_calls_per_run": round((after["requests"] - before["requests"]) / args.runs, 2),
+        "stalled_calls": after["stalled"] - before["stalled"],
+        "hedges": int(sum(value for name, value in counters.items() if name.endswith(".hedges"))),
+        "hedge_wins": int(sum(value for name, value in counters.items() if name.endswith(".hedge_wins"))),
+        "timeouts": int(sum(value for name, value in counters.items() if name.endswith(".timeouts"))),
+        "supervisor_fallbacks": int(counters.get("llm.supervisor.fallbacks", 0)),
+    }
+
+
+async def compare(args) -> List[Dict[str, Any]]:
+    from app.services.file_service import FileService
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+    documents = [file_service.extract_document(generate_deck("pptx", num_slides), "pptx") for num_slides in args.slides]
+    return [await run_policy(args, policy, documents) for policy in args.policies]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluation tail latency with stalled LLM responses")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--slides", type=int, nargs="+", default=[10])
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--sla-seconds", type=float, default=30.0)
+    parser.add_argument("--user-query", default="Please analyze and score this pitch")
+    parser.add_argument("--mock-port", type=int, default=8102)
+    parser.add_argument("--mock-latency-ms", type=float, default=400.0)
+    parser.add_argument("--mock-tokens-per-sec", type=float, default=400.0)
+    parser.add_argument("--stall-prob", type=float, default=0.03)
+    parser.add_argument("--stall-ms", type=float, default=20000.0)
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    mock_process = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_openai",
+        "--port", str(args.mock_port),
+        "--latency-ms", str(args.mock_latency_ms),
+        "--tokens-per-sec", str(args.mock_tokens_per_sec),
+        "--stall-prob", str(args.stall_prob),
+        "--stall-ms", str(args.stall_ms),
+        "--seed", "7",
+    ])
+    wait_for_port("127.0.0.1", args.mock_port)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "mock"
+    os.environ["EVALUATION_MODE"] = "multi_agent"
+    os.environ.setdefault("OPENAI_MODEL", "gpt-4.1-mini")
+    os.environ.setdefault("OPENAI_MODEL_SUPERVISOR", "gpt-4.1")
+
+    try:
+        reports = asyncio.run(compare(args))
+    finally:
+        mock_process.terminate()
+        mock_process.wait()
+
+    print(f"\n{'policy':<10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'failed':>8}{'calls/run':>11}{'hedges':>8}{'timeouts':>10}{'fallbacks':>11}")
+    for report in reports:
+        latency = report["latency_ms"]
+        print(
+            f"{report['policy']:<10}{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}{latency['max']:>9}"
+            f"{report['failed']:>8}{report['llm_calls_per_run']:>11}{report['hedges']:>8}{report['timeouts']:>10}{report['supervisor_fallbacks']:>11}"
+        )
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_vector_index.py
+"""
+Search latency and recall of the pitch vector index.
+
+Fills a fresh index with synthetic clustered embeddings (decks about the
+same kind of startup land close together), then measures top-k search
+latency against brute-force cosine search over the same memory-mapped
+vectors, and the recall of the inverted file against the exact result.
+Also reports the throughput of the local embedder on generated decks.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_vector_index --vectors 1000000 --queries 200
+"""
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import numpy as np
+from benchmarks.load_test import percentile
+from benchmarks.synthetic_decks import generate_deck
+
+
+def synthetic_embeddings(count: int, dim: int, topics: int, rng: np.random.Generator, chunk: int = 100000):
+    """Yield batches of L2-normalized vectors scattered around `topics` random directions."""
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        batch = centers[rng.integers(0, topics, size)] + 0.6 / np.sqrt(dim) * rng.standard_normal((size, dim)).astype(np.float32)
+        batch /= np.linalg.norm(batch, axis=1, keepdims=True)
+        yield start, batch.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector index search benchmark")
+    parser.add_argument("--vectors", type=int, default=1000000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--index-dir", default=None, help="Defaults to a temporary folder, removed afterwards")
+    args = parser.parse_args()
+
+    from app.services.embedding_service import EmbeddingService
+    from app.services.vector_index import VectorIndex
+
+    # Embedder throughput on realistic deck text
+    embedder = EmbeddingService(backend="hashing", dim=args.dim)
+    from app.services.file_service import FileService
+    text = FileService.__new__(FileService).extract_document(generate_deck("pptx", 30), "pptx").text
+    start = time.perf_counter()
+    for _ in range(20):
+        embedder.embed(text)
+    embed_ms = (time.perf_counter() - start) / 20 * 1000
+    print(f"Embedding a 30-slide deck ({len(text)} chars): {embed_ms:.1f} ms")
+
+    index_dir = args.index_dir or tempfile.mkdtemp(prefix="pitch_vector_index_")
+    rng = np.random.default_rng(7)
+    try:
+        index = VectorIndex(index_dir, args.dim, nprobe=args.nprobe, train_min=args.vectors + 1)
+        build_start = time.perf_counter()
+        for offset, batch in synthetic_embeddings(args.vectors, args.dim, args.topics, rng):
+            index.add_many([f"pitch-{offset + row}" for row in range(len(batch))], batch)
+        fill_s = time.perf_counter() - build_start
+        index.rebuild(retrain=True)
+        build_s = time.perf_counter() - build_start
+        print(f"Indexed {len(index)} vectors: fill {fill_s:.1f} s, IVF build {build_s - fill_s:.1f} s, {len(index.centroids)} clusters")
+
+        rows = rng.choice(args.vectors, args.queries, replace=False)
+        queries = np.array(index.vectors[rows]) + 0.2 / np.sqrt(args.dim) * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+        queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+        ivf_ms, exact_ms, recalls = [], [], []
+        all_vectors = index.vectors[:len(index)]
+        for query in queries:
+            start = time.perf_counter()
+            found = index.search(query, args.k)
+            ivf_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            scores = all_vectors @ query
+            top = np.argpartition(-scores, args.k - 1)[:args.k]
+            exact_ms.append((time.perf_counter() - start) * 1000)
+
+            exact_ids = {f"pitch-{row}" for row in top}
+            recalls.append(len(exact_ids & {pitch_id for pitch_id, _ in found}) / args.k)
+
+        print(f"\n{'search':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, samples in (("ivf", ivf_ms), ("brute force", exact_ms)):
+            print(f"{name:<14}{percentile(samples, 50):>10.2f}{percentile(samples, 95):>10.2f}{percentile(samples, 99):>10.2f}")
+        print(f"\nRecall@{args.k} of ivf (nprobe {args.nprobe}): {statistics.mean(recalls):.3f}")
+    finally:
+        if not args.index_dir:
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
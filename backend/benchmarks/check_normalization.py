@@ -0,0 +1,127 @@
+# benchmarks/check_normalization.py
+"""
+Token savings of the text normalization stage, and a check that it keeps the content.
+
+The synthetic corpus decorates generated decks with what real exports carry:
+a running header, a confidential footer with the page number, a "Page n of N"
+line and a closing disclaimer slide. Every level must keep every slide title,
+body sentence and table cell at least once; the script exits with status 1
+otherwise.
+
+With --corpus-dir, real decks are measured too. Since their content is not
+known, the check there is that every number of the original text (amounts,
+percentages, dates) except page numbers is still present.
+
+Usage (from the backend folder):
+    python -m benchmarks.check_normalization --slides 10 50
+    python -m benchmarks.check_normalization --corpus-dir ~/decks
+"""
+import os
+import re
+import sys
+import argparse
+from typing import Dict, List, Set
+from benchmarks.synthetic_decks import generate_slides, generate_pdf, generate_pptx, generate_docx, generate_txt
+
+LEVELS = ["light", "standard", "aggressive"]
+NUMBER = re.compile(r"\$?\d[\d,.]*%?[KMB]?")
+
+DISCLAIMER = (
+    "This presentation contains forward-looking statements that involve risks and uncertainties. "
+    "It is not an offer to sell or a solicitation of an offer to buy any securities."
+)
+
+
+def decorate(slides: List[Dict]) -> List[Dict]:
+    """Add a running header, a numbered confidential footer, a page line and a disclaimer slide."""
+    total = len(slides) + 1
+    decorated = []
+    for number, slide in enumerate(slides, 1):
+        decorated.append({
+            "title": "Acme Ledger   -   Seed Round Investor Presentation",
+            "body": [slide["title"]] + slide["body"] + [
+                f"Acme Ledger Inc. | Strictly Confidential | {number}",
+                f"Page {number} of {total}",
+            ],
+            "table": slide["table"],
+        })
+    decorated.append({
+        "title": "Acme Ledger   -   Seed Round Investor Presentation",
+        "body": ["Disclaimer", DISCLAIMER, f"Acme Ledger Inc. | Strictly Confidential | {total}", f"Page {total} of {total}"],
+        "table": [["", "", ""]],
+    })
+    return decorated
+
+
+def content_facts(slides: List[Dict], with_tables: bool = True) -> Set[str]:
+    """Every piece of content that must survive normalization."""
+    facts = set()
+    for slide in slides:
+        facts.add(slide["title"])
+        facts.update(slide["body"])
+        if with_tables:
+            facts.update(cell for row in slide["table"] for cell in row)
+    return facts
+
+
+def squash(text: str) -> str:
+    return re.sub(r"\s+", " ", text).casefold()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check token savings and content preservation of text normalization")
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--corpus-dir", default=None, help="Folder of real decks (pdf, pptx, docx, txt)")
+    args = parser.parse_args()
+
+    from app.services.file_service import FileService
+    from app.services.text_normalizer import TextNormalizer
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+    normalizers = {level: TextNormalizer(level) for level in LEVELS}
+    writers = {"pdf": generate_pdf, "pptx": generate_pptx, "docx": generate_docx, "txt": generate_txt}
+    failures = []
+
+    print(f"{'deck':<28}{'level':<12}{'tokens':>8}{'after':>8}{'saved':>8}{'lost':>6}")
+    for num_slides in args.slides:
+        slides = generate_slides(num_slides)
+        decorated = decorate(slides)
+        for file_type, writer in writers.items():
+            # Plain-text decks are written without tables
+            facts = content_facts(slides, with_tables=file_type != "txt")
+            document = file_service.extract_document(writer(decorated), file_type)
+            for level, normalizer in normalizers.items():
+                normalized, report = normalizer.normalize(document)
+                text = squash(normalized.text)
+                lost = [fact for fact in facts if squash(fact) not in text]
+                print(f"{f'synthetic {num_slides} {file_type}':<28}{level:<12}{report.tokens_before:>8}{report.tokens_after:>8}{report.saved_ratio:>8.1%}{len(lost):>6}")
+                if lost:
+                    failures.append(f"synthetic {num_slides} {file_type} ({level}): lost {lost[:3]}")
+
+    if args.corpus_dir:
+        for name in sorted(os.listdir(args.corpus_dir)):
+            file_type = name.rsplit(".", 1)[-1].lower()
+            if file_type not in writers:
+                continue
+            with open(os.path.join(args.corpus_dir, name), "rb") as f:
+                document = file_service.extract_document(f.read(), file_type)
+            page_numbers = {str(section.number) for section in document.sections}
+            numbers = set(NUMBER.findall(document.text)) - page_numbers
+            for level, normalizer in normalizers.items():
+                normalized, report = normalizer.normalize(document)
+                lost = numbers - set(NUMBER.findall(normalized.text))
+                print(f"{name[:27]:<28}{level:<12}{report.tokens_before:>8}{report.tokens_after:>8}{report.saved_ratio:>8.1%}{len(lost):>6}")
+                if lost:
+                    print(f"    numbers no longer present: {sorted(lost)[:10]}")
+
+    if failures:
+        print("\nContent lost:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo synthetic content lost at any level")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/local_storage.py
+"""
+Local stand-in for the Supabase storage client.
+
+Implements the subset of `client.storage.from_(bucket)` used by the backend
+on top of a local folder, so load tests never reach Supabase.
+"""
+import os
+from typing import List
+
+
+class LocalBucket:
+    def __init__(self, root: str, bucket_name: str):
+        self.path = os.path.join(root, bucket_name)
+        os.makedirs(self.path, exist_ok=True)
+
+    def upload(self, path: str, file: bytes, file_options: dict = None):
+        with open(os.path.join(self.path, path), "wb") as f:
+            f.write(file)
+        return {"Key": path}
+
+    def get_public_url(self, path: str) -> str:
+        return f"file://{os.path.join(self.path, path)}"
+
+    def download(self, path: str) -> bytes:
+        with open(os.path.join(self.path, os.path.basename(path)), "rb") as f:
+            return f.read()
+
+    def remove(self, paths: List[str]):
+        for path in paths:
+            file_path = os.path.join(self.path, os.path.basename(path))
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        return paths
+
+
+class LocalStorage:
+    def __init__(self, root: str):
+        self.root = root
+
+    def from_(self, bucket_name: str) -> LocalBucket:
+        return LocalBucket(self.root, bucket_name)
+
+
+class LocalStorageClient:
+    """Drop-in replacement for the `supabase.Client` storage API."""
+
+    def __init__(self, root: str):
+        self.storage = LocalStorage(root)
+
+
+def use_local_storage(root: str) -> None:
+    """Make every SupabaseConnection created from now on use local storage under `root`."""
+    from app.services.supabase_connection import SupabaseConnection
+
+    os.environ.setdefault("SUPABASE_BUCKET_NAME", "pitch-files")
+    SupabaseConnection._create_client = lambda self: LocalStorageClient(root)
@@ -0,0 +1,287 @@
+# benchmarks/mock_openai.py
+"""
+Local OpenAI-compatible mock for load tests.
+
+Answers /v1/chat/completions with tool calls that satisfy the JSON schema
+instructor sends, after a simulated latency: a log-normal time to first
+token plus the output tokens divided by a sampled generation rate.
+
+Prompt prefix caching is simulated like OpenAI does it: the tools and
+messages of a request are matched in 128-token blocks against the prefixes
+of earlier requests, and matches of at least 1024 tokens are reported as
+`usage.prompt_tokens_details.cached_tokens`.
+
+Requests with "stream": true get the same answer as server-sent chunks of
+about 16 tokens, paced at the generation rate, so streamed structured output
+(instructor's create_iterable) can be timed item by item.
+
+A share of requests can be made to stall (--stall-prob, --stall-ms), like the
+occasional provider response that takes minutes instead of seconds.
+
+Point the backend at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock
+
+Usage (from the backend folder):
+    python -m benchmarks.mock_openai --port 8100 --latency-ms 800 --latency-sigma 0.5 --tokens-per-sec 80
+"""
+import re
+import json
+import hashlib
+import time
+import uuid
+import random
+import asyncio
+import argparse
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 800.0       # Median time to first token
+    latency_sigma: float = 0.5      # Log-normal shape, higher means a heavier tail
+    tokens_per_sec: float = 80.0    # Median generation rate
+    tokens_per_sec_sigma: float = 0.2
+    stall_prob: float = 0.0         # Share of requests that stall before answering
+    stall_ms: float = 20000.0       # Extra latency of a stalled request
+    seed: Optional[int] = None
+
+
+def _resolve(schema: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    ref = schema.get("$ref")
+    if ref:
+        return defs[ref.split("/")[-1]]
+    return schema
+
+
+def synthesize(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random, name: str = "", context: str = "") -> Any:
+    """
+    Build a value that validates against a (pydantic-generated) JSON schema.
+
+    Args:
+        schema (Dict[str, Any]): JSON schema of the value
+        defs (Dict[str, Any]): Shared `$defs` of the root schema
+        rng (random.Random): Random source
+        name (str): Name of the field being generated
+        context (str): Concatenated prompt text, used for supervisor routing
+
+    Returns:
+        Any: Generated value
+    """
+    schema = _resolve(schema, defs)
+
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return synthesize(options[0], defs, rng, name, context) if options else None
+    if "allOf" in schema:
+        return synthesize(schema["allOf"][0], defs, rng, name, context)
+
+    if "enum" in schema:
+        return _choose_enum(schema["enum"], name, context, rng)
+
+    schema_type = schema.get("type")
+    if schema_type == "object" or "properties" in schema:
+        return {
+            key: synthesize(value, defs, rng, key, context)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        count = max(schema.get("minItems", 0), rng.randint(3, 6))
+        return [synthesize(schema.get("items", {}), defs, rng, name, context) for _ in range(count)]
+    if schema_type == "number":
+        return round(rng.uniform(schema.get("minimum", 3.0), schema.get("maximum", 9.0)), 1)
+    if schema_type == "integer":
+        return rng.randint(schema.get("minimum", 1), schema.get("maximum", 10))
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    words = rng.randint(40, 120)
+    return " ".join(rng.choice(LOREM) for _ in range(words)).capitalize() + "."
+
+
+def _choose_enum(values: List[Any], name: str, context: str, rng: random.Random) -> Any:
+    """Route like the real supervisor would, otherwise pick a random enum value."""
+    if name == "workflow_stage":
+        has_feedback = re.search(r"has_feedback\W+True", context) is not None
+        has_score = re.search(r"has_score\W+True", context) is not None
+        if not has_feedback and "analysis" in values:
+            return "analysis"
+        if not has_score and "scoring" in values:
+            return "scoring"
+        return "complete"
+    return rng.choice(values)
+
+
+# Prefix caching granularity, in characters (about 4 characters per token)
+CACHE_BLOCK_CHARS = 128 * 4
+CACHE_MIN_CHARS = 1024 * 4
+
+
+class PrefixCache:
+    """Remembers the block-aligned prefixes of every prompt seen so far."""
+
+    def __init__(self):
+        self._prefixes = set()
+
+    def match(self, prompt: str) -> int:
+        """
+        Record a prompt and return how many of its characters were cached.
+
+        Args:
+            prompt (str): Serialized tools and messages of the request
+
+        Returns:
+            int: Length of the longest previously seen block-aligned prefix, 0 below the minimum
+        """
+        digest = hashlib.sha256()
+        cached = 0
+        for end in range(CACHE_BLOCK_CHARS, len(prompt) + 1, CACHE_BLOCK_CHARS):
+            digest.update(prompt[end - CACHE_BLOCK_CHARS:end].encode("utf-8"))
+            key = digest.hexdigest()
+            if key in self._prefixes:
+                cached = end
+            else:
+                self._prefixes.add(key)
+        return cached if cached >= CACHE_MIN_CHARS else 0
+
+
+LOREM = (
+    "the pitch clearly articulates a painful problem for finance teams and quantifies "
+    "the opportunity traction metrics are strong but churn and payback need more detail "
+    "competition slide should address incumbents directly and explain defensibility"
+).split()
+
+
+async def stream_chunks(body: Dict[str, Any], message: Dict[str, Any], content: str, time_to_first_token: float, rate: float):
+    """Server-sent chunks of an answer, 64 characters (about 16 tokens) each, paced at `rate` tokens per second."""
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        return "data: " + json.dumps({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model") or "mock-model",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }) + "\n\n"
+
+    await asyncio.sleep(time_to_first_token)
+    tool_call = (message.get("tool_calls") or [None])[0]
+    for start in range(0, len(content), 64):
+        piece = content[start:start + 64]
+        if tool_call is None:
+            delta = {"role": "assistant", "content": piece}
+        else:
+            function = {"arguments": piece}
+            if start == 0:
+                function["name"] = tool_call["function"]["name"]
+            delta = {"role": "assistant", "tool_calls": [{"index": 0, "id": tool_call["id"], "type": "function", "function": function}]}
+        yield chunk(delta)
+        await asyncio.sleep(len(piece) / 4 / rate)
+    yield chunk({}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    """Create the mock OpenAI FastAPI application."""
+    app = FastAPI(title="Mock OpenAI")
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "stalled": 0}
+    prefix_cache = PrefixCache()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        context = "\n".join(str(message.get("content", "")) for message in messages)
+        tools = body.get("tools") or []
+        prompt = json.dumps(tools, sort_keys=True) + json.dumps(messages)
+        prompt_tokens = max(1, len(prompt) // 4)
+        cached_tokens = prefix_cache.match(prompt) // 4
+
+        if tools:
+            function = tools[0]["function"]
+            parameters = function.get("parameters", {})
+            arguments = synthesize(parameters, parameters.get("$defs", {}), rng, context=context)
+            content = json.dumps(arguments)
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": function["name"], "arguments": content}
+                }]
+            }
+        else:
+            content = " ".join(rng.choice(LOREM) for _ in range(80))
+            message = {"role": "assistant", "content": content}
+        completion_tokens = max(1, len(content) // 4)
+
+        # Simulated latency: time to first token plus generation time
+        time_to_first_token = rng.lognormvariate(0, config.latency_sigma) * config.latency_ms / 1000
+        rate = config.tokens_per_sec * rng.lognormvariate(0, config.tokens_per_sec_sigma)
+        if config.stall_prob and rng.random() < config.stall_prob:
+            stats["stalled"] += 1
+            time_to_first_token += config.stall_ms / 1000
+
+        stats["requests"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_tokens"] += cached_tokens
+        stats["completion_tokens"] += completion_tokens
+
+        if body.get("stream"):
+            return StreamingResponse(
+                stream_chunks(body, message, content, time_to_first_token, rate),
+                media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(time_to_first_token + completion_tokens / rate)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "mock-model",
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--stall-prob", type=float, default=0.0, help="Share of requests that stall (tail latency)")
+    parser.add_argument("--stall-ms", type=float, default=20000.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        stall_prob=args.stall_prob,
+        stall_ms=args.stall_ms,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# benchmarks/profile_graph.py
+"""
+Profile the LangGraph pipeline in isolation from network variance.
+
+Record LLM responses once (against OpenAI or benchmarks.mock_openai), then
+replay them offline at zero or recorded latency to measure per-node time,
+graph overhead, per-step checkpoint size and, with --allocations, the peak
+memory allocated per run. A previous JSON report can be
+passed as a baseline to fail on regressions.
+
+Usage (from the backend folder):
+    # 1. Record fixtures (uses OPENAI_BASE_URL / OPENAI_API_KEY as configured)
+    python -m benchmarks.profile_graph --mode record --fixtures /tmp/llm_fixtures
+    # 2. Replay offline with zero latency and save a baseline
+    python -m benchmarks.profile_graph --mode replay --fixtures /tmp/llm_fixtures --json-out baseline.json
+    # 3. Later runs: compare against the baseline
+    python -m benchmarks.profile_graph --mode replay --fixtures /tmp/llm_fixtures --baseline baseline.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+from typing import Any, Dict, List
+from benchmarks.synthetic_decks import FILE_TYPES, generate_deck
+
+
+async def profile_run(pitch_graph, pitch_data, trace_allocations: bool = False) -> Dict[str, Any]:
+    """Run the graph once and measure wall time, checkpoint sizes and, optionally, allocations."""
+    from app.ai.pitch_store import pitch_store
+
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    initial_state = pitch_graph.build_initial_state(pitch_data)
+
+    if trace_allocations:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await pitch_graph.compiled_app.ainvoke(initial_state, config=config)
+    wall_ms = (time.perf_counter() - start) * 1000
+    pitch_store.release(initial_state["pitch_ref"])
+    allocated_peak = None
+    if trace_allocations:
+        _, allocated_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    checkpointer = pitch_graph.compiled_app.checkpointer
+    sizes = []
+    serialize_ms = 0.0
+    for checkpoint_tuple in checkpointer.list(config):
+        serialize_start = time.perf_counter()
+        _, payload = checkpointer.serde.dumps_typed(checkpoint_tuple.checkpoint)
+        serialize_ms += (time.perf_counter() - serialize_start) * 1000
+        sizes.append(len(payload))
+
+    return {"wall_ms": wall_ms, "checkpoint_sizes": sizes, "serialize_ms": serialize_ms, "allocated_peak": allocated_peak}
+
+
+async def profile(args) -> Dict[str, Any]:
+    from app.ai.pitch_graph import PitchGraph
+    from app.config.metrics import metrics
+    from app.schemas.pitch_schema import PitchData
+    from app.services.file_service import FileService
+
+    # Text extraction does not touch Supabase, skip the connection setup
+    file_service = FileService.__new__(FileService)
+    pitch_graph = PitchGraph()
+    await pitch_graph.create_workflow()
+    await pitch_graph.compile_workflow()
+
+    documents = [
+        file_service.extract_document(generate_deck(file_type, num_slides), file_type)
+        for num_slides in args.slides
+        for file_type in args.types
+    ]
+
+    metrics.reset()
+    runs: List[Dict[str, Any]] = []
+    for _ in range(args.iterations):
+        for document in documents:
+            pitch_data = PitchData(document=document, user_query=args.user_query)
+            runs.append(await profile_run(pitch_graph, pitch_data, args.allocations))
+
+    snapshot = metrics.snapshot()
+    node_p50 = {name: timing["p50"] for name, timing in snapshot["timings_ms"].items() if name.startswith("node.")}
+    node_total = {
+        name: timing["p50"] * timing["count"] / len(runs)
+        for name, timing in snapshot["timings_ms"].items() if name.startswith("node.")
+    }
+    wall = [run["wall_ms"] for run in runs]
+    checkpoint_bytes = [sum(run["checkpoint_sizes"]) for run in runs]
+    steps = [len(run["checkpoint_sizes"]) for run in runs]
+
+    report = {
+        "mode": args.mode,
+        "runs": len(runs),
+        "wall_ms_p50": round(statistics.median(wall), 2),
+        "node_ms_p50": node_p50,
+        "graph_overhead_ms_p50": round(max(0.0, statistics.median(wall) - sum(node_total.values())), 2),
+        "checkpoints_per_run": round(statistics.mean(steps), 1),
+        "checkpoint_bytes_per_run": int(statistics.median(checkpoint_bytes)),
+        "checkpoint_bytes_max_step": max(max(run["checkpoint_sizes"]) for run in runs),
+        "serialize_ms_per_run": round(statistics.median(run["serialize_ms"] for run in runs), 2),
+    }
+    if args.allocations:
+        # tracemalloc slows every allocation down, compare wall times only between runs without it
+        report["allocated_peak_bytes_per_run"] = int(statistics.median(run["allocated_peak"] for run in runs))
+    return report
+
+
+def check_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return the metrics that got worse than the baseline by more than `tolerance`."""
+    failures = []
+    for name in ("wall_ms_p50", "graph_overhead_ms_p50", "checkpoint_bytes_per_run", "serialize_ms_per_run", "allocated_peak_bytes_per_run"):
+        before, after = baseline.get(name), report.get(name)
+        if before and after and after > before * (1 + tolerance):
+            failures.append(f"{name}: {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the pitch graph with recorded LLM responses")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--fixtures", default="llm_fixtures")
+    parser.add_argument("--latency", choices=["zero", "recorded"], default="zero")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--types", nargs="+", default=["pdf", "pptx"], choices=FILE_TYPES)
+    parser.add_argument("--user-query", default="Please analyze and score this pitch")
+    parser.add_argument("--allocations", action="store_true", help="Also trace the peak memory allocated per run (slower)")
+    parser.add_argument("--baseline", default=None, help="JSON report of a previous run")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    # Configure replay before the OpenAI client is created
+    os.environ["LLM_REPLAY_MODE"] = args.mode
+    os.environ["LLM_REPLAY_DIR"] = args.fixtures
+    os.environ["LLM_REPLAY_LATENCY"] = args.latency
+    os.environ.setdefault("OPENAI_MODEL", "gpt-4.1-mini")
+    os.environ.setdefault("OPENAI_MODEL_SUPERVISOR", "gpt-4.1")
+    if args.mode == "record":
+        # Recording must see the same prompts on every run
+        args.iterations = 1
+
+    report = asyncio.run(profile(args))
+    print(json.dumps(report, indent=2))
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_regressions(report, json.load(f), args.max_regression)
+        if failures:
+            print("\nRegressions against baseline:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# benchmarks/synthetic_decks.py
+"""
+Synthetic pitch deck generator for benchmarks.
+
+Produces deterministic PDF, PPTX, DOCX and TXT decks of a given number of
+slides so that every benchmark run sees the same inputs.
+
+Usage (from the backend folder):
+    python -m benchmarks.synthetic_decks --out-dir /tmp/decks --slides 10 50 200
+"""
+import io
+import os
+import random
+import argparse
+from typing import Dict, List
+from docx import Document
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+FILE_TYPES = ["pdf", "pptx", "docx", "txt"]
+
+SLIDE_TITLES = [
+    "Problem", "Solution", "Why Now", "Market Size", "Product", "Traction",
+    "Business Model", "Competition", "Go-to-Market", "Team", "Financials", "The Ask"
+]
+
+SENTENCES = [
+    "Mid-market finance teams spend 12 hours a week reconciling invoices by hand.",
+    "Our platform automates reconciliation with 98% accuracy out of the box.",
+    "We grew from $40K to $1.2M ARR in the last 14 months, 22% MoM.",
+    "The total addressable market is $18B, with a $2.4B serviceable segment.",
+    "Net revenue retention is 134% across our top 50 customers.",
+    "Incumbents require six-month implementations; we go live in two days.",
+    "The founding team previously built and sold a payments company to Stripe.",
+    "We are raising a $6M seed round to reach $5M ARR in 18 months.",
+    "Customer acquisition cost is $3,100 with a 7-month payback period.",
+    "Partnerships with two top-10 accounting firms drive 40% of new pipeline.",
+    "Gross margin is 81% and improving as model inference costs fall.",
+    "Over 310 companies use the product weekly, up from 45 a year ago.",
+]
+
+
+def generate_slides(num_slides: int, sentences_per_slide: int = 5, seed: int = 7) -> List[Dict[str, List[str]]]:
+    """
+    Generate deterministic slide contents.
+
+    Args:
+        num_slides (int): Number of slides
+        sentences_per_slide (int): Body sentences per slide
+        seed (int): Random seed
+
+    Returns:
+        List[Dict[str, List[str]]]: One {"title", "body", "table"} entry per slide
+    """
+    rng = random.Random(seed)
+    slides = []
+    for slide_num in range(num_slides):
+        title = f"{SLIDE_TITLES[slide_num % len(SLIDE_TITLES)]} ({slide_num + 1})"
+        body = [rng.choice(SENTENCES) for _ in range(sentences_per_slide)]
+        table = [[f"Q{quarter}", f"${rng.randint(50, 900)}K", f"{rng.randint(5, 40)}%"] for quarter in range(1, 5)]
+        slides.append({"title": title, "body": body, "table": table})
+    return slides
+
+
+def _escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def generate_pdf(slides: List[Dict[str, List[str]]]) -> bytes:
+    """Write a minimal text-layer PDF with one page per slide."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + index * 2} 0 R" for index in range(len(slides)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(slides)} >>".encode())
+    font_id = 3 + len(slides) * 2
+
+    for index, slide in enumerate(slides):
+        lines = [slide["title"]] + slide["body"] + [" | ".join(row) for row in slide["table"]]
+        text_ops = " ".join(f"({_escape_pdf_text(line)}) '" for line in lines)
+        stream = f"BT /F1 12 Tf 54 740 Td 16 TL {text_ops} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + index * 2} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return output
+
+
+def generate_pptx(slides: List[Dict[str, List[str]]], tables_per_slide: int = 1, notes: bool = True, grouped: bool = True) -> bytes:
+    """Write a PPTX deck with a title, body text box, tables, a grouped callout and speaker notes per slide."""
+    prs = Presentation()
+    layout = prs.slide_layouts[5]  # Title only
+
+    for slide_num, content in enumerate(slides, 1):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = content["title"]
+
+        body = slide.shapes.add_textbox(Inches(0.5), Inches(1.3), Inches(9), Inches(1.5))
+        body.text_frame.text = "\n".join(content["body"])
+
+        for table_num in range(tables_per_slide):
+            rows, cols = len(content["table"]), len(content["table"][0])
+            table = slide.shapes.add_table(
+                rows, cols, Inches(0.5), Inches(3 + table_num * 1.6), Inches(9), Inches(1.4)
+            ).table
+            for row in range(rows):
+                for col in range(cols):
+                    table.cell(row, col).text = content["table"][row][col]
+
+        if grouped:
+            group = slide.shapes.add_group_shape()
+            for box_num in range(2):
+                box = group.shapes.add_textbox(Inches(0.5 + box_num * 4.5), Inches(6.6), Inches(4), Inches(0.5))
+                box.text_frame.text = f"Callout {box_num + 1}: {content['body'][box_num % len(content['body'])]}"
+                box.text_frame.paragraphs[0].runs[0].font.size = Pt(10)
+
+        if notes:
+            slide.notes_slide.notes_text_frame.text = f"Speaker notes for slide {slide_num}: {content['body'][0]}"
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_docx(slides: List[Dict[str, List[str]]]) -> bytes:
+    """Write a DOCX document with a heading, paragraphs and a table per slide."""
+    doc = Document()
+    for content in slides:
+        doc.add_heading(content["title"], level=2)
+        for sentence in content["body"]:
+            doc.add_paragraph(sentence)
+        table = doc.add_table(rows=len(content["table"]), cols=len(content["table"][0]))
+        for row_index, row in enumerate(content["table"]):
+            for col_index, value in enumerate(row):
+                table.cell(row_index, col_index).text = value
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_txt(slides: List[Dict[str, List[str]]]) -> bytes:
+    """Write a plain-text pitch script, one block per slide."""
+    blocks = []
+    for content in slides:
+        blocks.append("\n".join([content["title"]] + content["body"]))
+    return "\n\n".join(blocks).encode("utf-8")
+
+
+def generate_deck(file_type: str, num_slides: int, seed: int = 7) -> bytes:
+    """
+    Generate a synthetic deck of the given type.
+
+    Args:
+        file_type (str): One of pdf, pptx, docx, txt
+        num_slides (int): Number of slides
+        seed (int): Random seed
+
+    Returns:
+        bytes: File content
+    """
+    slides = generate_slides(num_slides, seed=seed)
+    if file_type == "pdf":
+        return generate_pdf(slides)
+    elif file_type == "pptx":
+        return generate_pptx(slides)
+    elif file_type == "docx":
+        return generate_docx(slides)
+    elif file_type == "txt":
+        return generate_txt(slides)
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def build_corpus(out_dir: str, slide_counts: List[int], file_types: List[str] = FILE_TYPES) -> List[str]:
+    """Generate (or reuse) one deck per file type and slide count in `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for num_slides in slide_counts:
+        for file_type in file_types:
+            path = os.path.join(out_dir, f"deck_{num_slides:04d}_slides.{file_type}")
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(generate_deck(file_type, num_slides))
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic pitch decks")
+    parser.add_argument("--out-dir", required=True)
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--types", nargs="+", default=FILE_TYPES, choices=FILE_TYPES)
+    args = parser.parse_args()
+
+    for path in build_corpus(args.out_dir, args.slides, args.types):
+        print(f"{path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
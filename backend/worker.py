@@ -0,0 +1,6 @@
+import asyncio
+from app.services.job_queue import EvaluationWorker
+
+if __name__ == "__main__":
+    # Runs queued evaluations (EVALUATION_EXECUTION=queue); start as many as needed
+    asyncio.run(EvaluationWorker().run())
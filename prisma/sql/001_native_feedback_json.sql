@@ -0,0 +1,43 @@
+-- prisma/sql/001_native_feedback_json.sql
+--
+-- Feedback scores and suggestions used to be written as JSON-encoded strings
+-- inside their Json (jsonb) columns. This unwraps them into native JSON objects
+-- and adds the per-dimension score indexes that native JSON makes possible.
+--
+-- Run once after `npx prisma db push`, then rebuild the score histograms:
+--   psql "$DIRECT_URL" -f prisma/sql/001_native_feedback_json.sql
+--   (cd backend && python -m app.services.score_stats rebuild)
+--
+-- Safe to run again: already native rows are left alone and indexes are only
+-- created when missing. The updates go in batches to keep row locks short.
+
+DO $$
+DECLARE
+    updated integer;
+BEGIN
+    LOOP
+        UPDATE "Feedback"
+        SET "scores" = CASE WHEN jsonb_typeof("scores") = 'string' THEN ("scores" #>> '{}')::jsonb ELSE "scores" END,
+            "suggestions" = CASE WHEN jsonb_typeof("suggestions") = 'string' THEN ("suggestions" #>> '{}')::jsonb ELSE "suggestions" END
+        WHERE "id" IN (
+            SELECT "id" FROM "Feedback"
+            WHERE jsonb_typeof("scores") = 'string' OR jsonb_typeof("suggestions") = 'string'
+            LIMIT 5000
+        );
+        GET DIAGNOSTICS updated = ROW_COUNT;
+        EXIT WHEN updated = 0;
+        COMMIT;
+    END LOOP;
+END $$;
+
+-- Per-dimension score queries ("traction >= 8", per-dimension leaderboards).
+-- The expressions must match SCORE_EXPRESSIONS in backend/app/services/db_actions.py.
+CREATE INDEX IF NOT EXISTS "Feedback_clarity_score_idx" ON "Feedback" ((("scores" -> 'clarity' ->> 'score')::float8));
+CREATE INDEX IF NOT EXISTS "Feedback_differentiation_score_idx" ON "Feedback" ((("scores" -> 'differentiation' ->> 'score')::float8));
+CREATE INDEX IF NOT EXISTS "Feedback_traction_score_idx" ON "Feedback" ((("scores" -> 'traction' ->> 'score')::float8));
+CREATE INDEX IF NOT EXISTS "Feedback_scalability_score_idx" ON "Feedback" ((("scores" -> 'scalability' ->> 'score')::float8));
+
+-- Containment queries on the structured feedback, e.g. "suggestions" @> '{"threats": ""}'
+CREATE INDEX IF NOT EXISTS "Feedback_suggestions_gin_idx" ON "Feedback" USING GIN ("suggestions" jsonb_path_ops);
+
+ANALYZE "Feedback";
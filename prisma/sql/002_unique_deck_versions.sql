@@ -0,0 +1,48 @@
+-- prisma/sql/002_unique_deck_versions.sql
+--
+-- Versions used to be numbered from the latest completed version of a deck, so
+-- uploads made while an evaluation was pending or failed, and concurrent
+-- uploads, could share a version number. This renumbers every deck's versions
+-- by upload time and replaces the (deckKey, version) index with the unique
+-- index the next version number now relies on.
+--
+-- Run before `npx prisma db push` on an existing database, otherwise the push
+-- fails on the duplicate versions:
+--   psql "$DIRECT_URL" -f prisma/sql/002_unique_deck_versions.sql
+--
+-- Only databases that already have deck versions ("Pitch"."deckKey") need it;
+-- on older databases the columns do not exist yet, the script does nothing
+-- and `npx prisma db push` creates them with the unique index.
+--
+-- Safe to run again: decks without duplicates keep their numbers.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'Pitch' AND column_name = 'deckKey'
+    ) THEN
+        RAISE NOTICE 'Pitch has no deck versions yet, nothing to renumber';
+        RETURN;
+    END IF;
+
+    UPDATE "Pitch" p
+    SET "version" = renumbered."version"
+    FROM (
+        SELECT "id", ROW_NUMBER() OVER (PARTITION BY "deckKey" ORDER BY "version", "createdAt", "id")::int AS "version"
+        FROM "Pitch"
+        WHERE "deckKey" IN (
+            SELECT "deckKey" FROM "Pitch"
+            WHERE "deckKey" IS NOT NULL
+            GROUP BY "deckKey", "version"
+            HAVING COUNT(*) > 1
+        )
+    ) renumbered
+    WHERE p."id" = renumbered."id" AND p."version" <> renumbered."version";
+
+    CREATE UNIQUE INDEX IF NOT EXISTS "Pitch_deckKey_version_key" ON "Pitch" ("deckKey", "version");
+    DROP INDEX IF EXISTS "Pitch_deckKey_version_idx";
+END
+$$;
+
+ANALYZE "Pitch";